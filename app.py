@@ -1,30 +1,76 @@
+import hashlib
+import json
 import os
+import re
+import signal
+import socket
+import zipfile
+import time
+import weakref
 from io import BytesIO
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from functools import wraps
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
+import click
 from flask import (
+    Blueprint,
     Flask,
+    Request,
+    Response,
+    abort,
+    current_app,
     flash,
+    jsonify,
+    make_response,
     redirect,
     render_template,
     request,
     send_file,
     session,
+    stream_with_context,
     url_for,
 )
 from flask_sqlalchemy import SQLAlchemy
+from markupsafe import Markup, escape
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.local import LocalProxy
+from werkzeug.wsgi import wrap_file
+from werkzeug.security import safe_join
 from werkzeug.utils import secure_filename
-from sqlalchemy import or_, text, inspect
-import calendar
+from sqlalchemy import (
+    MetaData, Table, and_, bindparam, case, event, extract, func, literal, literal_column, not_, or_, select, text,
+    inspect, tuple_, union_all,
+)
+from sqlalchemy.exc import DatabaseError, IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import deferred, load_only
+from sqlalchemy.pool import NullPool, QueuePool
+
+from blob_store import PDF_MAGIC, BlobStore, BlobTooLarge, InvalidBlobHeader, StagedBlob, create_blob_store, sha256_file
+from asset_import import coerce_row, read_rows
+from cache import Cache, create_cache
+from compression import init_compression
+from bulk_ingest import ManifestError, parse_manifest, store_files, zip_opener
+from exports import EXPORT_FORMATS, stream_export
+from instrumentation import init_instrumentation
+from metrics import REGISTRY, Gauge, Histogram
+from migrations import Migration, create_index, pending_migrations, run_migrations
+from static_assets import build_static, init_static_assets
+from forecast import (
+    FleetArrays, add_months, first_of_month, forecast_matrix, forecast_months, month_index, month_start,
+    rollup_contributions,
+)
 
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-me')
-app.config['UPLOAD_FOLDER'] = os.path.join(BASE_DIR, 'uploads')
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Everything below is wired to an application by create_app(); importing this
+# module builds no app and touches neither the database nor the filesystem.
+bp = Blueprint("main", __name__, cli_group=None)
+db = SQLAlchemy()
+blob_store: BlobStore = LocalProxy(lambda: current_app.extensions["blob_store"])
+dashboard_cache: Cache = LocalProxy(lambda: current_app.extensions["dashboard_cache"])
+# PDFs of archived inspections; the same object as blob_store unless COLD_BLOB_STORAGE_PATH is set.
+cold_blob_store: BlobStore = LocalProxy(lambda: current_app.extensions["cold_blob_store"])
 
 
 def normalize_database_uri(raw_uri: str) -> str:
@@ -38,12 +84,74 @@ def normalize_database_uri(raw_uri: str) -> str:
     return raw_uri
 
 
-app.config['SQLALCHEMY_DATABASE_URI'] = normalize_database_uri(
-    os.getenv('DATABASE_URL', 'sqlite:///' + os.path.join(BASE_DIR, 'app.db'))
-)
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+def env_flag(name: str, default: bool) -> bool:
+    return str(os.environ.get(name, str(default))).lower() not in {"0", "false", "no", ""}
+
+
+POOL_CHECKOUT_WAIT = REGISTRY.register(Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection.",
+))
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def engine_options(database_uri: str) -> dict[str, Any]:
+    """Pool and connection settings for Postgres, tunable through DB_* env vars.
+
+    DB_PGBOUNCER=1 disables client-side pooling (NullPool) so an external
+    transaction-mode pooler owns the connections; psycopg2 never uses
+    server-side prepared statements, so nothing else needs turning off.
+    """
+    if not database_uri.startswith("postgresql"):
+        return {}
+
+    options: dict[str, Any] = {
+        "pool_pre_ping": env_flag("DB_POOL_PRE_PING", True),
+        "connect_args": {
+            "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "10")),
+            "keepalives": 1,
+            "keepalives_idle": 30,
+            "keepalives_interval": 10,
+            "keepalives_count": 5,
+        },
+    }
+    if env_flag("DB_PGBOUNCER", False):
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=int(os.getenv("DB_POOL_SIZE", "5")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+            pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+            # Azure's load balancer drops idle connections after ~4 minutes.
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "240")),
+        )
+        statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+        if statement_timeout:
+            options["connect_args"]["options"] = f"-c statement_timeout={statement_timeout}"
+    return options
+
+
+def apply_transaction_statement_timeout(engine) -> None:
+    """PgBouncer rejects startup options, so set the timeout per transaction instead."""
+    statement_timeout = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+    if not (statement_timeout and env_flag("DB_PGBOUNCER", False)):
+        return
+
+    @event.listens_for(engine, "begin")
+    def set_statement_timeout(conn):
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {statement_timeout}")
 
-db = SQLAlchemy(app)
 
 ALLOWED_EXTENSIONS = {'pdf'}
 
@@ -55,197 +163,99 @@ USERS = {
 ADMIN_STATUSES = ["Pending", "Awaiting approval", "Disputed", "Accepted"]
 REVIEWER_STATUSES = ["Pending", "Approved", "Rejected"]
 
-
-ASSET_OVERVIEW_COLUMNS = [
-    "Bilnr",
-    "Display",
-    "Fabrikat/Modell",
-    "Märke",
-    "Årsmodell",
-    "Första reg.datum",
-    "Ägaredatum",
-    "Köpsdatum",
-    "Registreringsnummer",
-    "Typ",
-    "Biltyp",
-    "Typ av finansiering",
-    "Finansiär",
-    "Köpeskilling",
-    "Netto som begagnad",
-    "Nybilspris",
-    "Ev kreditgivarens kreditgräns",
-    "Avtalets löptid",
-    "Återköpspris",
-    "Avdrag för hantering och adm",
-    "Avskrivning",
-    "Avskrivning per månad",
-    "Registreringsavgift",
-    "Ev rabatter",
+PAGE_SIZE = 50
+# Trigram search (pg_trgm / FTS5 trigram tokenizer) needs at least three characters.
+MIN_INDEXED_SEARCH_LENGTH = 3
+# Word search over PDF text and comments. "simple" does no stemming, which
+# suits the mix of Swedish and English in inspection reports.
+SEARCH_TEXT_CONFIG = "simple"
+# Search cursors for the ranked text-match part of the results start with this.
+RANK_CURSOR_PREFIX = "rank:"
+SNIPPET_SOURCE_CHARS = 50_000
+SNIPPET_START, SNIPPET_STOP = "\x02", "\x03"
+
+
+# (label shown in the overview / import header, Asset attribute, value kind)
+ASSET_COLUMNS = [
+    ("Bilnr", "vehicle_number", "str"),
+    ("Display", "display", "int"),
+    ("Fabrikat/Modell", "model", "str"),
+    ("Märke", "make", "str"),
+    ("Årsmodell", "model_year", "int"),
+    ("Första reg.datum", "first_registration_date", "date"),
+    ("Ägaredatum", "owner_date", "date"),
+    ("Köpsdatum", "purchase_date", "date"),
+    ("Registreringsnummer", "registration_number", "str"),
+    ("Typ", "type_code", "int"),
+    ("Biltyp", "vehicle_type", "str"),
+    ("Typ av finansiering", "financing_type", "str"),
+    ("Finansiär", "financier", "str"),
+    ("Köpeskilling", "purchase_price", "int"),
+    ("Netto som begagnad", "net_used_price", "int"),
+    ("Nybilspris", "price_new", "int"),
+    ("Ev kreditgivarens kreditgräns", "credit_limit", "int"),
+    ("Avtalets löptid", "term_months", "int"),
+    ("Återköpspris", "buyback_price", "int"),
+    ("Avdrag för hantering och adm", "handling_deduction", "int"),
+    ("Avskrivning", "depreciation", "int"),
+    ("Avskrivning per månad", "monthly_depreciation", "int"),
+    ("Registreringsavgift", "registration_fee", "int"),
+    ("Ev rabatter", "discounts", "int"),
 ]
 
-
-def parse_date(date_str: str) -> date:
-    return datetime.strptime(date_str, "%d-%m-%Y").date()
-
-
-PLACEHOLDER_ASSETS = [
-    {
-        "Bilnr": "KP20P236784",
-        "Display": 2,
-        "Fabrikat/Modell": "FH16 HEAVY DUTY",
-        "Märke": "VOLVO",
-        "Årsmodell": 2020,
-        "Första reg.datum": "25-11-2020",
-        "Ägaredatum": "25-11-2020",
-        "Köpsdatum": "06-03-2023",
-        "Registreringsnummer": "HEM17R",
-        "Typ": 3,
-        "Biltyp": "Traktor",
-        "Typ av finansiering": "Volvofinans",
-        "Finansiär": "Volvofinans",
-        "Köpeskilling": 1201783,
-        "Netto som begagnad": 1201783,
-        "Nybilspris": 2204002,
-        "Ev kreditgivarens kreditgräns": 214090,
-        "Avtalets löptid": 36,
-        "Återköpspris": 547278,
-        "Avdrag för hantering och adm": 0,
-        "Avskrivning": 701814,
-        "Avskrivning per månad": 19494,
-        "Registreringsavgift": 0,
-        "Ev rabatter": 0,
-    },
-    {
-        "Bilnr": "KP20P237804",
-        "Display": 2,
-        "Fabrikat/Modell": "SCANIA 500 S",
-        "Märke": "SCANIA",
-        "Årsmodell": 2019,
-        "Första reg.datum": "27-08-2019",
-        "Ägaredatum": "07-11-2022",
-        "Köpsdatum": "07-11-2022",
-        "Registreringsnummer": "PPM24L",
-        "Typ": 4,
-        "Biltyp": "Lastbil",
-        "Typ av finansiering": "Volvofinans",
-        "Finansiär": "Volvofinans",
-        "Köpeskilling": 1197834,
-        "Netto som begagnad": 1197834,
-        "Nybilspris": 1714768,
-        "Ev kreditgivarens kreditgräns": 91061,
-        "Avtalets löptid": 36,
-        "Återköpspris": 342954,
-        "Avdrag för hantering och adm": 0,
-        "Avskrivning": 508820,
-        "Avskrivning per månad": 14134,
-        "Registreringsavgift": 0,
-        "Ev rabatter": 0,
-    },
-    {
-        "Bilnr": "KP15H114979",
-        "Display": 1,
-        "Fabrikat/Modell": "SCANIA R580",
-        "Märke": "SCANIA",
-        "Årsmodell": 2015,
-        "Första reg.datum": "29-01-2015",
-        "Ägaredatum": "23-05-2023",
-        "Köpsdatum": "23-05-2023",
-        "Registreringsnummer": "XDG99Z",
-        "Typ": 4,
-        "Biltyp": "Lastbil",
-        "Typ av finansiering": "Volvofinans",
-        "Finansiär": "Volvofinans",
-        "Köpeskilling": 489920,
-        "Netto som begagnad": 489920,
-        "Nybilspris": 2289000,
-        "Ev kreditgivarens kreditgräns": 129063,
-        "Avtalets löptid": 36,
-        "Återköpspris": 960445,
-        "Avdrag för hantering och adm": 0,
-        "Avskrivning": 809035,
-        "Avskrivning per månad": 22473,
-        "Registreringsavgift": 0,
-        "Ev rabatter": 0,
-    },
-    {
-        "Bilnr": "KP20P267104",
-        "Display": 2,
-        "Fabrikat/Modell": "SCANIA R580",
-        "Märke": "SCANIA",
-        "Årsmodell": 2015,
-        "Första reg.datum": "17-02-2015",
-        "Ägaredatum": "23-05-2023",
-        "Köpsdatum": "23-05-2023",
-        "Registreringsnummer": "SOT11Z",
-        "Typ": 4,
-        "Biltyp": "Lastbil",
-        "Typ av finansiering": "Volvofinans",
-        "Finansiär": "Volvofinans",
-        "Köpeskilling": 514749,
-        "Netto som begagnad": 514749,
-        "Nybilspris": 2289000,
-        "Ev kreditgivarens kreditgräns": 98451,
-        "Avtalets löptid": 36,
-        "Återköpspris": 891384,
-        "Avdrag för hantering och adm": 0,
-        "Avskrivning": 882030,
-        "Avskrivning per månad": 24390,
-        "Registreringsavgift": 0,
-        "Ev rabatter": 0,
-    },
-    {
-        "Bilnr": "KP16H114995",
-        "Display": 1,
-        "Fabrikat/Modell": "SCANIA R580",
-        "Märke": "SCANIA",
-        "Årsmodell": 2015,
-        "Första reg.datum": "20-02-2015",
-        "Ägaredatum": "23-05-2023",
-        "Köpsdatum": "23-05-2023",
-        "Registreringsnummer": "XOG51W",
-        "Typ": 4,
-        "Biltyp": "Lastbil",
-        "Typ av finansiering": "Volvofinans",
-        "Finansiär": "Volvofinans",
-        "Köpeskilling": 511996,
-        "Netto som begagnad": 511996,
-        "Nybilspris": 2289000,
-        "Ev kreditgivarens kreditgräns": 99888,
-        "Avtalets löptid": 36,
-        "Återköpspris": 869729,
-        "Avdrag för hantering och adm": 0,
-        "Avskrivning": 907285,
-        "Avskrivning per månad": 25202,
-        "Registreringsavgift": 0,
-        "Ev rabatter": 0,
-    },
-    {
-        "Bilnr": "KP20P236184",
-        "Display": 1,
-        "Fabrikat/Modell": "SCANIA R580",
-        "Märke": "SCANIA",
-        "Årsmodell": 2015,
-        "Första reg.datum": "03-03-2015",
-        "Ägaredatum": "23-05-2023",
-        "Köpsdatum": "23-05-2023",
-        "Registreringsnummer": "XOG51W",
-        "Typ": 4,
-        "Biltyp": "Lastbil",
-        "Typ av finansiering": "Volvofinans",
-        "Finansiär": "Volvofinans",
-        "Köpeskilling": 521578,
-        "Netto som begagnad": 521578,
-        "Nybilspris": 2289000,
-        "Ev kreditgivarens kreditgräns": 107615,
-        "Avtalets löptid": 36,
-        "Återköpspris": 748551,
-        "Avdrag för hantering och adm": 0,
-        "Avskrivning": 1018835,
-        "Avskrivning per månad": 28301,
-        "Registreringsavgift": 0,
-        "Ev rabatter": 0,
-    },
+ASSET_IMPORT_BATCH_SIZE = 1000
+INSPECTION_INSERT_BATCH_SIZE = 200
+BULK_MAX_FORM_PARTS = 10000
+BATCH_UPDATE_LIMIT = 500
+BLOB_MIGRATION_JOB = "migrate-blobs"
+PDF_PROCESSING_JOB = "process-pdf"
+JOB_RETRY_BASE_SECONDS = 30
+
+STATUS_FIELDS = {"status_admin": ADMIN_STATUSES, "status_reviewer": REVIEWER_STATUSES}
+# The status that stops each side's turnaround clock.
+APPROVAL_STATUSES = {"status_admin": "Accepted", "status_reviewer": "Approved"}
+# (upper bound in seconds, label); the last bucket is open-ended.
+TURNAROUND_BUCKETS = [
+    (3600, "Under 1 hour"),
+    (4 * 3600, "1–4 hours"),
+    (24 * 3600, "4–24 hours"),
+    (3 * 24 * 3600, "1–3 days"),
+    (7 * 24 * 3600, "3–7 days"),
+    (28 * 24 * 3600, "1–4 weeks"),
+    (None, "Over 4 weeks"),
+]
+REPORT_DEFAULT_DAYS = 30
+REPORT_MAX_DAYS = 366
+# Backlog snapshots stop this long before midnight has passed, so a status
+# change committed just after midnight still lands in an unsnapshotted day.
+BACKLOG_SNAPSHOT_DELAY = timedelta(minutes=10)
+
+# (column header, Inspection attribute) for the inspection export.
+INSPECTION_EXPORT_COLUMNS = [
+    ("ID", "id"),
+    ("Registration number", "registration_number"),
+    ("Dealer", "dealer_name"),
+    ("Created", "created_at"),
+    ("Updated", "updated_at"),
+    ("Cost estimate", "cost_estimate"),
+    ("Accepted cost", "accepted_cost"),
+    ("Admin status", "status_admin"),
+    ("Reviewer status", "status_reviewer"),
+    ("Admin comment", "comment_admin"),
+    ("Reviewer comment", "comment_reviewer"),
+    ("PDF pages", "pdf_page_count"),
 ]
+# Rows fetched per round trip; on Postgres yield_per also switches to a server-side cursor.
+EXPORT_BATCH_SIZE = 1000
+FORECAST_EXPORT_DEFAULT_MONTHS = 12
+FORECAST_EXPORT_MAX_MONTHS = 120
+API_ASSET_PAGE_SIZE = 200
+API_ASSET_MAX_PAGE_SIZE = 1000
+ARCHIVE_BATCH_SIZE = 500
+# Rows per transaction when migrate_text_search backfills inspections.search_vector.
+SEARCH_VECTOR_BACKFILL_BATCH_SIZE = 1000
+# Archived matches shown under the dashboard results; the archive has no word index.
+ARCHIVE_SEARCH_LIMIT = 50
 
 
 def format_currency(value: int | None) -> str:
@@ -254,139 +264,1905 @@ def format_currency(value: int | None) -> str:
     return f"{value:,.0f} kr".replace(",", " ")
 
 
-def first_of_month(dt: date) -> date:
-    return date(dt.year, dt.month, 1)
-
-
-def add_months(base_date: date, months: int) -> date:
-    month = base_date.month - 1 + months
-    year = base_date.year + month // 12
-    month = month % 12 + 1
-    day = min(base_date.day, calendar.monthrange(year, month)[1])
-    return date(year, month, day)
-
-
-def months_between(start: date, end: date) -> int:
-    return (end.year - start.year) * 12 + (end.month - start.month)
-
+def format_date(value: date | None) -> str:
+    if value is None:
+        return "-"
+    return value.strftime("%d-%m-%Y")
 
-def build_forecast(rows: list[dict], current_date: date, horizon_months: int = 12):
-    months = [add_months(first_of_month(current_date), offset) for offset in range(horizon_months)]
-    month_labels = [month.strftime("%Y-%m") for month in months]
 
-    forecast_rows = []
-    depreciation_totals = [0 for _ in months]
+bp.add_app_template_filter(format_currency, "currency")
+bp.add_app_template_filter(format_date, "dmy")
 
-    for row in rows:
-        registration_date = parse_date(row["Första reg.datum"])
-        months_in_term = int(row["Avtalets löptid"])
-        monthly_depreciation = int(row["Avskrivning per månad"])
-        net_price_new = int(row["Nybilspris"])
-
-        values = []
-        for idx, month in enumerate(months):
-            months_since_registration = months_between(registration_date, month)
-            if months_since_registration < 0 or months_since_registration > months_in_term:
-                values.append(None)
-                continue
-            depreciated_value = max(net_price_new - monthly_depreciation * months_since_registration, 0)
-            values.append(depreciated_value)
-            depreciation_totals[idx] += monthly_depreciation
 
-        forecast_rows.append({
-            "asset": f"{row['Registreringsnummer']} ({row['Fabrikat/Modell']})",
-            "values": values,
-        })
+def allowed_file(filename: str) -> bool:
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
-    summary_row = [total if total else None for total in depreciation_totals]
 
-    return {
-        "months": month_labels,
-        "rows": forecast_rows,
-        "depreciation_totals": summary_row,
-    }
+class InspectionRequest(Request):
+    """Streams multipart file parts straight into blob store staging files.
 
+    Bulk uploads get the larger bulk limit and skip the PDF header check here,
+    so one bad file is reported per item instead of failing the whole request.
+    """
 
-app.jinja_env.filters["currency"] = format_currency
+    @property
+    def is_bulk_upload(self) -> bool:
+        return self.endpoint == "main.bulk_upload_inspections"
 
+    @property
+    def max_content_length(self) -> Optional[int]:
+        if self.is_bulk_upload:
+            return current_app.config["MAX_BULK_UPLOAD_BYTES"]
+        return super().max_content_length
 
-def allowed_file(filename: str) -> bool:
-    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
+    @property
+    def max_form_parts(self) -> Optional[int]:
+        return BULK_MAX_FORM_PARTS if self.is_bulk_upload else Request.max_form_parts
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        bulk = self.is_bulk_upload
+        expected_header = PDF_MAGIC if filename and allowed_file(filename) and not bulk else None
+        return blob_store.stage(
+            max_size=self.max_content_length,
+            expected_header=expected_header,
+        )
 
 
 def login_required(view_func):
     @wraps(view_func)
     def wrapped_view(*args, **kwargs):
         if "username" not in session:
-            return redirect(url_for("login"))
+            return redirect(url_for("main.login"))
         return view_func(*args, **kwargs)
     return wrapped_view
 
 
 class Inspection(db.Model):
     __tablename__ = "inspections"
+    __table_args__ = (
+        db.Index("ix_inspections_created_at_id", "created_at", "id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     registration_number = db.Column(db.String(50), nullable=False)
     dealer_name = db.Column(db.String(120), nullable=True)
     pdf_filename = db.Column(db.String(255), nullable=False)
-    pdf_data = db.Column(db.LargeBinary, nullable=True)
+    pdf_data = deferred(db.Column(db.LargeBinary, nullable=True))
+    pdf_size = db.Column(db.Integer, nullable=True)
+    pdf_sha256 = db.Column(db.String(64), nullable=True, index=True)
+    # Filled in by the process-pdf job so requests never need to open the blob.
+    pdf_text = deferred(db.Column(db.Text, nullable=True))
+    pdf_page_count = db.Column(db.Integer, nullable=True)
+    pdf_thumbnail_sha256 = db.Column(db.String(64), nullable=True)
+    pdf_processed_at = db.Column(db.DateTime, nullable=True)
     cost_estimate = db.Column(db.Integer, nullable=True)
     accepted_cost = db.Column(db.Integer, nullable=True)
     status_admin = db.Column(db.String(30), default="Pending")
     status_reviewer = db.Column(db.String(20), default="Pending")
     comment_admin = db.Column(db.Text, nullable=True)
     comment_reviewer = db.Column(db.Text, nullable=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     @property
     def pdf_file_path(self) -> str:
-        return os.path.join(app.config["UPLOAD_FOLDER"], self.pdf_filename)
+        return os.path.join(current_app.config["UPLOAD_FOLDER"], self.pdf_filename)
 
     @property
     def has_pdf(self) -> bool:
-        if self.pdf_data:
-            return True
-        return os.path.exists(self.pdf_file_path)
+        return self.pdf_size is not None
+
+
+# Columns rendered by dashboard.html; anything else (notably pdf_data) stays unloaded.
+DASHBOARD_COLUMNS = (
+    Inspection.id,
+    Inspection.registration_number,
+    Inspection.dealer_name,
+    Inspection.pdf_filename,
+    Inspection.pdf_size,
+    Inspection.pdf_sha256,
+    Inspection.pdf_page_count,
+    Inspection.pdf_thumbnail_sha256,
+    Inspection.cost_estimate,
+    Inspection.accepted_cost,
+    Inspection.status_admin,
+    Inspection.status_reviewer,
+    Inspection.comment_admin,
+    Inspection.comment_reviewer,
+    Inspection.created_at,
+    Inspection.updated_at,
+)
 
 
-def ensure_inspection_columns():
-    inspector = inspect(db.engine)
-    if "inspections" not in inspector.get_table_names():
-        db.create_all()
-        return
+class Asset(db.Model):
+    __tablename__ = "assets"
+
+    id = db.Column(db.Integer, primary_key=True)
+    vehicle_number = db.Column(db.String(50), nullable=True, index=True)
+    display = db.Column(db.Integer, nullable=True)
+    model = db.Column(db.String(120), nullable=True)
+    make = db.Column(db.String(80), nullable=True)
+    model_year = db.Column(db.Integer, nullable=True)
+    first_registration_date = db.Column(db.Date, nullable=True)
+    owner_date = db.Column(db.Date, nullable=True)
+    purchase_date = db.Column(db.Date, nullable=True)
+    registration_number = db.Column(db.String(50), nullable=True, index=True)
+    type_code = db.Column(db.Integer, nullable=True)
+    vehicle_type = db.Column(db.String(50), nullable=True)
+    financing_type = db.Column(db.String(80), nullable=True)
+    financier = db.Column(db.String(80), nullable=True)
+    purchase_price = db.Column(db.Integer, nullable=True)
+    net_used_price = db.Column(db.Integer, nullable=True)
+    price_new = db.Column(db.Integer, nullable=True)
+    credit_limit = db.Column(db.Integer, nullable=True)
+    term_months = db.Column(db.Integer, nullable=True)
+    buyback_price = db.Column(db.Integer, nullable=True)
+    handling_deduction = db.Column(db.Integer, nullable=True)
+    depreciation = db.Column(db.Integer, nullable=True)
+    monthly_depreciation = db.Column(db.Integer, nullable=True)
+    registration_fee = db.Column(db.Integer, nullable=True)
+    discounts = db.Column(db.Integer, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class ForecastMonthly(db.Model):
+    """Depreciation rollup per month and asset group, maintained by refresh_forecast_rollup."""
+
+    __tablename__ = "forecast_monthly"
+
+    month = db.Column(db.Date, primary_key=True)
+    vehicle_type = db.Column(db.String(50), primary_key=True)
+    financier = db.Column(db.String(80), primary_key=True)
+    depreciation = db.Column(db.BigInteger, nullable=False, default=0)
+    book_value = db.Column(db.BigInteger, nullable=False, default=0)
+    asset_count = db.Column(db.Integer, nullable=False, default=0)
 
-    existing_columns = {column["name"] for column in inspector.get_columns("inspections")}
-    ddl_statements = []
 
-    def add_column(name: str, ddl: str):
+class AssetForecastState(db.Model):
+    """Forecast inputs each asset currently contributes to forecast_monthly."""
+
+    __tablename__ = "asset_forecast_state"
+
+    asset_id = db.Column(db.Integer, primary_key=True)
+    first_registration_date = db.Column(db.Date, nullable=False)
+    term_months = db.Column(db.Integer, nullable=False)
+    monthly_depreciation = db.Column(db.Integer, nullable=False)
+    price_new = db.Column(db.Integer, nullable=False)
+    vehicle_type = db.Column(db.String(50), nullable=False)
+    financier = db.Column(db.String(80), nullable=False)
+
+
+class JobCheckpoint(db.Model):
+    """Progress marker for resumable maintenance commands."""
+
+    __tablename__ = "job_checkpoints"
+
+    name = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class Job(db.Model):
+    """Background work queued in the database and run by ``flask worker``."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        db.Index("ix_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    inspection_id = db.Column(db.Integer, nullable=True, index=True)
+    status = db.Column(db.String(20), nullable=False, default="queued")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    locked_by = db.Column(db.String(100), nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class DataVersion(db.Model):
+    """Counters bumped in the same transaction as writes; cache keys embed them.
+
+    Names: "inspections", "assets" and "status_events" (every recorded status
+    change, see record_status_events). Each is seeded by a migration.
+    """
+
+    __tablename__ = "data_versions"
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+
+
+class InspectionEvent(db.Model):
+    """Append-only log of status changes, written in the same transaction as the change.
+
+    ``old_value`` is NULL for the first recorded state of a field: on upload,
+    or the baseline seeded for inspections that predate the log.
+    """
+
+    __tablename__ = "inspection_events"
+    __table_args__ = (
+        db.Index("ix_inspection_events_field_created_at", "field", "created_at"),
+        db.Index("ix_inspection_events_inspection_id_created_at", "inspection_id", "created_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    inspection_id = db.Column(db.Integer, nullable=False)
+    field = db.Column(db.String(30), nullable=False)
+    old_value = db.Column(db.String(30), nullable=True)
+    new_value = db.Column(db.String(30), nullable=False)
+    actor = db.Column(db.String(50), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class StatusBacklogDaily(db.Model):
+    """Inspections in each status at the end of a day, written once the day is over.
+
+    Backlog reports start from the latest snapshot before their range, so they
+    read only the events after it instead of the whole log.
+    """
+
+    __tablename__ = "status_backlog_daily"
+
+    field = db.Column(db.String(30), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    status = db.Column(db.String(30), primary_key=True)
+    count = db.Column(db.Integer, nullable=False)
+
+
+class ArchivedInspection(db.Model):
+    """Closed inspections moved out of ``inspections`` by `flask archive-inspections`; read-only.
+
+    On Postgres the table is range-partitioned by ``created_at`` month, with a
+    partition created for each month as rows arrive, so old months can be
+    detached or moved to cheaper storage without touching the hot table.
+    """
+
+    __tablename__ = "inspections_archive"
+    __table_args__ = (
+        db.Index("ix_inspections_archive_created_at_id", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # Partitioned tables need the partition key in the primary key.
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    created_at = db.Column(db.DateTime, primary_key=True)
+    registration_number = db.Column(db.String(50), nullable=False, index=True)
+    dealer_name = db.Column(db.String(120), nullable=True)
+    pdf_filename = db.Column(db.String(255), nullable=False)
+    pdf_data = deferred(db.Column(db.LargeBinary, nullable=True))
+    pdf_size = db.Column(db.Integer, nullable=True)
+    pdf_sha256 = db.Column(db.String(64), nullable=True, index=True)
+    pdf_text = deferred(db.Column(db.Text, nullable=True))
+    pdf_page_count = db.Column(db.Integer, nullable=True)
+    pdf_thumbnail_sha256 = db.Column(db.String(64), nullable=True)
+    pdf_processed_at = db.Column(db.DateTime, nullable=True)
+    cost_estimate = db.Column(db.Integer, nullable=True)
+    accepted_cost = db.Column(db.Integer, nullable=True)
+    status_admin = db.Column(db.String(30), nullable=True)
+    status_reviewer = db.Column(db.String(20), nullable=True)
+    comment_admin = db.Column(db.Text, nullable=True)
+    comment_reviewer = db.Column(db.Text, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    @property
+    def has_pdf(self) -> bool:
+        return self.pdf_size is not None
+
+
+# Columns copied verbatim between inspections and inspections_archive.
+ARCHIVED_COLUMNS = [column.name for column in ArchivedInspection.__table__.columns if column.name != "archived_at"]
+
+
+FORECAST_INPUT_COLUMNS = (
+    "first_registration_date",
+    "term_months",
+    "monthly_depreciation",
+    "price_new",
+    "vehicle_type",
+    "financier",
+)
+
+
+# Schema changes are applied by `flask migrate`, never at import. Each step is
+# idempotent so databases set up by the old import-time code adopt them as-is.
+# Released migrations must not be edited; add a new one instead.
+#
+# Migrations that create tables build them from the frozen definitions below,
+# not from the models, so a migration creates the same thing whenever it runs
+# and fresh databases go through the same steps as upgraded ones.
+FROZEN_SCHEMA = MetaData()
+
+BASELINE_INSPECTIONS = Table(
+    "inspections", FROZEN_SCHEMA,
+    db.Column("id", db.Integer, primary_key=True),
+    db.Column("registration_number", db.String(50), nullable=False),
+    db.Column("dealer_name", db.String(120), nullable=True),
+    db.Column("pdf_filename", db.String(255), nullable=False),
+    db.Column("pdf_data", db.LargeBinary, nullable=True),
+    db.Column("cost_estimate", db.Integer, nullable=True),
+    db.Column("accepted_cost", db.Integer, nullable=True),
+    db.Column("status_admin", db.String(30)),
+    db.Column("status_reviewer", db.String(20)),
+    db.Column("comment_admin", db.Text, nullable=True),
+    db.Column("comment_reviewer", db.Text, nullable=True),
+    db.Column("created_at", db.DateTime),
+    db.Column("updated_at", db.DateTime),
+)
+
+FROZEN_DATA_VERSIONS = Table(
+    "data_versions", FROZEN_SCHEMA,
+    db.Column("name", db.String(50), primary_key=True),
+    db.Column("version", db.BigInteger, nullable=False),
+)
+
+# Tables that shipped before migrations existed, as migration 1 last created them.
+FROZEN_SUPPORT_TABLES = [
+    Table(
+        "assets", FROZEN_SCHEMA,
+        db.Column("id", db.Integer, primary_key=True),
+        db.Column("vehicle_number", db.String(50), nullable=True, index=True),
+        db.Column("display", db.Integer, nullable=True),
+        db.Column("model", db.String(120), nullable=True),
+        db.Column("make", db.String(80), nullable=True),
+        db.Column("model_year", db.Integer, nullable=True),
+        db.Column("first_registration_date", db.Date, nullable=True),
+        db.Column("owner_date", db.Date, nullable=True),
+        db.Column("purchase_date", db.Date, nullable=True),
+        db.Column("registration_number", db.String(50), nullable=True, index=True),
+        db.Column("type_code", db.Integer, nullable=True),
+        db.Column("vehicle_type", db.String(50), nullable=True),
+        db.Column("financing_type", db.String(80), nullable=True),
+        db.Column("financier", db.String(80), nullable=True),
+        db.Column("purchase_price", db.Integer, nullable=True),
+        db.Column("net_used_price", db.Integer, nullable=True),
+        db.Column("price_new", db.Integer, nullable=True),
+        db.Column("credit_limit", db.Integer, nullable=True),
+        db.Column("term_months", db.Integer, nullable=True),
+        db.Column("buyback_price", db.Integer, nullable=True),
+        db.Column("handling_deduction", db.Integer, nullable=True),
+        db.Column("depreciation", db.Integer, nullable=True),
+        db.Column("monthly_depreciation", db.Integer, nullable=True),
+        db.Column("registration_fee", db.Integer, nullable=True),
+        db.Column("discounts", db.Integer, nullable=True),
+        db.Column("updated_at", db.DateTime),
+    ),
+    Table(
+        "forecast_monthly", FROZEN_SCHEMA,
+        db.Column("month", db.Date, primary_key=True),
+        db.Column("vehicle_type", db.String(50), primary_key=True),
+        db.Column("financier", db.String(80), primary_key=True),
+        db.Column("depreciation", db.BigInteger, nullable=False),
+        db.Column("book_value", db.BigInteger, nullable=False),
+        db.Column("asset_count", db.Integer, nullable=False),
+    ),
+    Table(
+        "asset_forecast_state", FROZEN_SCHEMA,
+        db.Column("asset_id", db.Integer, primary_key=True),
+        db.Column("first_registration_date", db.Date, nullable=False),
+        db.Column("term_months", db.Integer, nullable=False),
+        db.Column("monthly_depreciation", db.Integer, nullable=False),
+        db.Column("price_new", db.Integer, nullable=False),
+        db.Column("vehicle_type", db.String(50), nullable=False),
+        db.Column("financier", db.String(80), nullable=False),
+    ),
+    Table(
+        "job_checkpoints", FROZEN_SCHEMA,
+        db.Column("name", db.String(50), primary_key=True),
+        db.Column("last_id", db.Integer, nullable=False),
+        db.Column("updated_at", db.DateTime),
+    ),
+    Table(
+        "jobs", FROZEN_SCHEMA,
+        db.Column("id", db.Integer, primary_key=True),
+        db.Column("kind", db.String(50), nullable=False),
+        db.Column("inspection_id", db.Integer, nullable=True, index=True),
+        db.Column("status", db.String(20), nullable=False),
+        db.Column("attempts", db.Integer, nullable=False),
+        db.Column("run_after", db.DateTime, nullable=False),
+        db.Column("locked_at", db.DateTime, nullable=True),
+        db.Column("locked_by", db.String(100), nullable=True),
+        db.Column("last_error", db.Text, nullable=True),
+        db.Column("created_at", db.DateTime),
+        db.Column("updated_at", db.DateTime),
+        db.Index("ix_jobs_status_run_after", "status", "run_after"),
+    ),
+]
+
+
+def migrate_create_tables(conn):
+    """Create the inspections table as the app first shipped it; migration 2 adds the later columns."""
+    BASELINE_INSPECTIONS.create(conn, checkfirst=True)
+
+
+def migrate_inspection_columns(conn):
+    """Add columns introduced after the first inspections table shipped."""
+    existing_columns = {column["name"] for column in inspect(conn).get_columns("inspections")}
+    binary_type = "BYTEA" if conn.dialect.name == "postgresql" else "BLOB"
+    columns = [
+        ("cost_estimate", "INTEGER"),
+        ("accepted_cost", "INTEGER"),
+        ("status_admin", "VARCHAR(30) DEFAULT 'Pending'"),
+        ("status_reviewer", "VARCHAR(20) DEFAULT 'Pending'"),
+        ("comment_admin", "TEXT"),
+        ("comment_reviewer", "TEXT"),
+        ("pdf_data", binary_type),
+        ("pdf_size", "INTEGER"),
+        ("pdf_sha256", "VARCHAR(64)"),
+        ("pdf_text", "TEXT"),
+        ("pdf_page_count", "INTEGER"),
+        ("pdf_thumbnail_sha256", "VARCHAR(64)"),
+        ("pdf_processed_at", "TIMESTAMP"),
+    ]
+    for name, ddl in columns:
         if name not in existing_columns:
-            ddl_statements.append(f"ALTER TABLE inspections ADD COLUMN {name} {ddl}")
+            conn.execute(text(f"ALTER TABLE inspections ADD COLUMN {name} {ddl}"))
+    if "pdf_size" not in existing_columns:
+        backfill_pdf_sizes(conn)
+
+
+def backfill_pdf_sizes(conn):
+    """Populate pdf_size for rows created before the column existed."""
+    conn.execute(text(
+        "UPDATE inspections SET pdf_size = LENGTH(pdf_data) "
+        "WHERE pdf_size IS NULL AND pdf_data IS NOT NULL"
+    ))
+    disk_only = conn.execute(text(
+        "SELECT id, pdf_filename FROM inspections WHERE pdf_size IS NULL"
+    )).all()
+    for inspection_id, pdf_filename in disk_only:
+        file_path = os.path.join(current_app.config["UPLOAD_FOLDER"], pdf_filename)
+        if os.path.exists(file_path):
+            conn.execute(
+                text("UPDATE inspections SET pdf_size = :size WHERE id = :id"),
+                {"size": os.path.getsize(file_path), "id": inspection_id},
+            )
+
+
+def migrate_listing_indexes(conn):
+    """Keyset pagination, blob lookup and registration/dealer substring search."""
+    create_index(conn, "ix_inspections_created_at_id", "ON inspections (created_at, id)")
+    create_index(conn, "ix_inspections_pdf_sha256", "ON inspections (pdf_sha256)")
+
+    if conn.dialect.name == "postgresql":
+        try:
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except DatabaseError:
+            current_app.logger.warning("pg_trgm is unavailable; search falls back to sequential scans")
+            return
+        create_index(conn, "ix_inspections_registration_trgm",
+                     "ON inspections USING gin (registration_number gin_trgm_ops)")
+        create_index(conn, "ix_inspections_dealer_trgm",
+                     "ON inspections USING gin (dealer_name gin_trgm_ops)")
+    elif conn.dialect.name == "sqlite":
+        fts_exists = "inspections_fts" in inspect(conn).get_table_names()
+        for statement in [
+            "CREATE VIRTUAL TABLE IF NOT EXISTS inspections_fts USING fts5("
+            "registration_number, dealer_name, "
+            "content='inspections', content_rowid='id', tokenize='trigram')",
+            "CREATE TRIGGER IF NOT EXISTS inspections_fts_ai AFTER INSERT ON inspections BEGIN "
+            "INSERT INTO inspections_fts(rowid, registration_number, dealer_name) "
+            "VALUES (new.id, new.registration_number, new.dealer_name); END",
+            "CREATE TRIGGER IF NOT EXISTS inspections_fts_ad AFTER DELETE ON inspections BEGIN "
+            "INSERT INTO inspections_fts(inspections_fts, rowid, registration_number, dealer_name) "
+            "VALUES ('delete', old.id, old.registration_number, old.dealer_name); END",
+            "CREATE TRIGGER IF NOT EXISTS inspections_fts_au "
+            "AFTER UPDATE OF registration_number, dealer_name ON inspections BEGIN "
+            "INSERT INTO inspections_fts(inspections_fts, rowid, registration_number, dealer_name) "
+            "VALUES ('delete', old.id, old.registration_number, old.dealer_name); "
+            "INSERT INTO inspections_fts(rowid, registration_number, dealer_name) "
+            "VALUES (new.id, new.registration_number, new.dealer_name); END",
+        ]:
+            conn.execute(text(statement))
+        if not fts_exists:
+            conn.execute(text("INSERT INTO inspections_fts(inspections_fts) VALUES ('rebuild')"))
+
+
+def search_vector_sql(row: str) -> str:
+    """The weighted tsvector of one inspections row, e.g. ``NEW`` in a trigger."""
+    return (
+        f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce({row}.comment_admin, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce({row}.comment_reviewer, '')), 'A') || "
+        f"setweight(to_tsvector('{SEARCH_TEXT_CONFIG}', coalesce({row}.pdf_text, '')), 'B')"
+    )
+
+
+def migrate_text_search(conn):
+    """Word index over PDF text and comments, kept current on every write.
+
+    On Postgres a generated column would rewrite the whole table under an
+    ACCESS EXCLUSIVE lock. Instead a nullable column is added (a catalog-only
+    change), a trigger fills it on every write, existing rows are backfilled
+    in short batches and the GIN index is built concurrently. Each step can be
+    re-run if the deploy is interrupted.
+    """
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE inspections ADD COLUMN IF NOT EXISTS search_vector tsvector"))
+        conn.execute(text(
+            "CREATE OR REPLACE FUNCTION inspections_search_vector_update() RETURNS trigger AS $$ BEGIN "
+            f"NEW.search_vector := {search_vector_sql('NEW')}; RETURN NEW; END $$ LANGUAGE plpgsql"
+        ))
+        # One query string, so the trigger is never missing between the two statements.
+        conn.execute(text(
+            "DROP TRIGGER IF EXISTS inspections_search_vector ON inspections; "
+            "CREATE TRIGGER inspections_search_vector "
+            "BEFORE INSERT OR UPDATE OF comment_admin, comment_reviewer, pdf_text ON inspections "
+            "FOR EACH ROW EXECUTE FUNCTION inspections_search_vector_update()"
+        ))
+        backfill = text(
+            f"UPDATE inspections SET search_vector = {search_vector_sql('inspections')} "
+            "WHERE id IN (SELECT id FROM inspections WHERE id > :after AND search_vector IS NULL "
+            "ORDER BY id LIMIT :batch_size) RETURNING id"
+        )
+        after = 0
+        while True:
+            params = {"after": after, "batch_size": SEARCH_VECTOR_BACKFILL_BATCH_SIZE}
+            ids = conn.execute(backfill, params).scalars().all()
+            if not ids:
+                break
+            after = max(ids)
+        create_index(conn, "ix_inspections_search_vector", "ON inspections USING gin (search_vector)")
+    elif conn.dialect.name == "sqlite":
+        text_fts_exists = "inspections_text_fts" in inspect(conn).get_table_names()
+        for statement in [
+            "CREATE VIRTUAL TABLE IF NOT EXISTS inspections_text_fts USING fts5("
+            "pdf_text, comment_admin, comment_reviewer, "
+            "content='inspections', content_rowid='id', tokenize='unicode61')",
+            "CREATE TRIGGER IF NOT EXISTS inspections_text_fts_ai AFTER INSERT ON inspections BEGIN "
+            "INSERT INTO inspections_text_fts(rowid, pdf_text, comment_admin, comment_reviewer) "
+            "VALUES (new.id, new.pdf_text, new.comment_admin, new.comment_reviewer); END",
+            "CREATE TRIGGER IF NOT EXISTS inspections_text_fts_ad AFTER DELETE ON inspections BEGIN "
+            "INSERT INTO inspections_text_fts(inspections_text_fts, rowid, pdf_text, comment_admin, comment_reviewer) "
+            "VALUES ('delete', old.id, old.pdf_text, old.comment_admin, old.comment_reviewer); END",
+            "CREATE TRIGGER IF NOT EXISTS inspections_text_fts_au "
+            "AFTER UPDATE OF pdf_text, comment_admin, comment_reviewer ON inspections BEGIN "
+            "INSERT INTO inspections_text_fts(inspections_text_fts, rowid, pdf_text, comment_admin, comment_reviewer) "
+            "VALUES ('delete', old.id, old.pdf_text, old.comment_admin, old.comment_reviewer); "
+            "INSERT INTO inspections_text_fts(rowid, pdf_text, comment_admin, comment_reviewer) "
+            "VALUES (new.id, new.pdf_text, new.comment_admin, new.comment_reviewer); END",
+        ]:
+            conn.execute(text(statement))
+        if not text_fts_exists:
+            conn.execute(text("INSERT INTO inspections_text_fts(inspections_text_fts) VALUES ('rebuild')"))
+
+
+def seed_data_versions(conn, names) -> None:
+    table = FROZEN_DATA_VERSIONS
+    table.create(conn, checkfirst=True)
+    existing = set(conn.execute(select(table.c.name)).scalars())
+    missing = [{"name": name, "version": 0} for name in names if name not in existing]
+    if missing:
+        conn.execute(table.insert(), missing)
+
+
+def migrate_seed_data_versions(conn):
+    seed_data_versions(conn, ("inspections", "assets"))
+
+
+FROZEN_INSPECTION_EVENTS = Table(
+    "inspection_events", FROZEN_SCHEMA,
+    db.Column("id", db.Integer, primary_key=True),
+    db.Column("inspection_id", db.Integer, nullable=False),
+    db.Column("field", db.String(30), nullable=False),
+    db.Column("old_value", db.String(30), nullable=True),
+    db.Column("new_value", db.String(30), nullable=False),
+    db.Column("actor", db.String(50), nullable=True),
+    db.Column("created_at", db.DateTime, nullable=False),
+    db.Index("ix_inspection_events_field_created_at", "field", "created_at"),
+    db.Index("ix_inspection_events_inspection_id_created_at", "inspection_id", "created_at"),
+)
+
+
+def migrate_inspection_events(conn):
+    """Status event log, seeded with each existing inspection's current status."""
+    events = FROZEN_INSPECTION_EVENTS
+    events.create(conn, checkfirst=True)
+    inspections = BASELINE_INSPECTIONS
+    now = datetime.utcnow()
+    for field in STATUS_FIELDS:
+        conn.execute(events.insert().from_select(
+            ["inspection_id", "field", "new_value", "created_at"],
+            select(
+                inspections.c.id,
+                literal(field),
+                func.coalesce(inspections.c[field], "Pending"),
+                literal(now, db.DateTime),
+            ),
+        ))
+
+
+FROZEN_INSPECTIONS_ARCHIVE = Table(
+    "inspections_archive", FROZEN_SCHEMA,
+    db.Column("id", db.Integer, primary_key=True, autoincrement=False),
+    db.Column("created_at", db.DateTime, primary_key=True),
+    db.Column("registration_number", db.String(50), nullable=False, index=True),
+    db.Column("dealer_name", db.String(120), nullable=True),
+    db.Column("pdf_filename", db.String(255), nullable=False),
+    db.Column("pdf_data", db.LargeBinary, nullable=True),
+    db.Column("pdf_size", db.Integer, nullable=True),
+    db.Column("pdf_sha256", db.String(64), nullable=True, index=True),
+    db.Column("pdf_text", db.Text, nullable=True),
+    db.Column("pdf_page_count", db.Integer, nullable=True),
+    db.Column("pdf_thumbnail_sha256", db.String(64), nullable=True),
+    db.Column("pdf_processed_at", db.DateTime, nullable=True),
+    db.Column("cost_estimate", db.Integer, nullable=True),
+    db.Column("accepted_cost", db.Integer, nullable=True),
+    db.Column("status_admin", db.String(30), nullable=True),
+    db.Column("status_reviewer", db.String(20), nullable=True),
+    db.Column("comment_admin", db.Text, nullable=True),
+    db.Column("comment_reviewer", db.Text, nullable=True),
+    db.Column("updated_at", db.DateTime, nullable=True),
+    db.Column("archived_at", db.DateTime, nullable=False),
+    db.Index("ix_inspections_archive_created_at_id", "created_at", "id"),
+    postgresql_partition_by="RANGE (created_at)",
+)
+
+
+def migrate_inspection_archive(conn):
+    # Partitions are created per month by archive_inspections as rows arrive.
+    FROZEN_INSPECTIONS_ARCHIVE.create(conn, checkfirst=True)
+
+
+def migrate_inspection_created_at(conn):
+    """Give every inspection a keyset position: backfill created_at and require it.
+
+    SQLite cannot add NOT NULL to an existing column without rebuilding the
+    table; there the backfill plus the model default keep it filled.
+    """
+    # The frozen table has no onupdate default, so backfilled rows keep their updated_at.
+    table = BASELINE_INSPECTIONS
+    conn.execute(
+        table.update()
+        .where(table.c.created_at.is_(None))
+        .values(created_at=func.coalesce(table.c.updated_at, literal(datetime.utcnow(), db.DateTime)))
+    )
+    if conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE inspections ALTER COLUMN created_at SET NOT NULL"))
+
+
+def migrate_support_tables(conn):
+    """Tables that databases created before migrations got from migration 1; a no-op there."""
+    for table in FROZEN_SUPPORT_TABLES:
+        table.create(conn, checkfirst=True)
+
+
+FROZEN_STATUS_BACKLOG_DAILY = Table(
+    "status_backlog_daily", FROZEN_SCHEMA,
+    db.Column("field", db.String(30), primary_key=True),
+    db.Column("day", db.Date, primary_key=True),
+    db.Column("status", db.String(30), primary_key=True),
+    db.Column("count", db.Integer, nullable=False),
+)
+
+
+def migrate_status_backlog_snapshots(conn):
+    """Daily backlog snapshots, plus the data version that report caches key on."""
+    FROZEN_STATUS_BACKLOG_DAILY.create(conn, checkfirst=True)
+    seed_data_versions(conn, ("status_events",))
+
+
+def migrate_archive_search_indexes(conn):
+    """Registration/dealer substring search over the archive, indexed like migration 3 does for inspections."""
+    if conn.dialect.name == "postgresql":
+        if conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is None:
+            current_app.logger.warning("pg_trgm is unavailable; archive search falls back to sequential scans")
+            return
+        # CONCURRENTLY is not supported on partitioned tables. A plain build
+        # blocks only writes, and the archive is written by the nightly job alone.
+        for name, column in (("ix_inspections_archive_registration_trgm", "registration_number"),
+                             ("ix_inspections_archive_dealer_trgm", "dealer_name")):
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {name} ON inspections_archive USING gin ({column} gin_trgm_ops)"
+            ))
+    elif conn.dialect.name == "sqlite":
+        # The archive's primary key is (id, created_at), so the index follows the implicit rowid.
+        for statement in [
+            "CREATE VIRTUAL TABLE IF NOT EXISTS inspections_archive_fts USING fts5("
+            "registration_number, dealer_name, content='inspections_archive', tokenize='trigram')",
+            "CREATE TRIGGER IF NOT EXISTS inspections_archive_fts_ai AFTER INSERT ON inspections_archive BEGIN "
+            "INSERT INTO inspections_archive_fts(rowid, registration_number, dealer_name) "
+            "VALUES (new.rowid, new.registration_number, new.dealer_name); END",
+            "CREATE TRIGGER IF NOT EXISTS inspections_archive_fts_ad AFTER DELETE ON inspections_archive BEGIN "
+            "INSERT INTO inspections_archive_fts(inspections_archive_fts, rowid, registration_number, dealer_name) "
+            "VALUES ('delete', old.rowid, old.registration_number, old.dealer_name); END",
+            "CREATE TRIGGER IF NOT EXISTS inspections_archive_fts_au "
+            "AFTER UPDATE OF registration_number, dealer_name ON inspections_archive BEGIN "
+            "INSERT INTO inspections_archive_fts(inspections_archive_fts, rowid, registration_number, dealer_name) "
+            "VALUES ('delete', old.rowid, old.registration_number, old.dealer_name); "
+            "INSERT INTO inspections_archive_fts(rowid, registration_number, dealer_name) "
+            "VALUES (new.rowid, new.registration_number, new.dealer_name); END",
+            "INSERT INTO inspections_archive_fts(inspections_archive_fts) VALUES ('rebuild')",
+        ]:
+            conn.execute(text(statement))
+
+
+MIGRATIONS = [
+    Migration(1, "create tables", migrate_create_tables),
+    Migration(2, "inspection columns", migrate_inspection_columns),
+    Migration(3, "listing and identifier search indexes", migrate_listing_indexes, transactional=False),
+    Migration(4, "full-text search over PDF text and comments", migrate_text_search, transactional=False),
+    Migration(5, "seed data versions", migrate_seed_data_versions),
+    Migration(6, "inspection status events", migrate_inspection_events),
+    Migration(7, "inspection archive", migrate_inspection_archive),
+    Migration(8, "require inspection created_at", migrate_inspection_created_at),
+    Migration(9, "asset, forecast and job tables", migrate_support_tables),
+    Migration(10, "status backlog snapshots", migrate_status_backlog_snapshots),
+    Migration(11, "archive search indexes", migrate_archive_search_indexes),
+]
+
+
+def migrate_database(log=None) -> List[Migration]:
+    return run_migrations(db.engine, MIGRATIONS, log=log)
+
+
+def require_current_schema():
+    """Refuse requests until `flask migrate` has run, instead of failing on a missing table.
+
+    Checked once per process: after the first request finds nothing pending,
+    later requests skip the query.
+    """
+    if current_app.extensions.get("schema_current"):
+        return None
+    pending = pending_migrations(db.engine, MIGRATIONS)
+    if pending:
+        versions = ", ".join(f"{migration.version:04d}" for migration in pending)
+        current_app.logger.error("Database schema is out of date (pending %s); run `flask --app app migrate`", versions)
+        abort(503, description="The database schema is out of date. Run `flask --app app migrate` and retry.")
+    current_app.extensions["schema_current"] = True
+    return None
+
+
+def bump_data_version(name: str, conn=None) -> None:
+    """Invalidate cached views of ``name``; runs inside the caller's transaction."""
+    table = DataVersion.__table__
+    statement = table.update().where(table.c.name == name).values(version=table.c.version + 1)
+    (conn or db.session).execute(statement)
+
+
+def current_data_versions() -> Dict[str, int]:
+    return dict(db.session.query(DataVersion.name, DataVersion.version).all())
+
+
+def status_event(inspection_id: int, field: str, old_value: Optional[str], new_value: str,
+                 actor: Optional[str]) -> Dict[str, Any]:
+    return {
+        "inspection_id": inspection_id,
+        "field": field,
+        "old_value": old_value,
+        "new_value": new_value,
+        "actor": actor,
+    }
+
+
+def initial_status_events(inspection_ids: List[int], actor: Optional[str]) -> List[Dict[str, Any]]:
+    return [
+        status_event(inspection_id, field, None, "Pending", actor)
+        for inspection_id in inspection_ids
+        for field in STATUS_FIELDS
+    ]
+
+
+def status_change_events(inspection: "Inspection", actor: Optional[str]) -> List[Dict[str, Any]]:
+    """Events for the status fields changed on ``inspection`` since it was loaded."""
+    state = inspect(inspection)
+    events = []
+    for field in STATUS_FIELDS:
+        history = state.attrs[field].history
+        if history.added and history.deleted and history.added[0] != history.deleted[0]:
+            events.append(status_event(inspection.id, field, history.deleted[0], history.added[0], actor))
+    return events
+
 
+def record_status_events(events: List[Dict[str, Any]], conn=None) -> None:
+    """Append to inspection_events inside the caller's transaction."""
+    if events:
+        (conn or db.session).execute(InspectionEvent.__table__.insert(), events)
+        bump_data_version("status_events", conn)
+
+
+def asset_forecast_inputs(asset_row) -> dict[str, Any]:
+    """Normalise an asset's forecast inputs the way AssetForecastState stores them."""
+    return {
+        "asset_id": asset_row.id,
+        "first_registration_date": asset_row.first_registration_date,
+        "term_months": asset_row.term_months or 0,
+        "monthly_depreciation": asset_row.monthly_depreciation or 0,
+        "price_new": asset_row.price_new or 0,
+        "vehicle_type": asset_row.vehicle_type or "",
+        "financier": asset_row.financier or "",
+    }
+
+
+def accumulate_contributions(totals: dict, inputs: list[dict], sign: int) -> None:
+    groups = sorted({(row["vehicle_type"], row["financier"]) for row in inputs})
+    group_ids = {group: idx for idx, group in enumerate(groups)}
+    group_idx, months, depreciation, book_value, asset_count = rollup_contributions(
+        [group_ids[(row["vehicle_type"], row["financier"])] for row in inputs],
+        [month_index(row["first_registration_date"]) for row in inputs],
+        [row["term_months"] for row in inputs],
+        [row["monthly_depreciation"] for row in inputs],
+        [row["price_new"] for row in inputs],
+    )
+    for g, m, dep, value, count in zip(
+        group_idx.tolist(), months.tolist(), depreciation.tolist(), book_value.tolist(), asset_count.tolist()
+    ):
+        key = (*groups[g], m)
+        current = totals.setdefault(key, [0, 0, 0])
+        current[0] += sign * dep
+        current[1] += sign * value
+        current[2] += sign * count
+
+
+def refresh_forecast_rollup(full: bool = False) -> int:
+    """Bring forecast_monthly up to date and return the number of assets re-applied.
+
+    Only assets whose forecast inputs differ from AssetForecastState (plus new
+    and deleted assets) are subtracted from and re-added to the rollup, and
+    only the asset groups they touch are rewritten.
+    """
+    state_columns = [getattr(AssetForecastState, name) for name in FORECAST_INPUT_COLUMNS]
+    asset_columns = [
+        Asset.first_registration_date,
+        db.func.coalesce(Asset.term_months, 0),
+        db.func.coalesce(Asset.monthly_depreciation, 0),
+        db.func.coalesce(Asset.price_new, 0),
+        db.func.coalesce(Asset.vehicle_type, ""),
+        db.func.coalesce(Asset.financier, ""),
+    ]
+
+    if full:
+        db.session.query(ForecastMonthly).delete()
+        db.session.query(AssetForecastState).delete()
+        changed_ids = None
+        stale_states = []
+    else:
+        changed = or_(AssetForecastState.asset_id.is_(None), *[
+            asset_col.is_distinct_from(state_col) for asset_col, state_col in zip(asset_columns, state_columns)
+        ])
+        # Assets without a registration date are not forecast and never get a
+        # state row; leaving them out keeps them from counting as changed forever.
+        changed_ids = [
+            row.id for row in db.session.query(Asset.id)
+            .outerjoin(AssetForecastState, AssetForecastState.asset_id == Asset.id)
+            .filter(Asset.first_registration_date.isnot(None), changed)
+        ]
+        stale_states = (
+            AssetForecastState.query
+            .outerjoin(Asset, Asset.id == AssetForecastState.asset_id)
+            .filter(or_(Asset.id.is_(None), Asset.first_registration_date.is_(None), Asset.id.in_(changed_ids)))
+            .all()
+        )
+
+    assets_query = db.session.query(
+        Asset.id, Asset.first_registration_date, Asset.term_months, Asset.monthly_depreciation,
+        Asset.price_new, Asset.vehicle_type, Asset.financier,
+    ).filter(Asset.first_registration_date.isnot(None))
+    if changed_ids is not None:
+        assets_query = assets_query.filter(Asset.id.in_(changed_ids))
+    new_inputs = [asset_forecast_inputs(row) for row in assets_query]
+    old_inputs = [
+        {"asset_id": state.asset_id, **{name: getattr(state, name) for name in FORECAST_INPUT_COLUMNS}}
+        for state in stale_states
+    ]
+    if not new_inputs and not old_inputs:
+        db.session.commit()
+        return 0
+
+    deltas: dict = {}
+    accumulate_contributions(deltas, old_inputs, -1)
+    accumulate_contributions(deltas, new_inputs, 1)
+
+    touched_groups = {(vehicle_type, financier) for vehicle_type, financier, _ in deltas}
+    totals: dict = {}
+    for group in touched_groups:
+        group_filter = {"vehicle_type": group[0], "financier": group[1]}
+        for row in ForecastMonthly.query.filter_by(**group_filter):
+            totals[(row.vehicle_type, row.financier, month_index(row.month))] = [
+                row.depreciation, row.book_value, row.asset_count,
+            ]
+        ForecastMonthly.query.filter_by(**group_filter).delete()
+    for key, (dep, value, count) in deltas.items():
+        current = totals.setdefault(key, [0, 0, 0])
+        current[0] += dep
+        current[1] += value
+        current[2] += count
+
+    rollup_rows = [
+        {
+            "month": month_start(m), "vehicle_type": vehicle_type, "financier": financier,
+            "depreciation": dep, "book_value": value, "asset_count": count,
+        }
+        for (vehicle_type, financier, m), (dep, value, count) in totals.items()
+        if count
+    ]
+    if rollup_rows:
+        db.session.execute(ForecastMonthly.__table__.insert(), rollup_rows)
+
+    stale_ids = [row["asset_id"] for row in old_inputs]
+    if stale_ids:
+        AssetForecastState.query.filter(AssetForecastState.asset_id.in_(stale_ids)).delete(
+            synchronize_session=False
+        )
+    if new_inputs:
+        db.session.execute(AssetForecastState.__table__.insert(), new_inputs)
+    bump_data_version("assets")
+    db.session.commit()
+    return len(new_inputs) + len(old_inputs)
+
+
+def rollup_forecast(current_date: date, horizon_months: int = 12) -> Optional[dict[str, Any]]:
+    """Read the dashboard forecast (book value per asset group, depreciation per month) from the rollup."""
+    start = first_of_month(current_date)
+    months = [add_months(start, offset) for offset in range(horizon_months)]
+    rollup_rows = (
+        ForecastMonthly.query
+        .filter(ForecastMonthly.month >= months[0], ForecastMonthly.month <= months[-1])
+        .order_by(ForecastMonthly.vehicle_type, ForecastMonthly.financier, ForecastMonthly.month)
+        .all()
+    )
+    if not rollup_rows:
+        return None
+
+    position = {month: idx for idx, month in enumerate(months)}
+    groups: dict = {}
+    depreciation_totals = [0 for _ in months]
+    for row in rollup_rows:
+        values = groups.setdefault((row.vehicle_type, row.financier), [None for _ in months])
+        values[position[row.month]] = row.book_value
+        depreciation_totals[position[row.month]] += row.depreciation
+
+    return {
+        "months": [month.strftime("%Y-%m") for month in months],
+        "rows": [
+            {"asset": f"{vehicle_type or 'Unspecified'} · {financier or 'Unspecified'}", "values": values}
+            for (vehicle_type, financier), values in groups.items()
+        ],
+        "depreciation_totals": [total if total else None for total in depreciation_totals],
+    }
+
+
+# Engines whose pool the gauges below report. A server process builds one app,
+# so each gauge reads one pool; apps built by tests and benchmarks drop out
+# once they are garbage collected instead of replacing each other's gauges.
+_metered_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _pool_gauge(read: Callable[[QueuePool], int]) -> Callable[[], int]:
+    # engine.pool is read at scrape time: dispose() (e.g. after a fork) swaps it.
+    return lambda: sum(read(engine.pool) for engine in list(_metered_engines) if isinstance(engine.pool, QueuePool))
+
+
+REGISTRY.register(Gauge("db_pool_size", "Configured pool size.", _pool_gauge(QueuePool.size)))
+REGISTRY.register(Gauge("db_pool_checked_out", "Connections currently checked out.", _pool_gauge(QueuePool.checkedout)))
+REGISTRY.register(Gauge("db_pool_overflow", "Connections open beyond the pool size.", _pool_gauge(QueuePool.overflow)))
+
+
+def register_pool_metrics(engine) -> None:
+    if isinstance(engine.pool, QueuePool):
+        _metered_engines.add(engine)
+
+
+def search_filter(q: str):
+    """Build the dashboard search clause, routed through the trigram index when possible."""
+    needle = q.lower()
+    matching_admin = [s for s in ADMIN_STATUSES if needle in s.lower()]
+    matching_reviewer = [s for s in REVIEWER_STATUSES if needle in s.lower()]
+    clauses = [
+        Inspection.status_admin.in_(matching_admin),
+        Inspection.status_reviewer.in_(matching_reviewer),
+    ]
+
+    dialect = db.engine.url.get_dialect().name
+    if dialect == "sqlite" and len(q) >= MIN_INDEXED_SEARCH_LENGTH:
+        phrase = '"' + q.replace('"', '""') + '"'
+        clauses.append(Inspection.id.in_(
+            text("SELECT rowid FROM inspections_fts WHERE inspections_fts MATCH :phrase")
+            .bindparams(phrase=phrase)
+        ))
+    else:
+        like = f"%{q}%"
+        clauses += [
+            Inspection.registration_number.ilike(like),
+            Inspection.dealer_name.ilike(like),
+        ]
+    return or_(*clauses)
+
+
+def fts5_word_query(q: str) -> Optional[str]:
+    """Quote each word so user input is never parsed as FTS5 query syntax."""
+    words = re.findall(r"\w+", q)
+    return " ".join(f'"{word}"' for word in words) if words else None
+
+
+def text_search(q: str):
+    """Return ``(join, match, rank)`` for word search over PDF text and comments.
+
+    ``join`` is a selectable to outer-join on inspections.id (SQLite) or None,
+    ``match`` the where-clause and ``rank`` a higher-is-better score. Returns
+    None when the query is too short or has no words.
+    """
+    if len(q) < MIN_INDEXED_SEARCH_LENGTH:
+        return None
+    dialect = db.engine.url.get_dialect().name
+    if dialect == "postgresql":
+        query = func.websearch_to_tsquery(literal_column(f"'{SEARCH_TEXT_CONFIG}'"), q)
+        vector = literal_column("inspections.search_vector")
+        # ts_rank_cd is float4; as float8 the value round-trips through a cursor exactly.
+        return None, vector.op("@@")(query), func.ts_rank_cd(vector, query).cast(db.Float)
+    if dialect == "sqlite":
+        word_query = fts5_word_query(q)
+        if word_query is None:
+            return None
+        matches = (
+            text(
+                "SELECT rowid AS id, bm25(inspections_text_fts, 1.0, 2.0, 2.0) AS score "
+                "FROM inspections_text_fts WHERE inspections_text_fts MATCH :word_query"
+            )
+            .bindparams(word_query=word_query)
+            .columns(id=db.Integer, score=db.Float)
+            .subquery("text_matches")
+        )
+        # bm25() is lower-is-better.
+        return matches, matches.c.id.isnot(None), -func.coalesce(matches.c.score, 0.0)
+    return None
+
+
+def search_inspections(q: str, raw_cursor: str) -> tuple[List["Inspection"], Optional[str]]:
+    """One page of search results and the cursor of the next page, if any.
+
+    Registration/dealer/status hits come first, newest first, paged by the
+    same (created_at, id) keyset as the plain listing. PDF text and comment
+    matches that are not also identifier hits follow, best first, paged by a
+    (rank, id) keyset, so only that part of the results pays for ranking.
+    """
+    phase, position = decode_search_cursor(raw_cursor) or ("created", None)
+    identifier_match = search_filter(q)
+    inspections: List[Inspection] = []
+    if phase == "created":
+        query = Inspection.query.options(load_only(*DASHBOARD_COLUMNS)).filter(identifier_match)
+        if position:
+            query = query.filter(tuple_(Inspection.created_at, Inspection.id) < position)
+        inspections = query.order_by(Inspection.created_at.desc(), Inspection.id.desc()).limit(PAGE_SIZE + 1).all()
+        if len(inspections) > PAGE_SIZE:
+            return inspections[:PAGE_SIZE], encode_cursor(inspections[PAGE_SIZE - 1])
+        position = None
+
+    words = text_search(q)
+    if words is None:
+        return inspections, None
+    join, text_match, rank = words
+    query = db.session.query(Inspection, rank).options(load_only(*DASHBOARD_COLUMNS))
+    if join is not None:
+        query = query.join(join, join.c.id == Inspection.id)
+    query = query.filter(text_match, not_(func.coalesce(identifier_match, False)))
+    if position:
+        query = query.filter(tuple_(rank, Inspection.id) < position)
+    remaining = PAGE_SIZE - len(inspections)
+    rows = query.order_by(rank.desc(), Inspection.id.desc()).limit(remaining + 1).all()
+    inspections += [inspection for inspection, _ in rows[:remaining]]
+    if len(rows) <= remaining:
+        return inspections, None
+    if not remaining:
+        # The identifier hits filled this page exactly; text matches start the next.
+        return inspections, RANK_CURSOR_PREFIX
+    last, last_rank = rows[remaining - 1]
+    return inspections, f"{RANK_CURSOR_PREFIX}{last_rank!r}_{last.id}"
+
+
+def search_snippets(q: str, inspection_ids: List[int]) -> Dict[int, Markup]:
+    """Highlighted excerpts of PDF text/comments, computed only for the rows shown."""
+    if not inspection_ids or text_search(q) is None:
+        return {}
     dialect = db.engine.url.get_dialect().name
-    binary_type = "BYTEA" if dialect == "postgresql" else "BLOB"
+    ids = bindparam("ids", inspection_ids, expanding=True)
+    if dialect == "postgresql":
+        statement = text(
+            f"SELECT id, ts_headline('{SEARCH_TEXT_CONFIG}', "
+            "left(concat_ws(' … ', comment_admin, comment_reviewer, pdf_text), :chars), "
+            f"websearch_to_tsquery('{SEARCH_TEXT_CONFIG}', :q), :options) "
+            f"FROM inspections WHERE id IN :ids "
+            f"AND search_vector @@ websearch_to_tsquery('{SEARCH_TEXT_CONFIG}', :q)"
+        ).bindparams(
+            ids, q=q, chars=SNIPPET_SOURCE_CHARS,
+            options=f"StartSel={SNIPPET_START}, StopSel={SNIPPET_STOP}, "
+                    "MaxFragments=2, MaxWords=18, MinWords=6, FragmentDelimiter=\" … \"",
+        )
+    else:
+        statement = text(
+            "SELECT rowid, snippet(inspections_text_fts, -1, :start, :stop, '…', 16) "
+            "FROM inspections_text_fts WHERE inspections_text_fts MATCH :word_query AND rowid IN :ids"
+        ).bindparams(ids, start=SNIPPET_START, stop=SNIPPET_STOP, word_query=fts5_word_query(q))
+
+    snippets = {}
+    for inspection_id, raw in db.session.execute(statement):
+        if raw and SNIPPET_START in raw:
+            html = str(escape(raw)).replace(SNIPPET_START, "<mark>").replace(SNIPPET_STOP, "</mark>")
+            snippets[inspection_id] = Markup(html)
+    return snippets
+
+
+def streamed_rows(statement):
+    """Execute ``statement`` and yield its rows a batch at a time instead of loading them all."""
+    yield from db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+
+def streamed_batches(statement):
+    """Like streamed_rows, but yield each fetched batch as a list."""
+    yield from db.session.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE)).partitions()
+
+
+def inspection_export_rows(q: str):
+    """Every inspection matching the dashboard search ``q`` (all if empty), newest first."""
+    query = select(*(getattr(Inspection, attr) for _, attr in INSPECTION_EXPORT_COLUMNS))
+    if q:
+        condition = search_filter(q)
+        words = text_search(q)
+        if words is not None:
+            join, text_match, _ = words
+            if join is not None:
+                query = query.outerjoin(join, join.c.id == Inspection.id)
+            condition = or_(condition, text_match)
+        query = query.where(condition)
+    return streamed_rows(query.order_by(Inspection.created_at.desc(), Inspection.id.desc()))
+
+
+def asset_export_rows():
+    return streamed_rows(
+        select(*(getattr(Asset, attr) for _, attr, _ in ASSET_COLUMNS)).order_by(Asset.id)
+    )
+
+
+def forecast_export_rows(months: List[date]):
+    """The forecast per asset, one batch at a time through forecast_matrix, followed by the depreciation totals."""
+    import numpy as np
+
+    depreciation_totals = np.zeros(len(months), dtype=np.int64)
+    statement = (
+        select(
+            Asset.registration_number, Asset.model, Asset.vehicle_type, Asset.financier,
+            Asset.first_registration_date, Asset.term_months, Asset.monthly_depreciation, Asset.price_new,
+        )
+        .where(Asset.first_registration_date.isnot(None))
+        .order_by(Asset.id)
+    )
+    for batch in streamed_batches(statement):
+        _, values, totals = forecast_matrix(FleetArrays.from_assets(batch), months[0], len(months))
+        depreciation_totals += totals
+        cells = np.where(np.ma.getmaskarray(values), None, values.data.astype(object)).tolist()
+        for asset, asset_values in zip(batch, cells):
+            yield [asset.registration_number, asset.model, asset.vehicle_type, asset.financier, *asset_values]
+    yield ["Sum depreciation / month", None, None, None, *(total or None for total in depreciation_totals.tolist())]
+
+
+def export_response(fmt: str, title: str, header: List[str], rows) -> Response:
+    """Stream an export as a download; the request context stays open until the last row."""
+    response = Response(
+        stream_with_context(stream_export(fmt, header, rows, sheet_name=title)),
+        content_type=EXPORT_FORMATS[fmt],
+    )
+    filename = f"{title.lower()}-{datetime.utcnow():%Y%m%d}.{fmt}"
+    response.headers["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response.headers["Cache-Control"] = "private, no-store"
+    # Let nginx pass chunks through instead of buffering the whole file.
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
-    add_column("cost_estimate", "INTEGER")
-    add_column("accepted_cost", "INTEGER")
-    add_column("status_admin", "VARCHAR(30) DEFAULT 'Pending'")
-    add_column("status_reviewer", "VARCHAR(20) DEFAULT 'Pending'")
-    add_column("comment_admin", "TEXT")
-    add_column("comment_reviewer", "TEXT")
-    add_column("pdf_data", binary_type)
 
-    if ddl_statements:
-        with db.engine.begin() as conn:
-            for ddl in ddl_statements:
-                conn.execute(text(ddl))
+def send_legacy_pdf(inspection: "Inspection") -> Optional[Response]:
+    """Serve a pre-blob-store PDF from the upload folder or pdf_data without moving it.
 
+    Moving it into the blob store is left to ``flask migrate-blobs``, so a GET
+    never writes.
+    """
+    file_path = inspection.pdf_file_path
+    if os.path.exists(file_path):
+        return send_file(file_path, mimetype="application/pdf", download_name=inspection.pdf_filename,
+                         as_attachment=False)
+    data = inspection.pdf_data
+    if not data:
+        return None
+    return send_file(BytesIO(data), mimetype="application/pdf", download_name=inspection.pdf_filename,
+                     as_attachment=False, etag=hashlib.sha256(data).hexdigest())
+
+
+def send_blob(digest: str, download_name: str, mimetype: str = "application/pdf",
+              store: Optional[BlobStore] = None) -> Response:
+    """Stream a stored blob with ETag, conditional GET and Range support."""
+    store = store or blob_store
+    path = store.local_path(digest)
+    if path:
+        return send_file(
+            path,
+            mimetype=mimetype,
+            download_name=download_name,
+            as_attachment=False,
+            etag=digest,
+        )
 
-with app.app_context():
-    db.create_all()
-    ensure_inspection_columns()
+    size = store.size(digest)
+    response = Response(
+        wrap_file(request.environ, store.open(digest)),
+        mimetype=mimetype,
+        direct_passthrough=True,
+    )
+    response.content_length = size
+    response.headers.set("Content-Disposition", "inline", filename=download_name)
+    response.cache_control.no_cache = True
+    response.set_etag(digest)
+    return response.make_conditional(request.environ, accept_ranges=True, complete_length=size)
+
+
+def stored_pdf_filename(original: str) -> str:
+    timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    return f"{timestamp}_{secure_filename(os.path.basename(original))}"
+
+
+def insert_ingested_inspections(items: List[Dict[str, Any]], batch_size: int,
+                                actor: Optional[str] = None) -> None:
+    """Insert a row for every stored bulk item, one transaction per batch.
+
+    Sets ``inspection_id`` on each inserted item; a failed batch marks its
+    items with an error and the remaining batches still go in. Their blobs
+    stay in the store, so re-sending the same files does not upload them twice.
+    """
+    stored = [item for item in items if item.get("pdf_sha256") and not item["error"]]
+    table = Inspection.__table__
+    insert = table.insert().returning(table.c.id, sort_by_parameter_order=True)
+    for start in range(0, len(stored), batch_size):
+        batch = stored[start:start + batch_size]
+        rows = [
+            {
+                "registration_number": item["registration_number"],
+                "dealer_name": item["dealer_name"],
+                "cost_estimate": item["cost_estimate"],
+                "pdf_filename": stored_pdf_filename(item["file"]),
+                "pdf_size": item["pdf_size"],
+                "pdf_sha256": item["pdf_sha256"],
+                "status_admin": "Pending",
+                "status_reviewer": "Pending",
+            }
+            for item in batch
+        ]
+        try:
+            with db.engine.begin() as conn:
+                ids = conn.execute(insert, rows).scalars().all()
+                record_status_events(initial_status_events(ids, actor), conn)
+                enqueue_jobs(PDF_PROCESSING_JOB, ids, conn)
+                bump_data_version("inspections", conn)
+        except SQLAlchemyError:
+            current_app.logger.exception("Bulk insert of %d inspections failed", len(batch))
+            for item in batch:
+                item["error"] = "Could not save inspection"
+            continue
+        for item, inspection_id in zip(batch, ids):
+            item["inspection_id"] = inspection_id
+
+
+def ingest_report(items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    results = []
+    for item in items:
+        created = "inspection_id" in item
+        results.append({
+            "line": item["line"],
+            "file": item["file"],
+            "registration_number": item["registration_number"],
+            "status": "created" if created else "failed",
+            "inspection_id": item.get("inspection_id"),
+            "error": None if created else item["error"] or "Not stored",
+        })
+    created = sum(result["status"] == "created" for result in results)
+    return {"created": created, "failed": len(results) - created, "items": results}
+
+
+def enqueue_jobs(kind: str, inspection_ids: List[int], conn=None) -> None:
+    """Queue one job per inspection inside the caller's transaction."""
+    if inspection_ids:
+        rows = [{"kind": kind, "inspection_id": inspection_id} for inspection_id in inspection_ids]
+        (conn or db.session).execute(Job.__table__.insert(), rows)
+
+
+def claim_jobs(worker_id: str, limit: int) -> List[Job]:
+    """Atomically mark up to ``limit`` due jobs as running for this worker.
+
+    Jobs left running by a worker that died are reclaimed once their lock is
+    older than JOB_LOCK_TIMEOUT_SECONDS. On Postgres, SKIP LOCKED lets several
+    workers claim concurrently without blocking on each other's rows.
+    """
+    now = datetime.utcnow()
+    lock_expired = now - timedelta(seconds=current_app.config["JOB_LOCK_TIMEOUT_SECONDS"])
+    table = Job.__table__
+    claimable = or_(
+        and_(table.c.status == "queued", table.c.run_after <= now),
+        and_(table.c.status == "running", table.c.locked_at < lock_expired),
+    )
+    candidates = (
+        select(table.c.id).where(claimable).order_by(table.c.id).limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    statement = (
+        table.update()
+        .where(table.c.id.in_(candidates), claimable)
+        .values(status="running", locked_at=now, locked_by=worker_id, attempts=table.c.attempts + 1)
+        .returning(table.c.id)
+    )
+    claimed_ids = db.session.execute(statement).scalars().all()
+    db.session.commit()
+    if not claimed_ids:
+        return []
+    return Job.query.filter(Job.id.in_(claimed_ids)).order_by(Job.id).all()
 
 
-@app.route("/login", methods=["GET", "POST"])
+def process_pdf_job(job: Job) -> None:
+    """Store page count, text and a thumbnail for the job's inspection PDF."""
+    inspection = db.session.get(Inspection, job.inspection_id)
+    if inspection is None or not inspection.pdf_sha256:
+        return
+    digest = inspection.pdf_sha256
+    from pdf_processing import summarize_pdf  # pypdf is only needed by the worker
+
+    with blob_store.open(digest) as f:
+        summary = summarize_pdf(f)
+    thumbnail_digest = None
+    if summary.thumbnail_png:
+        thumbnail_digest, _ = blob_store.put(BytesIO(summary.thumbnail_png))
+
+    table = Inspection.__table__
+    db.session.execute(
+        table.update()
+        .where(table.c.id == inspection.id, table.c.pdf_sha256 == digest)
+        .values(
+            pdf_text=summary.text,
+            pdf_page_count=summary.page_count,
+            pdf_thumbnail_sha256=thumbnail_digest,
+            pdf_processed_at=datetime.utcnow(),
+            # Derived data only: keep updated_at so open edit forms stay current.
+            updated_at=table.c.updated_at,
+        )
+    )
+    bump_data_version("inspections")
+
+
+JOB_HANDLERS = {
+    PDF_PROCESSING_JOB: process_pdf_job,
+}
+
+
+def run_job(job: Job) -> bool:
+    """Run one claimed job; failures are retried with exponential backoff."""
+    table = Job.__table__
+    try:
+        JOB_HANDLERS[job.kind](job)
+        db.session.execute(
+            table.update().where(table.c.id == job.id)
+            .values(status="done", locked_at=None, locked_by=None, last_error=None)
+        )
+        db.session.commit()
+        return True
+    except Exception as exc:  # recorded on the job and retried; one bad PDF must not stop the worker
+        db.session.rollback()
+        current_app.logger.warning("Job %s (%s) failed on attempt %d: %s", job.id, job.kind, job.attempts, exc)
+        if job.attempts >= current_app.config["JOB_MAX_ATTEMPTS"]:
+            values = {"status": "failed"}
+        else:
+            delay = JOB_RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)
+            values = {"status": "queued", "run_after": datetime.utcnow() + timedelta(seconds=delay)}
+        db.session.execute(
+            table.update().where(table.c.id == job.id)
+            .values(locked_at=None, locked_by=None, last_error=str(exc)[:2000], **values)
+        )
+        db.session.commit()
+        return False
+
+
+def encode_version(inspection: "Inspection") -> str:
+    """Optimistic-concurrency token for a row: its id and last update time."""
+    version = inspection.updated_at.isoformat() if inspection.updated_at else ""
+    return f"{inspection.id}:{version}"
+
+
+bp.add_app_template_filter(encode_version, "version_token")
+
+
+def decode_versions(raw_values: List[str]) -> Optional[Dict[int, Optional[datetime]]]:
+    versions: Dict[int, Optional[datetime]] = {}
+    try:
+        for raw in raw_values:
+            inspection_id, _, updated_at = raw.partition(":")
+            versions[int(inspection_id)] = datetime.fromisoformat(updated_at) if updated_at else None
+    except ValueError:
+        return None
+    return versions
+
+
+def batch_update_inspections(versions: Dict[int, Optional[datetime]], changes: Dict[str, Any],
+                             actor: Optional[str] = None) -> List[int]:
+    """Apply ``changes`` to every selected inspection in one UPDATE.
+
+    Rows are matched on id and the updated_at the client last saw. If any row
+    was changed in the meantime (or no longer exists) nothing is written and
+    the stale ids are returned. Status changes are logged to inspection_events.
+    """
+    table = Inspection.__table__
+    status_fields = [field for field in changes if field in STATUS_FIELDS]
+    previous: Dict[int, Any] = {}
+    if status_fields:
+        # Locked so the logged old values are the ones this UPDATE overwrites.
+        rows = db.session.execute(
+            select(table.c.id, *[table.c[field] for field in status_fields])
+            .where(table.c.id.in_(list(versions)))
+            .with_for_update()
+        )
+        previous = {row.id: row._mapping for row in rows}
+    seen = [(inspection_id, updated_at) for inspection_id, updated_at in versions.items() if updated_at]
+    never_updated = [inspection_id for inspection_id, updated_at in versions.items() if updated_at is None]
+    conditions = []
+    if seen:
+        conditions.append(tuple_(table.c.id, table.c.updated_at).in_(seen))
+    if never_updated:
+        conditions.append(and_(table.c.id.in_(never_updated), table.c.updated_at.is_(None)))
+    statement = (
+        table.update()
+        .where(or_(*conditions))
+        .values(**changes, updated_at=datetime.utcnow())
+        .returning(table.c.id)
+    )
+    updated = set(db.session.execute(statement).scalars())
+    stale = sorted(set(versions) - updated)
+    if stale:
+        db.session.rollback()
+        return stale
+    record_status_events([
+        status_event(inspection_id, field, previous[inspection_id][field], changes[field], actor)
+        for inspection_id in sorted(updated)
+        for field in status_fields
+        if previous[inspection_id][field] != changes[field]
+    ])
+    bump_data_version("inspections")
+    db.session.commit()
+    return stale
+
+
+def seconds_between(later, earlier):
+    """SQL expression for ``later - earlier`` in seconds."""
+    if db.engine.url.get_dialect().name == "postgresql":
+        return extract("epoch", later - earlier)
+    return (func.julianday(later) - func.julianday(earlier)) * 86400
+
+
+def turnaround_report(field: str, start: datetime, end: datetime) -> Dict[str, Any]:
+    """Upload-to-approval times for inspections first approved in ``[start, end)``.
+
+    Only approvals recorded as transitions count, so inspections approved
+    before the event log existed are left out rather than skewing the figures.
+    """
+    events = InspectionEvent.__table__
+    archive = ArchivedInspection.__table__
+    # Archived inspections keep their events, so they still count.
+    uploads = union_all(
+        select(Inspection.__table__.c.id, Inspection.__table__.c.created_at),
+        select(archive.c.id, archive.c.created_at),
+    ).subquery("uploads")
+    approval_status = APPROVAL_STATUSES[field]
+    earlier = events.alias("earlier")
+    approvals = (
+        select(events.c.inspection_id, func.min(events.c.created_at).label("approved_at"))
+        .where(
+            events.c.field == field,
+            events.c.new_value == approval_status,
+            events.c.old_value.isnot(None),
+            events.c.created_at >= start,
+            events.c.created_at < end,
+            ~select(earlier.c.id).where(
+                earlier.c.inspection_id == events.c.inspection_id,
+                earlier.c.field == field,
+                earlier.c.new_value == approval_status,
+                earlier.c.old_value.isnot(None),
+                earlier.c.created_at < start,
+            ).exists(),
+        )
+        .group_by(events.c.inspection_id)
+        .subquery("approvals")
+    )
+    seconds = seconds_between(approvals.c.approved_at, uploads.c.created_at)
+    bucket = case(
+        *[(seconds < limit, idx) for idx, (limit, _) in enumerate(TURNAROUND_BUCKETS) if limit is not None],
+        else_=len(TURNAROUND_BUCKETS) - 1,
+    )
+    rows = db.session.execute(
+        select(bucket.label("bucket"), func.count().label("count"), func.sum(seconds).label("seconds"))
+        .select_from(approvals.join(uploads, uploads.c.id == approvals.c.inspection_id))
+        .group_by(bucket)
+    ).all()
+
+    counts = {row.bucket: row.count for row in rows}
+    total = sum(counts.values())
+    total_seconds = sum(float(row.seconds or 0) for row in rows)
+    return {
+        "status": approval_status,
+        "total": total,
+        "average_hours": round(total_seconds / total / 3600, 1) if total else None,
+        "buckets": [
+            {"label": label, "count": counts.get(idx, 0), "share": counts.get(idx, 0) / total if total else 0}
+            for idx, (_, label) in enumerate(TURNAROUND_BUCKETS)
+        ],
+    }
+
+
+def backlog_report(field: str, first_day: date, last_day: date) -> Dict[str, Any]:
+    """Inspections in each status at the end of every day from ``first_day`` to ``last_day``.
+
+    The opening balance is the latest status_backlog_daily snapshot before
+    ``first_day`` (zero if there is none). Each later event adds one to its
+    new status and takes one from its old status; a running sum of the daily
+    totals on top of the opening balance gives the backlog. Events between
+    the snapshot and the range are folded into its first day.
+    """
+    snapshot_day = db.session.query(func.max(StatusBacklogDaily.day)).filter(
+        StatusBacklogDaily.field == field, StatusBacklogDaily.day < first_day
+    ).scalar()
+    opening: Dict[str, int] = {}
+    if snapshot_day is not None:
+        opening = dict(
+            db.session.query(StatusBacklogDaily.status, StatusBacklogDaily.count)
+            .filter(StatusBacklogDaily.field == field, StatusBacklogDaily.day == snapshot_day)
+            .all()
+        )
+
+    events = InspectionEvent.__table__
+    start = datetime.combine(first_day, datetime.min.time())
+    end = datetime.combine(last_day + timedelta(days=1), datetime.min.time())
+    day = func.date(case((events.c.created_at < start, literal(start, db.DateTime)), else_=events.c.created_at))
+    in_range = and_(events.c.field == field, events.c.created_at < end)
+    if snapshot_day is not None:
+        in_range = and_(
+            in_range, events.c.created_at >= datetime.combine(snapshot_day + timedelta(days=1), datetime.min.time())
+        )
+    deltas = union_all(
+        select(day.label("day"), events.c.new_value.label("status"), literal(1).label("delta")).where(in_range),
+        select(day.label("day"), events.c.old_value.label("status"), literal(-1).label("delta"))
+        .where(in_range, events.c.old_value.isnot(None)),
+    ).subquery("deltas")
+    daily = (
+        select(deltas.c.day, deltas.c.status, func.sum(deltas.c.delta).label("change"))
+        .group_by(deltas.c.day, deltas.c.status)
+        .subquery("daily")
+    )
+    rows = db.session.execute(
+        select(
+            daily.c.day,
+            daily.c.status,
+            func.sum(daily.c.change).over(partition_by=daily.c.status, order_by=daily.c.day).label("backlog"),
+        )
+    ).all()
+
+    seen = {row.status for row in rows} | set(opening)
+    statuses = list(STATUS_FIELDS[field]) + sorted(seen - set(STATUS_FIELDS[field]))
+    changes_by_day: Dict[date, Dict[str, int]] = {}
+    for row in rows:
+        row_day = row.day if isinstance(row.day, date) else date.fromisoformat(row.day)
+        changes_by_day.setdefault(row_day, {})[row.status] = opening.get(row.status, 0) + int(row.backlog)
+
+    # Days without events carry the previous day's figures forward.
+    current = {status: opening.get(status, 0) for status in statuses}
+    days = []
+    for offset in range((last_day - first_day).days + 1):
+        current_day = first_day + timedelta(days=offset)
+        current.update(changes_by_day.get(current_day, {}))
+        days.append({"day": current_day, "counts": [current[status] for status in statuses]})
+    return {"statuses": statuses, "days": days}
+
+
+def refresh_backlog_snapshots(through: date) -> int:
+    """Snapshot every finished day up to ``through`` that has no snapshot yet; returns the days written.
+
+    Each run only reads the events since the previous snapshot. Run by
+    ``flask snapshot-backlog``; if two runs overlap, the one that loses the
+    race for the same days rolls back.
+    """
+    written = 0
+    try:
+        for field in STATUS_FIELDS:
+            last_day = db.session.query(func.max(StatusBacklogDaily.day)).filter(
+                StatusBacklogDaily.field == field
+            ).scalar()
+            if last_day is None:
+                first_event = db.session.query(func.min(InspectionEvent.created_at)).filter(
+                    InspectionEvent.field == field
+                ).scalar()
+                if first_event is None:
+                    continue
+                first_day = first_event.date()
+            else:
+                first_day = last_day + timedelta(days=1)
+            if first_day > through:
+                continue
+            report = backlog_report(field, first_day, through)
+            db.session.execute(StatusBacklogDaily.__table__.insert(), [
+                {"field": field, "day": row["day"], "status": status, "count": count}
+                for row in report["days"]
+                for status, count in zip(report["statuses"], row["counts"])
+            ])
+            written += len(report["days"])
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return 0
+    return written
+
+
+def closed_clause(table):
+    """Inspections both sides have signed off on."""
+    return and_(*(table.c[field] == status for field, status in APPROVAL_STATUSES.items()))
+
+
+def blob_location(digest: Optional[str]) -> Optional[BlobStore]:
+    """The store holding ``digest``: the hot store first, then cold storage."""
+    if not digest:
+        return None
+    for store in (blob_store, cold_blob_store):
+        if store.exists(digest):
+            return store
+    return None
+
+
+def copy_blobs(digests, source: BlobStore, target: BlobStore) -> None:
+    """Copy the blobs ``target`` lacks; content addressing makes re-runs no-ops."""
+    for digest in digests:
+        if target.exists(digest) or not source.exists(digest):
+            continue
+        with source.open(digest) as f:
+            stored, _ = target.put(f)
+        if stored != digest:
+            target.delete(stored)
+            raise RuntimeError(f"Blob {digest} does not match its digest")
+
+
+def referenced_digests(table, digests) -> set:
+    """The subset of ``digests`` still used as a PDF or thumbnail by rows of ``table``."""
+    digests = set(digests)
+    if not digests:
+        return set()
+    rows = db.session.execute(
+        select(table.c.pdf_sha256, table.c.pdf_thumbnail_sha256).where(
+            or_(table.c.pdf_sha256.in_(digests), table.c.pdf_thumbnail_sha256.in_(digests))
+        )
+    )
+    return {digest for row in rows for digest in row if digest in digests}
+
+
+def ensure_archive_partition(month: date) -> None:
+    """Create the Postgres partition of inspections_archive holding ``month``."""
+    db.session.execute(text(
+        f"CREATE TABLE IF NOT EXISTS inspections_archive_{month:%Y_%m} PARTITION OF inspections_archive "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    ))
+
+
+def archive_inspections(cutoff: datetime, batch_size: int = ARCHIVE_BATCH_SIZE, log=None) -> int:
+    """Move closed inspections last updated before ``cutoff`` into inspections_archive.
+
+    Runs one transaction per batch. PDFs and thumbnails are copied to cold
+    storage before their rows move and leave the hot store once no remaining
+    inspection uses them. Status events stay where they are, so reports still
+    count archived inspections.
+    """
+    table = Inspection.__table__
+    archive = ArchivedInspection.__table__
+    is_postgres = db.engine.url.get_dialect().name == "postgresql"
+    hot, cold = blob_store._get_current_object(), cold_blob_store._get_current_object()
+    archived = 0
+    while True:
+        rows = db.session.execute(
+            select(table.c.id, table.c.created_at, table.c.updated_at, table.c.pdf_sha256,
+                   table.c.pdf_thumbnail_sha256)
+            .where(closed_clause(table), table.c.updated_at < cutoff)
+            .order_by(table.c.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not rows:
+            return archived
+        ids = [row.id for row in rows]
+        digests = {digest for row in rows for digest in (row.pdf_sha256, row.pdf_thumbnail_sha256) if digest}
+        if cold is not hot:
+            copy_blobs(digests, hot, cold)
+        if is_postgres:
+            for month in {first_of_month(row.created_at) for row in rows}:
+                ensure_archive_partition(month)
+
+        db.session.execute(archive.insert().from_select(
+            ARCHIVED_COLUMNS + ["archived_at"],
+            select(*(table.c[name] for name in ARCHIVED_COLUMNS), literal(datetime.utcnow(), db.DateTime)).where(table.c.id.in_(ids)),
+        ))
+        db.session.execute(table.delete().where(table.c.id.in_(ids)))
+        bump_data_version("inspections")
+        db.session.commit()
+
+        if cold is not hot:
+            for digest in digests - referenced_digests(table, digests):
+                hot.delete(digest)
+        archived += len(ids)
+        if log:
+            log(f"Archived {archived} inspections")
+
+
+def restore_inspections(inspection_ids: List[int]) -> int:
+    """Move archived inspections (and their blobs) back into the hot table."""
+    table = Inspection.__table__
+    archive = ArchivedInspection.__table__
+    hot, cold = blob_store._get_current_object(), cold_blob_store._get_current_object()
+    rows = db.session.execute(
+        select(archive.c.id, archive.c.pdf_sha256, archive.c.pdf_thumbnail_sha256)
+        .where(archive.c.id.in_(inspection_ids))
+    ).all()
+    if not rows:
+        return 0
+    ids = [row.id for row in rows]
+    digests = {digest for row in rows for digest in (row.pdf_sha256, row.pdf_thumbnail_sha256) if digest}
+    if cold is not hot:
+        copy_blobs(digests, cold, hot)
+
+    db.session.execute(table.insert().from_select(
+        ARCHIVED_COLUMNS,
+        select(*(archive.c[name] for name in ARCHIVED_COLUMNS)).where(archive.c.id.in_(ids)),
+    ))
+    db.session.execute(archive.delete().where(archive.c.id.in_(ids)))
+    bump_data_version("inspections")
+    db.session.commit()
+
+    if cold is not hot:
+        for digest in digests - referenced_digests(archive, digests):
+            cold.delete(digest)
+    return len(ids)
+
+
+def archive_search_filter(q: str):
+    """search_filter for inspections_archive, through its trigram / FTS5 index when possible."""
+    needle = q.lower()
+    # Only statuses the query names: an always-false IN () would still keep SQLite from using the index.
+    clauses = []
+    for column, statuses in ((ArchivedInspection.status_admin, ADMIN_STATUSES),
+                             (ArchivedInspection.status_reviewer, REVIEWER_STATUSES)):
+        matching = [s for s in statuses if needle in s.lower()]
+        if matching:
+            clauses.append(column.in_(matching))
+    if db.engine.url.get_dialect().name == "sqlite" and len(q) >= MIN_INDEXED_SEARCH_LENGTH:
+        phrase = '"' + q.replace('"', '""') + '"'
+        clauses.append(literal_column("inspections_archive.rowid").in_(
+            text("SELECT rowid FROM inspections_archive_fts WHERE inspections_archive_fts MATCH :phrase")
+            .bindparams(phrase=phrase)
+        ))
+    else:
+        like = f"%{q}%"
+        clauses += [
+            ArchivedInspection.registration_number.ilike(like),
+            ArchivedInspection.dealer_name.ilike(like),
+        ]
+    return or_(*clauses)
+
+
+def search_archive(q: str) -> List[ArchivedInspection]:
+    """Newest archived inspections matching ``q`` by registration, dealer or status (all if empty)."""
+    query = ArchivedInspection.query
+    if q:
+        query = query.filter(archive_search_filter(q))
+    return (
+        query.order_by(ArchivedInspection.created_at.desc(), ArchivedInspection.id.desc())
+        .limit(ARCHIVE_SEARCH_LIMIT)
+        .all()
+    )
+
+
+def inspection_page(q: str, raw_cursor: str):
+    """One dashboard page as ``(inspections, next_cursor)``; ``next_cursor`` is None on the last page."""
+    if q:
+        return search_inspections(q, raw_cursor)
+
+    cursor = decode_cursor(raw_cursor)
+    query = Inspection.query.options(load_only(*DASHBOARD_COLUMNS))
+    if cursor:
+        query = query.filter(tuple_(Inspection.created_at, Inspection.id) < cursor)
+    inspections = query.order_by(Inspection.created_at.desc(), Inspection.id.desc()).limit(PAGE_SIZE + 1).all()
+    if len(inspections) > PAGE_SIZE:
+        return inspections[:PAGE_SIZE], encode_cursor(inspections[PAGE_SIZE - 1])
+    return inspections, None
+
+
+def page_position(q: str, raw_cursor: str) -> str:
+    """``raw_cursor`` if it is a valid cursor for this listing or search, else "" (the first page)."""
+    valid = decode_search_cursor(raw_cursor) if q else decode_cursor(raw_cursor)
+    return raw_cursor if valid else ""
+
+
+def version_etag(*parts) -> str:
+    """ETag for a response fully determined by ``parts`` (user, query, data versions...).
+
+    The build id is always included, so a deploy that changes templates or
+    static assets invalidates every page browsers hold.
+    """
+    parts = (current_app.extensions["build_id"],) + parts
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def conditional_response(etag: str, render) -> Response:
+    """304 if the client already holds ``etag``, else ``render()``; revalidated on every use."""
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = make_response(render())
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def json_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def inspection_json(inspection: "Inspection") -> Dict[str, Any]:
+    item = {attr: json_value(getattr(inspection, attr)) for _, attr in INSPECTION_EXPORT_COLUMNS}
+    item["pdf_url"] = url_for("main.view_pdf", inspection_id=inspection.id) if inspection.has_pdf else None
+    return item
+
+
+def encode_cursor(inspection: "Inspection") -> str:
+    return f"{inspection.created_at.isoformat()}_{inspection.id}"
+
+
+def decode_cursor(raw: str) -> Optional[tuple]:
+    try:
+        created_at, inspection_id = raw.rsplit("_", 1)
+        return datetime.fromisoformat(created_at), int(inspection_id)
+    except ValueError:
+        return None
+
+
+def decode_search_cursor(raw: str) -> Optional[tuple]:
+    """``(phase, position)`` of a search cursor; ``position`` is None at the start of a phase."""
+    if not raw.startswith(RANK_CURSOR_PREFIX):
+        position = decode_cursor(raw)
+        return ("created", position) if position else None
+    if raw == RANK_CURSOR_PREFIX:
+        return "rank", None
+    try:
+        rank, inspection_id = raw[len(RANK_CURSOR_PREFIX):].rsplit("_", 1)
+        return "rank", (float(rank), int(inspection_id))
+    except ValueError:
+        return None
+
+
+@bp.app_errorhandler(RequestEntityTooLarge)
+@bp.app_errorhandler(BlobTooLarge)
+def upload_too_large(error):
+    if request.is_bulk_upload:
+        limit_mb = current_app.config["MAX_BULK_UPLOAD_BYTES"] // (1024 * 1024)
+        return jsonify(error=f"Upload is too large (max {limit_mb} MB)"), 413
+    limit_mb = current_app.config["MAX_CONTENT_LENGTH"] // (1024 * 1024)
+    flash(f"File is too large (max {limit_mb} MB)", "error")
+    return redirect(url_for("main.upload_inspection"))
+
+
+@bp.app_errorhandler(InvalidBlobHeader)
+def upload_not_pdf(error):
+    flash("Only PDF files are allowed", "error")
+    return redirect(url_for("main.upload_inspection"))
+
+
+@bp.route("/metrics")
+def metrics():
+    token = current_app.config["METRICS_TOKEN"]
+    if not token or request.headers.get("Authorization") != f"Bearer {token}":
+        abort(404)
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+@bp.route("/login", methods=["GET", "POST"])
 def login():
     if request.method == "POST":
         username = request.form.get("username", "").strip()
@@ -396,53 +2172,290 @@ def login():
             session["username"] = username
             session["role"] = user["role"]
             flash(f"Logged in as {username}", "success")
-            return redirect(url_for("list_inspections"))
+            return redirect(url_for("main.list_inspections"))
         flash("Invalid username or password", "error")
     return render_template("login.html")
 
 
-@app.route("/logout")
+@bp.route("/logout")
 def logout():
     session.clear()
     flash("You have been logged out", "info")
-    return redirect(url_for("login"))
+    return redirect(url_for("main.login"))
 
 
-@app.route("/")
+@bp.route("/")
 @login_required
 def index():
-    return redirect(url_for("list_inspections"))
+    return redirect(url_for("main.list_inspections"))
 
 
-@app.route("/inspections")
+@bp.route("/inspections")
 @login_required
 def list_inspections():
     q = request.args.get("q", "").strip()
-    query = Inspection.query
-    if q:
-        like = f"%{q}%"
-        query = query.filter(
-            or_(
-                Inspection.registration_number.ilike(like),
-                Inspection.dealer_name.ilike(like),
-                Inspection.status_admin.ilike(like),
-                Inspection.status_reviewer.ilike(like),
+    position = page_position(q, request.args.get("cursor", ""))
+    include_archived = request.args.get("archived") == "1"
+    role = session.get("role")
+    versions = current_data_versions()
+
+    def render_inspection_table() -> str:
+        inspections, next_cursor = inspection_page(q, position)
+        snippets = search_snippets(q, [inspection.id for inspection in inspections]) if q else {}
+        return render_template(
+            "_inspection_table.html",
+            inspections=inspections,
+            snippets=snippets,
+            search_query=q,
+            is_first_page=not position,
+            next_cursor=next_cursor,
+            cursor=position,
+            include_archived=include_archived,
+            admin_statuses=ADMIN_STATUSES,
+            reviewer_statuses=REVIEWER_STATUSES,
+        )
+
+    def render() -> str:
+        inspection_table = dashboard_cache.get_or_set(
+            ("inspection-table", role, q, position, include_archived, versions.get("inspections")),
+            render_inspection_table,
+        )
+        # Archiving and restoring bump the inspections version too.
+        archived_table = ""
+        if include_archived:
+            archived_table = dashboard_cache.get_or_set(
+                ("archived-table", q, versions.get("inspections")),
+                lambda: render_template("_archived_table.html", archived=search_archive(q), limit=ARCHIVE_SEARCH_LIMIT),
             )
+        return render_template(
+            "dashboard.html",
+            search_query=q,
+            include_archived=include_archived,
+            inspection_table=Markup(inspection_table),
+            archived_table=Markup(archived_table),
+            is_admin=role == "admin",
         )
-    inspections = query.order_by(Inspection.created_at.desc()).all()
-    admin_assets = PLACEHOLDER_ASSETS if session.get("role") == "admin" else []
-    forecast = build_forecast(admin_assets, datetime.utcnow().date()) if admin_assets else None
-    return render_template(
-        "dashboard.html",
-        inspections=inspections,
-        search_query=q,
-        asset_columns=ASSET_OVERVIEW_COLUMNS,
-        admin_assets=admin_assets,
-        forecast=forecast,
+
+    # The page only changes when the data versions do; pending flash messages
+    # make it one-off, so those skip the ETag. The admin sections load
+    # separately (dashboard_assets / dashboard_forecast) with their own ETags.
+    if "_flashes" in session:
+        response = make_response(render())
+        response.headers["Cache-Control"] = "private, no-cache"
+        return response
+    return conditional_response(
+        version_etag(session.get("username"), role, q, position, include_archived, versions.get("inspections")),
+        render,
+    )
+
+
+def admin_only_section():
+    if session.get("role") != "admin":
+        abort(403)
+
+
+@bp.route("/dashboard/assets")
+@login_required
+def dashboard_assets():
+    """Fleet overview fragment, fetched by the dashboard after first paint.
+
+    Renders PAGE_SIZE assets with ids above ``after``; the "more" link fetches
+    the next page, which dashboard.js appends to the table.
+    """
+    admin_only_section()
+    after = request.args.get("after", 0, type=int)
+    version = current_data_versions().get("assets")
+
+    def render():
+        assets = Asset.query.filter(Asset.id > after).order_by(Asset.id).limit(PAGE_SIZE + 1).all()
+        return render_template(
+            "_asset_overview.html",
+            asset_columns=ASSET_COLUMNS,
+            admin_assets=assets[:PAGE_SIZE],
+            asset_count=Asset.query.count(),
+            next_after=assets[PAGE_SIZE - 1].id if len(assets) > PAGE_SIZE else None,
+        )
+
+    return conditional_response(
+        version_etag("dashboard-assets", after, version),
+        lambda: dashboard_cache.get_or_set(("asset-overview", after, version), render),
+    )
+
+
+@bp.route("/dashboard/forecast")
+@login_required
+def dashboard_forecast():
+    """Forecast fragment; empty until the rollup has been built."""
+    admin_only_section()
+    version = current_data_versions().get("assets")
+    today = datetime.utcnow().date()
+    month = first_of_month(today)
+    return conditional_response(
+        version_etag("dashboard-forecast", version, month),
+        lambda: dashboard_cache.get_or_set(
+            ("forecast-panel", version, month),
+            lambda: render_template("_forecast_panel.html", forecast=rollup_forecast(today)),
+        ),
+    )
+
+
+def api_login_required(view_func):
+    @wraps(view_func)
+    def wrapped_view(*args, **kwargs):
+        if "username" not in session:
+            return jsonify(error="Login required"), 401
+        return view_func(*args, **kwargs)
+    return wrapped_view
+
+
+def api_admin_only():
+    if session.get("role") != "admin":
+        abort(make_response(jsonify(error="Admin only"), 403))
+
+
+@bp.route("/api/inspections")
+@api_login_required
+def api_inspections():
+    """Dashboard listing as JSON; same ``q`` and ``cursor`` parameters."""
+    q = request.args.get("q", "").strip()
+    position = page_position(q, request.args.get("cursor", ""))
+
+    def render():
+        inspections, next_cursor = inspection_page(q, position)
+        return jsonify(items=[inspection_json(inspection) for inspection in inspections], next_cursor=next_cursor)
+
+    versions = current_data_versions()
+    return conditional_response(
+        version_etag("api-inspections", q, position, versions.get("inspections")), render
+    )
+
+
+@bp.route("/api/assets")
+@api_login_required
+def api_assets():
+    """Asset register by ascending id; pass ``next_after`` back as ``after`` for the next page."""
+    api_admin_only()
+    after = request.args.get("after", 0, type=int)
+    limit = min(max(request.args.get("limit", API_ASSET_PAGE_SIZE, type=int), 1), API_ASSET_MAX_PAGE_SIZE)
+
+    def render():
+        assets = Asset.query.filter(Asset.id > after).order_by(Asset.id).limit(limit + 1).all()
+        page = assets[:limit]
+        return jsonify(
+            columns=[{"label": label, "attribute": attr} for label, attr, _ in ASSET_COLUMNS],
+            items=[
+                {"id": asset.id, **{attr: json_value(getattr(asset, attr)) for _, attr, _ in ASSET_COLUMNS}}
+                for asset in page
+            ],
+            next_after=page[-1].id if len(assets) > limit else None,
+        )
+
+    version = current_data_versions().get("assets")
+    return conditional_response(version_etag("api-assets", after, limit, version), render)
+
+
+@bp.route("/api/forecast")
+@api_login_required
+def api_forecast():
+    """The dashboard forecast: book value per asset group and depreciation per month."""
+    api_admin_only()
+    today = datetime.utcnow().date()
+    horizon = request.args.get("months", FORECAST_EXPORT_DEFAULT_MONTHS, type=int)
+    horizon = min(max(horizon, 1), FORECAST_EXPORT_MAX_MONTHS)
+
+    def render():
+        forecast = rollup_forecast(today, horizon)
+        if forecast is None:
+            return jsonify(months=[], rows=[], depreciation_totals=[])
+        return jsonify(
+            months=forecast["months"],
+            rows=[{"group": row["asset"], "values": row["values"]} for row in forecast["rows"]],
+            depreciation_totals=forecast["depreciation_totals"],
+        )
+
+    version = current_data_versions().get("assets")
+    return conditional_response(version_etag("api-forecast", horizon, first_of_month(today), version), render)
+
+
+@bp.route("/reports")
+@login_required
+def reports():
+    """Turnaround and daily backlog per status for both sides of the review."""
+    today = datetime.utcnow().date()
+    days = min(max(request.args.get("days", REPORT_DEFAULT_DAYS, type=int), 1), REPORT_MAX_DAYS)
+    first_day = today - timedelta(days=days - 1)
+    start = datetime.combine(first_day, datetime.min.time())
+    end = datetime.combine(today + timedelta(days=1), datetime.min.time())
+    # Both reports only change with status events (uploads record one too),
+    # so edits to comments, costs or PDFs leave the cached reports in place.
+    version = current_data_versions().get("status_events")
+
+    sections = []
+    for field, title in (("status_admin", "Admin"), ("status_reviewer", "Reviewer")):
+        sections.append({
+            "title": title,
+            "turnaround": dashboard_cache.get_or_set(
+                ("turnaround-report", field, version, first_day, today),
+                lambda: turnaround_report(field, start, end),
+            ),
+            "backlog": dashboard_cache.get_or_set(
+                ("backlog-report", field, version, first_day, today),
+                lambda: backlog_report(field, first_day, today),
+            ),
+        })
+    return render_template("reports.html", sections=sections, days=days, first_day=first_day, today=today)
+
+
+@bp.route("/inspections/export.<fmt>")
+@login_required
+def export_inspections(fmt: str):
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    q = request.args.get("q", "").strip()
+    return export_response(
+        fmt,
+        "Inspections",
+        [header for header, _ in INSPECTION_EXPORT_COLUMNS],
+        inspection_export_rows(q),
+    )
+
+
+@bp.route("/assets/export.<fmt>")
+@login_required
+def export_assets(fmt: str):
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    if session.get("role") != "admin":
+        flash("Only admin can export the asset register", "error")
+        return redirect(url_for("main.list_inspections"))
+    # Same headers as the import file, so an export can be edited and re-imported.
+    return export_response(
+        fmt,
+        "Assets",
+        [label for label, _, _ in ASSET_COLUMNS],
+        asset_export_rows(),
     )
 
 
-@app.route("/upload", methods=["GET", "POST"])
+@bp.route("/forecast/export.<fmt>")
+@login_required
+def export_forecast(fmt: str):
+    if fmt not in EXPORT_FORMATS:
+        abort(404)
+    if session.get("role") != "admin":
+        flash("Only admin can export the forecast", "error")
+        return redirect(url_for("main.list_inspections"))
+    horizon = request.args.get("months", FORECAST_EXPORT_DEFAULT_MONTHS, type=int)
+    months = forecast_months(datetime.utcnow().date(), min(max(horizon, 1), FORECAST_EXPORT_MAX_MONTHS))
+    return export_response(
+        fmt,
+        "Forecast",
+        ["Registreringsnummer", "Fabrikat/Modell", "Biltyp", "Finansiär", *(m.strftime("%Y-%m") for m in months)],
+        forecast_export_rows(months),
+    )
+
+
+@bp.route("/upload", methods=["GET", "POST"])
 @login_required
 def upload_inspection():
     if request.method == "POST":
@@ -455,35 +2468,150 @@ def upload_inspection():
         if not file or file.filename == "":
             flash("Please select a PDF file", "error")
             return redirect(request.url)
-        if not allowed_file(file.filename):
+        staged = file.stream
+        if not allowed_file(file.filename) or (isinstance(staged, StagedBlob) and not staged.header_valid):
             flash("Only PDF files are allowed", "error")
             return redirect(request.url)
 
-        filename = secure_filename(file.filename)
-        timestamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
-        filename = f"{timestamp}_{filename}"
-        file_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
-        file_bytes = file.read()
-        with open(file_path, "wb") as f:
-            f.write(file_bytes)
+        filename = stored_pdf_filename(file.filename)
+        if isinstance(staged, StagedBlob):
+            digest, size = blob_store.commit(staged), staged.size
+        else:
+            digest, size = blob_store.put(staged)
 
         inspection = Inspection(
             registration_number=registration_number,
             dealer_name=dealer_name or None,
             pdf_filename=filename,
-            pdf_data=file_bytes,
+            pdf_size=size,
+            pdf_sha256=digest,
             status_admin="Pending",
             status_reviewer="Pending",
         )
         db.session.add(inspection)
+        db.session.flush()
+        record_status_events(initial_status_events([inspection.id], session.get("username")))
+        enqueue_jobs(PDF_PROCESSING_JOB, [inspection.id])
+        bump_data_version("inspections")
         db.session.commit()
 
         flash("Inspection uploaded", "success")
-        return redirect(url_for("list_inspections"))
+        return redirect(url_for("main.list_inspections"))
     return render_template("upload.html")
 
 
-@app.route("/inspection/<int:inspection_id>/edit", methods=["GET", "POST"])
+@bp.route("/inspections/batch", methods=["POST"])
+@login_required
+def batch_update():
+    """Set status and/or cost on the inspections ticked on the dashboard.
+
+    Admins change status_admin/cost_estimate and reviewers status_reviewer/
+    accepted_cost, as on the per-row forms; blank fields are left unchanged.
+    """
+    back = redirect(url_for("main.list_inspections",
+        q=request.form.get("q") or None,
+        cursor=request.form.get("cursor") or None,
+        archived=request.form.get("archived") or None,
+    ))
+    versions = decode_versions(request.form.getlist("selected"))
+    if versions is None:
+        flash("Invalid selection", "error")
+        return back
+    if not versions:
+        flash("Select at least one inspection", "error")
+        return back
+    if len(versions) > BATCH_UPDATE_LIMIT:
+        flash(f"Select at most {BATCH_UPDATE_LIMIT} inspections at a time", "error")
+        return back
+
+    if session.get("role") == "admin":
+        status_field, statuses, cost_field, cost_label = "status_admin", ADMIN_STATUSES, "cost_estimate", "cost estimate"
+    else:
+        status_field, statuses, cost_field, cost_label = "status_reviewer", REVIEWER_STATUSES, "accepted_cost", "accepted cost"
+
+    changes: Dict[str, Any] = {}
+    new_status = request.form.get(status_field, "").strip()
+    if new_status:
+        if new_status not in statuses:
+            flash("Invalid status", "error")
+            return back
+        changes[status_field] = new_status
+    cost_str = request.form.get(cost_field, "").strip()
+    if cost_str:
+        try:
+            changes[cost_field] = int(cost_str)
+        except ValueError:
+            flash(f"Invalid {cost_label}", "error")
+            return back
+    if not changes:
+        flash("Choose a status or cost to apply", "error")
+        return back
+
+    stale = batch_update_inspections(versions, changes, actor=session.get("username"))
+    if stale:
+        flash(
+            f"{len(stale)} of the selected inspections were changed by someone else "
+            "or removed; nothing was updated. Reload and try again.",
+            "error",
+        )
+    else:
+        flash(f"Updated {len(versions)} inspections", "success")
+    return back
+
+
+@bp.route("/inspections/bulk", methods=["POST"])
+@login_required
+def bulk_upload_inspections():
+    """Ingest many PDFs at once and return a per-item JSON report.
+
+    Expects a ``manifest`` file (CSV or JSON with file, registration_number,
+    dealer_name and cost_estimate) plus either an ``archive`` ZIP or any number
+    of ``pdf_files`` parts. Responds 200 when every row was created, 207 when
+    only some were and 422 when none were.
+    """
+    manifest = request.files.get("manifest")
+    if not manifest or manifest.filename == "":
+        return jsonify(error="A manifest file is required"), 400
+    try:
+        items = parse_manifest(manifest.read(), manifest.filename)
+    except (ManifestError, UnicodeDecodeError) as exc:
+        return jsonify(error=str(exc)), 400
+
+    max_size = current_app.config["MAX_CONTENT_LENGTH"]
+    workers = current_app.config["BULK_INGEST_WORKERS"]
+    # The ingest threads run outside the request context, so they get the store itself.
+    store = blob_store._get_current_object()
+    archive_file = request.files.get("archive")
+    if archive_file and archive_file.filename:
+        archive_file.stream.seek(0)
+        try:
+            archive = zipfile.ZipFile(archive_file.stream)
+        except zipfile.BadZipFile:
+            return jsonify(error="Archive is not a valid ZIP file"), 400
+        with archive:
+            store_files(items, zip_opener(archive, max_size), store, max_size, workers)
+    else:
+        parts = {}
+        for file in request.files.getlist("pdf_files"):
+            if file.filename:
+                parts.setdefault(file.filename, file.stream)
+                parts.setdefault(os.path.basename(file.filename), file.stream)
+        if not parts:
+            return jsonify(error="Upload an archive or pdf_files"), 400
+        store_files(items, parts.__getitem__, store, max_size, workers)
+
+    insert_ingested_inspections(items, INSPECTION_INSERT_BATCH_SIZE, actor=session.get("username"))
+    report = ingest_report(items)
+    if report["failed"] == 0:
+        status = 200
+    elif report["created"]:
+        status = 207
+    else:
+        status = 422
+    return jsonify(report), status
+
+
+@bp.route("/inspection/<int:inspection_id>/edit", methods=["GET", "POST"])
 @login_required
 def edit_inspection(inspection_id: int):
     inspection = Inspection.query.get_or_404(inspection_id)
@@ -504,106 +2632,552 @@ def edit_inspection(inspection_id: int):
             if new_status in REVIEWER_STATUSES:
                 inspection.status_reviewer = new_status
 
+        record_status_events(status_change_events(inspection, session.get("username")))
+        bump_data_version("inspections")
         db.session.commit()
         flash("Inspection updated", "success")
-        return redirect(url_for("list_inspections"))
+        return redirect(url_for("main.list_inspections"))
+    events = (
+        InspectionEvent.query.filter_by(inspection_id=inspection.id)
+        .order_by(InspectionEvent.created_at, InspectionEvent.id)
+        .all()
+    )
     return render_template(
         "edit_inspection.html",
         inspection=inspection,
+        events=events,
         role=role,
         admin_statuses=ADMIN_STATUSES,
         reviewer_statuses=REVIEWER_STATUSES,
     )
 
 
-@app.route("/inspection/<int:inspection_id>/cost", methods=["POST"])
+@bp.route("/inspection/<int:inspection_id>/cost", methods=["POST"])
 @login_required
 def update_cost(inspection_id: int):
     inspection = Inspection.query.get_or_404(inspection_id)
     if session.get("role") != "admin":
         flash("Only admin can edit cost estimate", "error")
-        return redirect(url_for("list_inspections"))
+        return redirect(url_for("main.list_inspections"))
     cost_str = request.form.get("cost_estimate", "").strip()
     try:
         inspection.cost_estimate = int(cost_str) if cost_str else None
+        bump_data_version("inspections")
         db.session.commit()
         flash("Cost estimate updated", "success")
     except ValueError:
         flash("Invalid cost estimate", "error")
-    return redirect(url_for("list_inspections"))
+    return redirect(url_for("main.list_inspections"))
 
 
-@app.route("/inspection/<int:inspection_id>/accepted_cost", methods=["POST"])
+@bp.route("/inspection/<int:inspection_id>/accepted_cost", methods=["POST"])
 @login_required
 def update_accepted_cost(inspection_id: int):
     inspection = Inspection.query.get_or_404(inspection_id)
     if session.get("role") != "reviewer":
         flash("Only approver can edit accepted cost", "error")
-        return redirect(url_for("list_inspections"))
+        return redirect(url_for("main.list_inspections"))
     cost_str = request.form.get("accepted_cost", "").strip()
     try:
         inspection.accepted_cost = int(cost_str) if cost_str else None
+        bump_data_version("inspections")
         db.session.commit()
         flash("Accepted cost updated", "success")
     except ValueError:
         flash("Invalid accepted cost", "error")
-    return redirect(url_for("list_inspections"))
+    return redirect(url_for("main.list_inspections"))
 
 
-@app.route("/inspection/<int:inspection_id>/pdf")
+@bp.route("/inspection/<int:inspection_id>/pdf")
 @login_required
 def view_pdf(inspection_id: int):
     inspection = Inspection.query.get_or_404(inspection_id)
-    if inspection.pdf_data:
-        return send_file(
-            BytesIO(inspection.pdf_data),
-            mimetype="application/pdf",
-            download_name=inspection.pdf_filename,
-            as_attachment=False,
-        )
+    if inspection.pdf_sha256 is None and inspection.has_pdf:
+        response = send_legacy_pdf(inspection)
+        if response is not None:
+            return response
 
-    file_path = inspection.pdf_file_path
-    if os.path.exists(file_path):
-        with open(file_path, "rb") as f:
-            data = f.read()
-        inspection.pdf_data = data
-        db.session.commit()
-        return send_file(
-            BytesIO(data),
-            mimetype="application/pdf",
-            download_name=inspection.pdf_filename,
-            as_attachment=False,
-        )
+    store = blob_location(inspection.pdf_sha256)
+    if store is not None:
+        return send_blob(inspection.pdf_sha256, inspection.pdf_filename, store=store)
 
     flash("PDF file could not be found", "error")
-    return redirect(url_for("list_inspections"))
+    return redirect(url_for("main.list_inspections"))
+
 
+@bp.route("/archive/<int:inspection_id>/pdf")
+@login_required
+def view_archived_pdf(inspection_id: int):
+    inspection = ArchivedInspection.query.filter_by(id=inspection_id).first_or_404()
+    store = blob_location(inspection.pdf_sha256)
+    if store is None:
+        abort(404)
+    return send_blob(inspection.pdf_sha256, inspection.pdf_filename, store=store)
 
 
-@app.route("/inspection/<int:inspection_id>/delete_pdf", methods=["POST"])
+@bp.route("/inspection/<int:inspection_id>/thumbnail")
+@login_required
+def view_thumbnail(inspection_id: int):
+    inspection = Inspection.query.options(
+        load_only(Inspection.id, Inspection.pdf_thumbnail_sha256)
+    ).get_or_404(inspection_id)
+    digest = inspection.pdf_thumbnail_sha256
+    store = blob_location(digest)
+    if store is None:
+        abort(404)
+    return send_blob(digest, f"inspection-{inspection.id}.png", mimetype="image/png", store=store)
+
+
+@bp.route("/inspection/<int:inspection_id>/delete_pdf", methods=["POST"])
 @login_required
 def delete_pdf(inspection_id: int):
     inspection = Inspection.query.get_or_404(inspection_id)
     if session.get("role") != "admin":
         flash("Only admin can delete PDFs", "error")
-        return redirect(url_for("edit_inspection", inspection_id=inspection.id))
+        return redirect(url_for("main.edit_inspection", inspection_id=inspection.id))
 
     if os.path.exists(inspection.pdf_file_path):
         os.remove(inspection.pdf_file_path)
 
+    digest = inspection.pdf_sha256
+    thumbnail_digest = inspection.pdf_thumbnail_sha256
     inspection.pdf_data = None
+    inspection.pdf_size = None
+    inspection.pdf_sha256 = None
+    inspection.pdf_text = None
+    inspection.pdf_page_count = None
+    inspection.pdf_thumbnail_sha256 = None
+    inspection.pdf_processed_at = None
+    bump_data_version("inspections")
     db.session.commit()
 
-    flash("PDF deleted", "success")
-    return redirect(url_for("edit_inspection", inspection_id=inspection.id))
+    unused = {d for d in (digest, thumbnail_digest) if d}
+    unused -= referenced_digests(Inspection.__table__, unused)
+    if cold_blob_store._get_current_object() is blob_store._get_current_object():
+        # Archived inspections share the store; keep what they still use.
+        unused -= referenced_digests(ArchivedInspection.__table__, unused)
+    for unused_digest in unused:
+        blob_store.delete(unused_digest)
 
+    flash("PDF deleted", "success")
+    return redirect(url_for("main.edit_inspection", inspection_id=inspection.id))
+
+
+@bp.cli.command("migrate")
+@click.option("--check", is_flag=True, help="Only list pending migrations; exit 1 if there are any.")
+def migrate_command(check: bool):
+    """Apply pending schema migrations. Run once per deploy, before starting workers."""
+    if check:
+        pending = pending_migrations(db.engine, MIGRATIONS)
+        for migration in pending:
+            click.echo(f"Pending {migration.version:04d} {migration.name}")
+        if pending:
+            raise SystemExit(1)
+        click.echo("Schema is up to date")
+        return
+    applied = migrate_database(log=click.echo)
+    click.echo(f"Applied {len(applied)} migrations" if applied else "Schema is up to date")
+
+
+@bp.cli.command("import-assets")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--replace", is_flag=True, help="Delete existing assets before importing.")
+@click.option("--batch-size", default=ASSET_IMPORT_BATCH_SIZE, show_default=True)
+def import_assets_command(path: str, replace: bool, batch_size: int):
+    """Bulk-load the asset register from a CSV or XLSX export."""
+    insert = Asset.__table__.insert()
+    imported = 0
+    batch: List[Dict[str, Any]] = []
+    with db.engine.begin() as conn:
+        if replace:
+            conn.execute(Asset.__table__.delete())
+        for row in read_rows(path):
+            batch.append(coerce_row(row, ASSET_COLUMNS))
+            if len(batch) >= batch_size:
+                conn.execute(insert, batch)
+                imported += len(batch)
+                batch = []
+        if batch:
+            conn.execute(insert, batch)
+            imported += len(batch)
+        bump_data_version("assets", conn)
+    click.echo(f"Imported {imported} assets from {path}")
+    refreshed = refresh_forecast_rollup()
+    click.echo(f"Forecast rollup refreshed for {refreshed} assets")
+
+
+@bp.cli.command("import-inspections")
+@click.argument("manifest", type=click.Path(exists=True, dir_okay=False))
+@click.option("--archive", type=click.Path(exists=True, dir_okay=False), help="ZIP holding the listed PDFs.")
+@click.option("--directory", type=click.Path(exists=True, file_okay=False),
+              help="Directory holding the listed PDFs (defaults to the manifest's directory).")
+@click.option("--workers", type=int, help="Parallel file workers (defaults to BULK_INGEST_WORKERS).")
+@click.option("--batch-size", default=INSPECTION_INSERT_BATCH_SIZE, show_default=True)
+@click.option("--report", "report_path", type=click.Path(dir_okay=False), help="Write the JSON report here.")
+def import_inspections_command(manifest: str, archive: Optional[str], directory: Optional[str],
+                               workers: Optional[int], batch_size: int, report_path: Optional[str]):
+    """Bulk-ingest inspection PDFs listed in a CSV or JSON manifest."""
+    with open(manifest, "rb") as f:
+        try:
+            items = parse_manifest(f.read(), manifest)
+        except (ManifestError, UnicodeDecodeError) as exc:
+            raise click.ClickException(str(exc))
+
+    max_size = current_app.config["MAX_CONTENT_LENGTH"]
+    workers = workers or current_app.config["BULK_INGEST_WORKERS"]
+    store = blob_store._get_current_object()
+    if archive:
+        with zipfile.ZipFile(archive) as zf:
+            store_files(items, zip_opener(zf, max_size), store, max_size, workers)
+    else:
+        root = directory or os.path.dirname(os.path.abspath(manifest))
+
+        def open_file(name: str):
+            path = safe_join(root, name)
+            if path is None or not os.path.isfile(path):
+                raise KeyError(name)
+            return open(path, "rb")
+
+        store_files(items, open_file, store, max_size, workers)
+
+    insert_ingested_inspections(items, batch_size)
+    report = ingest_report(items)
+    for result in report["items"]:
+        if result["error"]:
+            click.echo(f"line {result['line']}: {result['file']}: {result['error']}", err=True)
+    if report_path:
+        with open(report_path, "w") as f:
+            json.dump(report, f, indent=2)
+    click.echo(f"Created {report['created']} inspections, {report['failed']} failed")
+
+
+@bp.cli.command("worker")
+@click.option("--once", is_flag=True, help="Exit once no jobs are due instead of polling.")
+@click.option("--batch-size", default=10, show_default=True, help="Jobs claimed per round trip.")
+def worker_command(once: bool, batch_size: int):
+    """Run queued background jobs (PDF text, page count and thumbnails)."""
+    worker_id = f"{socket.gethostname()}:{os.getpid()}"
+    stopping = False
+
+    def request_stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+    click.echo(f"Worker {worker_id} started")
+    done = failed = 0
+    while not stopping:
+        jobs = claim_jobs(worker_id, batch_size)
+        if not jobs:
+            if once:
+                break
+            time.sleep(current_app.config["JOB_POLL_SECONDS"])
+            continue
+        for job in jobs:
+            if run_job(job):
+                done += 1
+            else:
+                failed += 1
+    click.echo(f"Worker {worker_id} stopped: {done} jobs done, {failed} failed")
+
+
+@bp.cli.command("enqueue-pdf-processing")
+@click.option("--all", "reprocess_all", is_flag=True, help="Also re-queue PDFs that were already processed.")
+def enqueue_pdf_processing_command(reprocess_all: bool):
+    """Queue process-pdf jobs for stored PDFs, e.g. after migrate-blobs."""
+    query = db.session.query(Inspection.id).filter(Inspection.pdf_sha256.isnot(None))
+    if not reprocess_all:
+        query = query.filter(Inspection.pdf_processed_at.is_(None))
+    pending = db.session.query(Job.inspection_id).filter(
+        Job.kind == PDF_PROCESSING_JOB, Job.status.in_(["queued", "running"]), Job.inspection_id.isnot(None)
+    )
+    ids = [row.id for row in query.filter(Inspection.id.notin_(pending)).order_by(Inspection.id)]
+    enqueue_jobs(PDF_PROCESSING_JOB, ids)
+    db.session.commit()
+    click.echo(f"Queued {len(ids)} PDFs for processing")
+
+
+@bp.cli.command("refresh-forecast")
+@click.option("--full", is_flag=True, help="Rebuild forecast_monthly from scratch.")
+def refresh_forecast_command(full: bool):
+    """Apply asset changes to the forecast_monthly rollup."""
+    refreshed = refresh_forecast_rollup(full=full)
+    click.echo(f"Forecast rollup refreshed for {refreshed} assets")
+
+
+@bp.cli.command("snapshot-backlog")
+def snapshot_backlog_command():
+    """Write the daily backlog snapshots the reports start from; meant to run nightly from cron.
+
+    Without fresh snapshots the reports stay correct but read more of the event log.
+    """
+    through = (datetime.utcnow() - BACKLOG_SNAPSHOT_DELAY).date() - timedelta(days=1)
+    written = refresh_backlog_snapshots(through)
+    click.echo(f"Snapshotted {written} backlog days up to {through:%Y-%m-%d}")
+
+
+@bp.cli.command("archive-inspections")
+@click.option("--older-than-days", type=int, help="Defaults to ARCHIVE_AFTER_DAYS.")
+@click.option("--batch-size", default=ARCHIVE_BATCH_SIZE, show_default=True)
+@click.option("--dry-run", is_flag=True, help="Only count the inspections that would move.")
+def archive_inspections_command(older_than_days: Optional[int], batch_size: int, dry_run: bool):
+    """Move closed inspections to the archive; meant to run nightly from cron."""
+    days = older_than_days if older_than_days is not None else current_app.config["ARCHIVE_AFTER_DAYS"]
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    table = Inspection.__table__
+    if dry_run:
+        count = db.session.execute(
+            select(func.count()).select_from(table).where(closed_clause(table), table.c.updated_at < cutoff)
+        ).scalar()
+        click.echo(f"{count} closed inspections last updated before {cutoff:%Y-%m-%d} would be archived")
+        return
+    archived = archive_inspections(cutoff, batch_size=batch_size, log=click.echo)
+    click.echo(f"Archived {archived} inspections last updated before {cutoff:%Y-%m-%d}")
+
+
+@bp.cli.command("restore-inspections")
+@click.argument("inspection_ids", nargs=-1, type=int, required=True)
+def restore_inspections_command(inspection_ids: tuple):
+    """Move archived inspections back so they can be edited again."""
+    restored = restore_inspections(list(inspection_ids))
+    click.echo(f"Restored {restored} of {len(inspection_ids)} inspections")
+
+
+@bp.cli.command("build-static")
+def build_static_command():
+    """Fingerprint and precompress static files; restart the app to pick up the new manifest.
+
+    CI runs this before packaging. Run it locally after editing static/,
+    unless the app runs with --debug, which serves the source files directly.
+    """
+    sizes = build_static(current_app.static_folder)
+    for name, variants in sorted(sizes.items()):
+        compressed = ", ".join(f"{encoding} {size}" for encoding, size in variants.items() if encoding != "size")
+        click.echo(f"{name}: {variants['size']} bytes" + (f" ({compressed})" if compressed else ""))
+    click.echo(f"Built {len(sizes)} static files")
+
+
+@bp.cli.command("migrate-blobs")
+@click.option("--batch-size", default=100, show_default=True)
+@click.option("--sleep", "pause", default=0.0, show_default=True, help="Seconds to pause between batches.")
+@click.option("--dry-run", is_flag=True, help="Report what would move without writing anything.")
+@click.option("--restart", is_flag=True, help="Ignore the saved checkpoint and start from the first row.")
+@click.option("--delete-uploads", is_flag=True, help="Remove upload-folder copies once the blob is verified.")
+def migrate_blobs_command(batch_size: int, pause: float, dry_run: bool, restart: bool, delete_uploads: bool):
+    """Move PDFs out of inspections.pdf_data and the upload folder into the blob store.
+
+    Each batch is verified and committed in its own short transaction together
+    with the checkpoint, so the command can be interrupted and re-run.
+    """
+    checkpoint = db.session.get(JobCheckpoint, BLOB_MIGRATION_JOB) or JobCheckpoint(
+        name=BLOB_MIGRATION_JOB, last_id=0
+    )
+    db.session.add(checkpoint)
+    last_id = 0 if restart else checkpoint.last_id
+    if last_id:
+        click.echo(f"Resuming after inspection {last_id}")
+
+    clear_pdf_data = (
+        Inspection.__table__.update()
+        .where(Inspection.__table__.c.id == bindparam("row_id"))
+        .values(
+            pdf_data=None,
+            pdf_sha256=bindparam("digest"),
+            pdf_size=bindparam("size"),
+            updated_at=Inspection.__table__.c.updated_at,
+        )
+    )
+    migrated = failed = moved_bytes = 0
+    while True:
+        batch = (
+            db.session.query(Inspection.id, Inspection.pdf_filename, Inspection.pdf_sha256)
+            .filter(Inspection.id > last_id, or_(Inspection.pdf_data.isnot(None), Inspection.pdf_sha256.is_(None)))
+            .order_by(Inspection.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        updates = []
+        verified_uploads = []
+        for row in batch:
+            upload_path = os.path.join(current_app.config["UPLOAD_FOLDER"], row.pdf_filename)
+            data = db.session.query(Inspection.pdf_data).filter(Inspection.id == row.id).scalar()
+            if data is not None:
+                source, expected = BytesIO(data), hashlib.sha256(data).hexdigest()
+            elif os.path.exists(upload_path):
+                source, expected = open(upload_path, "rb"), row.pdf_sha256
+            else:
+                continue
 
-@app.route("/referral")
+            with source:
+                if dry_run:
+                    moved_bytes += len(data) if data is not None else os.path.getsize(upload_path)
+                    migrated += 1
+                    continue
+                digest, size = blob_store.put(source)
+
+            if (expected and digest != expected) or (row.pdf_sha256 and row.pdf_sha256 != digest) \
+                    or not blob_store.verify(digest):
+                click.echo(f"Inspection {row.id}: hash mismatch, left in place", err=True)
+                failed += 1
+                continue
+            updates.append({"row_id": row.id, "digest": digest, "size": size})
+            if os.path.exists(upload_path):
+                with open(upload_path, "rb") as f:
+                    if sha256_file(f) == digest:
+                        verified_uploads.append(upload_path)
+            moved_bytes += size
+
+        last_id = batch[-1].id
+        if not dry_run:
+            if updates:
+                db.session.execute(clear_pdf_data, updates)
+                bump_data_version("inspections")
+            checkpoint.last_id = last_id
+            db.session.commit()
+            if delete_uploads:
+                for upload_path in verified_uploads:
+                    if os.path.exists(upload_path):
+                        os.remove(upload_path)
+            migrated += len(updates)
+        click.echo(f"Up to inspection {last_id}: {migrated} migrated, {failed} failed, {moved_bytes / 1e6:.1f} MB")
+        if pause:
+            time.sleep(pause)
+
+    prefix = "Would migrate" if dry_run else "Migrated"
+    click.echo(f"{prefix} {migrated} PDFs ({moved_bytes / 1e6:.1f} MB), {failed} failed")
+    if not dry_run and migrated and db.engine.url.get_dialect().name == "postgresql":
+        click.echo("Run VACUUM on inspections to return the freed space to the operating system.")
+
+
+@bp.route("/referral")
 def referral_preview():
     """Static preview that mirrors the provided referral reward design."""
     return render_template("referral.html")
 
+
+def build_identifier(app: Flask) -> str:
+    """Hash of the templates and the static manifest; changes whenever a deploy changes the markup."""
+    digest = hashlib.sha256(json.dumps(app.extensions["static_manifest"], sort_keys=True).encode("utf-8"))
+    template_dir = os.path.join(app.root_path, app.template_folder)
+    for dirpath, dirnames, filenames in os.walk(template_dir):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            digest.update(os.path.relpath(path, template_dir).encode("utf-8"))
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
+    """Build a configured app; ``config`` overrides the environment (tests, benchmarks).
+
+    Nothing here opens a database connection: the pool connects on the first
+    query, so a gunicorn master running with preload_app forks workers that
+    share no sockets.
+    """
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key-change-me')
+    # Only read: PDFs from before the blob store that migrate-blobs has not moved yet.
+    app.config['UPLOAD_FOLDER'] = os.path.join(BASE_DIR, 'uploads')
+    app.config['BLOB_STORAGE_BACKEND'] = os.getenv('BLOB_STORAGE_BACKEND', 'local')
+    app.config['BLOB_STORAGE_PATH'] = os.getenv('BLOB_STORAGE_PATH', os.path.join(BASE_DIR, 'blobs'))
+    # Where archive-inspections moves PDFs of archived inspections (cheaper disk); defaults to the hot store.
+    app.config['COLD_BLOB_STORAGE_PATH'] = os.getenv('COLD_BLOB_STORAGE_PATH')
+    # Closed inspections untouched for this long are moved to inspections_archive.
+    app.config['ARCHIVE_AFTER_DAYS'] = int(os.getenv('ARCHIVE_AFTER_DAYS', '365'))
+    # Werkzeug rejects larger bodies from Content-Length before reading them; StagedBlob
+    # enforces the same limit per file for chunked requests without a length.
+    app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_MB', '50')) * 1024 * 1024
+    # Whole-request limit for bulk ingestion; each PDF inside is still held to MAX_CONTENT_LENGTH.
+    app.config['MAX_BULK_UPLOAD_BYTES'] = int(os.getenv('MAX_BULK_UPLOAD_MB', '1024')) * 1024 * 1024
+    app.config['BULK_INGEST_WORKERS'] = int(os.getenv('BULK_INGEST_WORKERS', '4'))
+    app.config['SQLALCHEMY_DATABASE_URI'] = normalize_database_uri(
+        os.getenv('DATABASE_URL', 'sqlite:///' + os.path.join(BASE_DIR, 'app.db'))
+    )
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN')
+    # Opt-in request instrumentation; PROFILE_DIR additionally enables the sampling profiler.
+    app.config['INSTRUMENTATION_ENABLED'] = env_flag('INSTRUMENTATION_ENABLED', False)
+    app.config['SLOW_REQUEST_MS'] = int(os.getenv('SLOW_REQUEST_MS', '500'))
+    app.config['N_PLUS_ONE_THRESHOLD'] = int(os.getenv('N_PLUS_ONE_THRESHOLD', '10'))
+    app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR')
+    app.config['PROFILE_INTERVAL_MS'] = int(os.getenv('PROFILE_INTERVAL_MS', '5'))
+    # Rendered dashboard fragments: "memory" (per worker), "file" (shared by workers on one host) or "none".
+    app.config['CACHE_BACKEND'] = os.getenv('CACHE_BACKEND', 'memory')
+    app.config['CACHE_DIR'] = os.getenv('CACHE_DIR', os.path.join(BASE_DIR, 'cache'))
+    app.config['CACHE_TTL_SECONDS'] = int(os.getenv('CACHE_TTL_SECONDS', '300'))
+    app.config['CACHE_MAX_ENTRIES'] = int(os.getenv('CACHE_MAX_ENTRIES', '256'))
+    # Background jobs (flask worker): claimed jobs whose worker stops heartbeating are retried after the lock timeout.
+    app.config['JOB_POLL_SECONDS'] = float(os.getenv('JOB_POLL_SECONDS', '2'))
+    app.config['JOB_MAX_ATTEMPTS'] = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))
+    app.config['JOB_LOCK_TIMEOUT_SECONDS'] = int(os.getenv('JOB_LOCK_TIMEOUT_SECONDS', '600'))
+    app.config.update(config or {})
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config['SQLALCHEMY_DATABASE_URI']))
+
+    app.request_class = InspectionRequest
+    app.extensions["blob_store"] = create_blob_store(
+        app.config['BLOB_STORAGE_BACKEND'], app.config['BLOB_STORAGE_PATH']
+    )
+    app.extensions["cold_blob_store"] = app.extensions["blob_store"]
+    cold_path = app.config['COLD_BLOB_STORAGE_PATH']
+    if cold_path and os.path.abspath(cold_path) != os.path.abspath(app.config['BLOB_STORAGE_PATH']):
+        app.extensions["cold_blob_store"] = create_blob_store(app.config['BLOB_STORAGE_BACKEND'], cold_path)
+    db.init_app(app)
+    app.before_request(require_current_schema)
+    app.register_blueprint(bp)
+    init_static_assets(app)
+    init_compression(app)
+    app.extensions["build_id"] = build_identifier(app)
+    app.extensions["dashboard_cache"] = create_cache(
+        app.config['CACHE_BACKEND'],
+        ttl=app.config['CACHE_TTL_SECONDS'],
+        max_entries=app.config['CACHE_MAX_ENTRIES'],
+        directory=app.config['CACHE_DIR'],
+        namespace=app.extensions["build_id"],
+    )
+
+    with app.app_context():
+        apply_transaction_statement_timeout(db.engine)
+        register_pool_metrics(db.engine)
+        init_instrumentation(app, db.engine, app.extensions["blob_store"])
+        _app_engines.add(db.engine)
+    return app
+
+
+# Engines of the apps built in this process. With preload_app the gunicorn
+# master builds the app before forking, so each child drops whatever pooled
+# connections it inherited instead of sharing their sockets with siblings.
+_app_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def _reset_pools_after_fork() -> None:
+    for engine in list(_app_engines):
+        # close=False leaves the parent's connections open for the parent.
+        engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+
+def __getattr__(name: str):
+    """Build the default app on first access to ``app.app`` (``gunicorn app:app``, ``flask --app app``)."""
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 5000))
     debug_mode = str(os.environ.get("FLASK_DEBUG", "true")).lower() not in {"0", "false", "no"}
-    app.run(host="0.0.0.0", port=port, debug=debug_mode)
+    dev_app = create_app()
+    # The dev server brings its own database up to date; gunicorn runs `flask migrate` on start (gunicorn.conf.py).
+    with dev_app.app_context():
+        migrate_database(log=print)
+    dev_app.run(host="0.0.0.0", port=port, debug=debug_mode)
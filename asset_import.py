@@ -0,0 +1,81 @@
+import csv
+import os
+import re
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator, Optional
+
+DATE_FORMATS = ("%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y", "%Y/%m/%d")
+
+
+def read_rows(path: str) -> Iterator[dict[str, Any]]:
+    """Yield one dict per data row, keyed by the header row, from a CSV or XLSX file."""
+    if os.path.splitext(path)[1].lower() in {".xlsx", ".xlsm"}:
+        yield from _read_xlsx(path)
+    else:
+        yield from _read_csv(path)
+
+
+def _read_csv(path: str) -> Iterator[dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        yield from csv.DictReader(f, dialect=dialect)
+
+
+def _read_xlsx(path: str) -> Iterator[dict[str, Any]]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+        for values in rows:
+            if any(value is not None for value in values):
+                yield dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+def parse_int(value: Any) -> Optional[int]:
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return round(value)
+    digits = re.sub(r"[^\d-]", "", str(value))
+    return int(digits) if digits not in {"", "-"} else None
+
+
+def parse_any_date(value: Any) -> Optional[date]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = str(value).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date: {value!r}")
+
+
+def parse_str(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+PARSERS = {"str": parse_str, "int": parse_int, "date": parse_any_date}
+
+
+def coerce_row(row: dict[str, Any], columns: Iterable[tuple[str, str, str]]) -> dict[str, Any]:
+    """Map a labelled source row onto typed model attributes.
+
+    ``columns`` is a sequence of ``(label, attribute, kind)`` where kind is one
+    of ``PARSERS``; labels missing from the source row become ``None``.
+    """
+    return {attr: PARSERS[kind](row.get(label)) for label, attr, kind in columns}
@@ -0,0 +1,563 @@
+"""Load and micro benchmarks for the inspection workflow.
+
+    python benchmarks/bench.py app --rows 100000 --pdf-kb 512 --requests 300 --concurrency 16 --output app.json
+    python benchmarks/bench.py micro --assets 50000 --output micro.json
+    python benchmarks/bench.py startup --runs 10 --output startup.json
+    python benchmarks/bench.py slow-clients --clients 300 --modes sync,async --output slow.json
+    python benchmarks/bench.py compare baseline.json app.json
+
+``app`` seeds a throwaway SQLite database (or ``--database-url``, e.g. a local
+Postgres container) and blob store, then drives the routes through the Flask
+test client and a threaded HTTP load generator against an in-process server
+(or ``--url`` for an already running gunicorn). ``startup`` times a cold
+``import app``, ``create_app()`` and the first requests in fresh interpreters.
+``slow-clients`` starts gunicorn in each SERVING_MODE and measures dashboard
+latency before and while hundreds of throttled PDF downloads are in flight.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import timeit
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+ADMIN = {"username": "admin", "password": "#GladPippi28!"}
+LETTERS = "ABCDEFGHJKLMNPRSTUWXYZ"
+DEALERS = ["Volvo Truck Center", "Scania Sverige", "Kvdbil", "Bilia", "Hedin Bil", "MAN Truck & Bus"]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(latencies: list[float], wall_time: float) -> dict:
+    ordered = sorted(latencies)
+    cuts = statistics.quantiles(ordered, n=100, method="inclusive") if len(ordered) > 1 else ordered * 99
+    return {
+        "requests": len(ordered),
+        "p50_ms": round(cuts[49] * 1000, 2),
+        "p95_ms": round(cuts[94] * 1000, 2),
+        "p99_ms": round(cuts[98] * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+        "throughput_rps": round(len(ordered) / wall_time, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def make_pdf(size: int, salt: int) -> bytes:
+    body = f"%PDF-1.4\n% bench {salt}\n".encode()
+    return body + b"0" * max(size - len(body) - 6, 0) + b"\n%%EOF"
+
+
+def seed(m, app, rows: int, pdf_kb: int, pdf_count: int, rng: random.Random) -> list[int]:
+    """Insert ``rows`` inspections referencing ``pdf_count`` distinct stored PDFs."""
+    insert = m.Inspection.__table__.insert()
+    started = datetime(2020, 1, 1)
+    with app.app_context():
+        blobs = [m.blob_store.put(io.BytesIO(make_pdf(pdf_kb * 1024, salt))) for salt in range(pdf_count)]
+        batch = []
+        for idx in range(rows):
+            digest, size = blobs[idx % pdf_count]
+            batch.append({
+                "registration_number": "".join(rng.choice(LETTERS) for _ in range(3)) + f"{idx:06d}",
+                "dealer_name": rng.choice(DEALERS),
+                "pdf_filename": f"seed_{idx}.pdf",
+                "pdf_sha256": digest,
+                "pdf_size": size,
+                "status_admin": rng.choice(m.ADMIN_STATUSES),
+                "status_reviewer": rng.choice(m.REVIEWER_STATUSES),
+                "created_at": started + timedelta(minutes=idx),
+                "updated_at": started + timedelta(minutes=idx),
+            })
+            if len(batch) >= 5000:
+                m.db.session.execute(insert, batch)
+                batch = []
+        if batch:
+            m.db.session.execute(insert, batch)
+        m.db.session.commit()
+        return [row.id for row in m.db.session.query(m.Inspection.id)]
+
+
+def run_client_scenarios(m, app, ids: list[int], requests: int, pdf_kb: int, rng: random.Random) -> dict:
+    client = app.test_client()
+    client.post("/login", data=ADMIN)
+    queries = ["AAA", "Volvo", "scania", "000123", "Pending"]
+    upload_counter = iter(range(10**9))
+
+    scenarios = {
+        "list_inspections": lambda: client.get("/inspections"),
+        "list_inspections_q": lambda: client.get("/inspections", query_string={"q": rng.choice(queries)}),
+        "view_pdf": lambda: client.get(f"/inspection/{rng.choice(ids)}/pdf"),
+        "edit_inspection": lambda: client.post(
+            f"/inspection/{rng.choice(ids)}/edit",
+            data={"cost_estimate": str(rng.randint(0, 50000)), "status_admin": rng.choice(m.ADMIN_STATUSES)},
+        ),
+        "upload_inspection": lambda: client.post(
+            "/upload",
+            data={
+                "registration_number": "BEN001",
+                "dealer_name": "Bench",
+                "pdf_file": (io.BytesIO(make_pdf(pdf_kb * 1024, 10**6 + next(upload_counter))), "bench.pdf"),
+            },
+            content_type="multipart/form-data",
+        ),
+    }
+
+    results = {}
+    for name, call in scenarios.items():
+        latencies = []
+        wall_started = time.perf_counter()
+        for _ in range(requests):
+            started = time.perf_counter()
+            response = call()
+            response.get_data()
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{name} returned {response.status_code}")
+        results[name] = summarize(latencies, time.perf_counter() - wall_started)
+        print(f"  client {name}: {results[name]}")
+    return results
+
+
+def login_cookie(base_url: str) -> str:
+    class NoRedirect(urllib.request.HTTPRedirectHandler):
+        def redirect_request(self, *args, **kwargs):
+            return None
+
+    body = urllib.parse.urlencode(ADMIN).encode()
+    opener = urllib.request.build_opener(NoRedirect)
+    try:
+        response = opener.open(f"{base_url}/login", data=body)
+    except urllib.error.HTTPError as redirect:
+        response = redirect
+    return response.headers["Set-Cookie"].split(";", 1)[0]
+
+
+def run_http_load(base_url: str, ids: list[int], requests: int, concurrency: int, rng: random.Random) -> dict:
+    cookie = login_cookie(base_url)
+    paths = {
+        "list_inspections": lambda: "/inspections",
+        "list_inspections_q": lambda: "/inspections?q=" + rng.choice(["AAA", "Volvo", "000123"]),
+        "view_pdf": lambda: f"/inspection/{rng.choice(ids)}/pdf",
+    }
+
+    def fetch(path: str) -> float:
+        started = time.perf_counter()
+        request = urllib.request.Request(base_url + path, headers={"Cookie": cookie})
+        with urllib.request.urlopen(request) as response:
+            while response.read(64 * 1024):
+                pass
+        return time.perf_counter() - started
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for name, make_path in paths.items():
+            targets = [make_path() for _ in range(requests)]
+            wall_started = time.perf_counter()
+            latencies = list(pool.map(fetch, targets))
+            results[name] = summarize(latencies, time.perf_counter() - wall_started)
+            results[name]["concurrency"] = concurrency
+            print(f"  http {name}: {results[name]}")
+    return results
+
+
+def command_app(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="inspection-bench-")
+    os.environ["DATABASE_URL"] = args.database_url or "sqlite:///" + os.path.join(workdir, "bench.db")
+    os.environ["BLOB_STORAGE_PATH"] = os.path.join(workdir, "blobs")
+    import app as m
+
+    app = m.create_app()
+    with app.app_context():
+        m.migrate_database()
+    rng = random.Random(args.seed)
+    seed_started = time.perf_counter()
+    ids = seed(m, app, args.rows, args.pdf_kb, args.pdf_count, rng)
+    print(f"Seeded {len(ids)} rows in {time.perf_counter() - seed_started:.1f}s ({workdir})")
+
+    results = {"client": run_client_scenarios(m, app, ids, args.requests, args.pdf_kb, rng)}
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        server = make_server("127.0.0.1", 0, app, threaded=True, request_handler=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        results["http"] = run_http_load(base_url, ids, args.requests, args.concurrency, rng)
+    finally:
+        if server:
+            server.shutdown()
+
+    results["params"] = {
+        "rows": args.rows, "pdf_kb": args.pdf_kb, "pdf_count": args.pdf_count,
+        "requests": args.requests, "concurrency": args.concurrency,
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+    }
+    return results
+
+
+# Runs in a fresh interpreter per sample so every import is cold.
+STARTUP_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app as m
+imported = time.perf_counter()
+application = m.create_app()
+created = time.perf_counter()
+client = application.test_client()
+client.get("/login").get_data()
+first_request = time.perf_counter()
+client.post("/login", data={"username": sys.argv[1], "password": sys.argv[2]})
+client.get("/inspections").get_data()
+first_dashboard = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "create_app_ms": (created - imported) * 1000,
+    "first_request_ms": (first_request - created) * 1000,
+    "first_dashboard_ms": (first_dashboard - first_request) * 1000,
+    "heavy_modules_loaded": sorted(name for name in ("numpy", "pypdf", "pypdfium2", "openpyxl") if name in sys.modules),
+}))
+"""
+
+
+def command_startup(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="inspection-startup-")
+    env = dict(
+        os.environ,
+        DATABASE_URL=args.database_url or "sqlite:///" + os.path.join(workdir, "startup.db"),
+        BLOB_STORAGE_PATH=os.path.join(workdir, "blobs"),
+        PYTHONPATH=REPO_ROOT,
+    )
+    subprocess.run(
+        [sys.executable, "-m", "flask", "--app", "app", "migrate"],
+        cwd=REPO_ROOT, env=env, check=True, capture_output=True,
+    )
+
+    samples: dict[str, list[float]] = {}
+    heavy_modules: set[str] = set()
+    for _ in range(args.runs):
+        started = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_PROBE, ADMIN["username"], ADMIN["password"]],
+            cwd=workdir, env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        process_ms = (time.perf_counter() - started) * 1000
+        sample = json.loads(output.strip().splitlines()[-1])
+        heavy_modules.update(sample.pop("heavy_modules_loaded"))
+        sample["process_ms"] = process_ms
+        for key, value in sample.items():
+            samples.setdefault(key, []).append(value)
+
+    results: dict = {}
+    for key, values in samples.items():
+        name = key[:-len("_ms")]
+        results[name] = {
+            "median_ms": round(statistics.median(values), 1),
+            "min_ms": round(min(values), 1),
+            "max_ms": round(max(values), 1),
+        }
+        print(f"  {name}: {results[name]}")
+    print(f"  heavy modules loaded by the first requests: {sorted(heavy_modules) or 'none'}")
+    results["params"] = {
+        "runs": args.runs,
+        "database": env["DATABASE_URL"].split(":", 1)[0],
+        "heavy_modules_loaded": sorted(heavy_modules),
+    }
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(base_url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(base_url + "/login", timeout=2).read()
+            return
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def slow_download(port: int, path: str, cookie: str, chunk: int, pause: float,
+                  headers_received: threading.Semaphore, stop: threading.Event, bytes_read: list) -> None:
+    """Fetch ``path`` like a phone on a bad link: a small receive window, read slowly."""
+    with socket.socket() as sock:
+        # Set before connecting so the advertised window stays small.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, chunk)
+        sock.settimeout(60)
+        sock.connect(("127.0.0.1", port))
+        sock.sendall(
+            f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\nConnection: close\r\n\r\n".encode()
+        )
+        total = 0
+        try:
+            data = sock.recv(chunk)
+            headers_received.release()
+            while data and not stop.is_set():
+                total += len(data)
+                time.sleep(pause)
+                data = sock.recv(chunk)
+        except OSError:
+            pass
+        bytes_read.append(total)
+
+
+def sample_dashboard(base_url: str, cookie: str, samples: int, timeout: float) -> dict:
+    latencies, errors = [], 0
+    wall_started = time.perf_counter()
+    for _ in range(samples):
+        started = time.perf_counter()
+        try:
+            request = urllib.request.Request(base_url + "/inspections", headers={"Cookie": cookie})
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                response.read()
+            latencies.append(time.perf_counter() - started)
+        except (urllib.error.URLError, ConnectionError, socket.timeout):
+            errors += 1
+        time.sleep(0.05)
+    result = summarize(latencies, time.perf_counter() - wall_started) if latencies else {"requests": 0}
+    result["errors"] = errors
+    return result
+
+
+def command_slow_clients(args) -> dict:
+    workdir = tempfile.mkdtemp(prefix="inspection-slow-")
+    os.environ["DATABASE_URL"] = args.database_url or "sqlite:///" + os.path.join(workdir, "slow.db")
+    os.environ["BLOB_STORAGE_PATH"] = os.path.join(workdir, "blobs")
+    import app as m
+
+    app = m.create_app()
+    with app.app_context():
+        m.migrate_database()
+    rng = random.Random(args.seed)
+    ids = seed(m, app, args.rows, args.pdf_kb, 1, rng)
+    print(f"Seeded {len(ids)} rows with a {args.pdf_kb} KiB PDF ({workdir})")
+
+    results: dict = {}
+    for mode in args.modes.split(","):
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", os.path.join(REPO_ROOT, "gunicorn.conf.py"),
+             "-w", str(args.workers), "-b", f"127.0.0.1:{port}", "--log-level", "warning", "app:app"],
+            cwd=REPO_ROOT, env=dict(os.environ, SERVING_MODE=mode),
+        )
+        stop = threading.Event()
+        clients: list[threading.Thread] = []
+        try:
+            wait_for_server(base_url)
+            cookie = login_cookie(base_url)
+            idle = sample_dashboard(base_url, cookie, args.samples, args.timeout)
+            print(f"  {mode} idle: {idle}")
+
+            headers_received = threading.Semaphore(0)
+            bytes_read: list[int] = []
+            for idx in range(args.clients):
+                client = threading.Thread(
+                    target=slow_download,
+                    args=(port, f"/inspection/{ids[idx % len(ids)]}/pdf", cookie, args.chunk_bytes,
+                          args.pause, headers_received, stop, bytes_read),
+                    daemon=True,
+                )
+                client.start()
+                clients.append(client)
+            # Count the transfers the server has actually started answering.
+            in_flight = 0
+            deadline = time.monotonic() + args.timeout
+            while in_flight < args.clients and headers_received.acquire(timeout=max(deadline - time.monotonic(), 0)):
+                in_flight += 1
+            loaded = sample_dashboard(base_url, cookie, args.samples, args.timeout)
+            loaded["transfers_started"] = in_flight
+            print(f"  {mode} with {args.clients} slow downloads: {loaded}")
+            results[mode] = {"idle": idle, "loaded": loaded}
+        finally:
+            stop.set()
+            for client in clients:
+                client.join(timeout=5)
+            server.terminate()
+            server.wait(timeout=30)
+
+    results["params"] = {
+        "clients": args.clients, "workers": args.workers, "pdf_kb": args.pdf_kb,
+        "client_kib_per_s": round(args.chunk_bytes / args.pause / 1024, 1),
+        "database": os.environ["DATABASE_URL"].split(":", 1)[0],
+    }
+    return results
+
+
+def time_call(stmt, number: int | None = None) -> dict:
+    timer = timeit.Timer(stmt)
+    if number is None:
+        number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=5, number=number)) / number
+    return {"per_call_us": round(best * 1e6, 3), "loops": number}
+
+
+def command_micro(args) -> dict:
+    os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(), "micro.db"))
+    import forecast
+    from app import format_currency
+
+    rng = random.Random(args.seed)
+    registration_month = [forecast.month_index(date(rng.randint(2012, 2026), rng.randint(1, 12), 1))
+                          for _ in range(args.assets)]
+    term = [rng.choice([12, 24, 36, 48, 60]) for _ in range(args.assets)]
+    monthly = [rng.randint(5000, 40000) for _ in range(args.assets)]
+    price_new = [rng.randint(500000, 3000000) for _ in range(args.assets)]
+    groups = [rng.randrange(12) for _ in range(args.assets)]
+    fleet = forecast.FleetArrays(
+        [f"R{idx} (SCANIA R580)" for idx in range(args.assets)], registration_month, term, monthly, price_new
+    )
+    today = date.today()
+    results = {
+        "forecast_matrix": time_call(lambda: forecast.forecast_matrix(fleet, today, args.horizon)),
+        "rollup_contributions": time_call(
+            lambda: forecast.rollup_contributions(groups, registration_month, term, monthly, price_new), number=1
+        ),
+        "add_months": time_call(lambda: forecast.add_months(date(2024, 1, 31), 13)),
+        "format_currency": time_call(lambda: format_currency(1234567)),
+        "params": {"assets": args.assets, "horizon": args.horizon},
+    }
+    for name, result in results.items():
+        print(f"  {name}: {result}")
+    return results
+
+
+def flatten(results: dict, prefix: str = "") -> dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        if key in {"params", "meta"}:
+            continue
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def command_compare(args) -> int:
+    with open(args.baseline) as f:
+        baseline = flatten(json.load(f))
+    with open(args.candidate) as f:
+        candidate = flatten(json.load(f))
+
+    regressions = 0
+    for key in sorted(baseline.keys() & candidate.keys()):
+        if not key.endswith(("_ms", "_us")) or not baseline[key]:
+            continue
+        change = (candidate[key] - baseline[key]) / baseline[key] * 100
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{key:60} {baseline[key]:>12} -> {candidate[key]:>12} ({change:+.1f}%){flag}")
+    return 1 if regressions else 0
+
+
+def metadata() -> dict:
+    try:
+        revision = subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    app_parser = subparsers.add_parser("app", help="Seed a database and benchmark the HTTP routes.")
+    app_parser.add_argument("--rows", type=int, default=10000)
+    app_parser.add_argument("--pdf-kb", type=int, default=256)
+    app_parser.add_argument("--pdf-count", type=int, default=20, help="Distinct PDFs shared by the seeded rows.")
+    app_parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+    app_parser.add_argument("--concurrency", type=int, default=8)
+    app_parser.add_argument("--database-url", help="Benchmark against this database instead of a temp SQLite file.")
+    app_parser.add_argument("--url", help="Send the HTTP load to a running server instead of an in-process one.")
+
+    micro_parser = subparsers.add_parser("micro", help="Micro-benchmark forecast and formatting helpers.")
+    micro_parser.add_argument("--assets", type=int, default=50000)
+    micro_parser.add_argument("--horizon", type=int, default=60)
+
+    startup_parser = subparsers.add_parser("startup", help="Time cold import, create_app() and first requests.")
+    startup_parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters to sample.")
+    startup_parser.add_argument("--database-url", help="Use this database instead of a temp SQLite file.")
+
+    slow_parser = subparsers.add_parser(
+        "slow-clients", help="Dashboard latency under gunicorn while slow PDF downloads are in flight."
+    )
+    slow_parser.add_argument("--modes", default="sync,async", help="Comma-separated SERVING_MODE values to compare.")
+    slow_parser.add_argument("--clients", type=int, default=300, help="Concurrent slow PDF downloads.")
+    slow_parser.add_argument("--workers", type=int, default=4)
+    slow_parser.add_argument("--rows", type=int, default=2000)
+    slow_parser.add_argument("--pdf-kb", type=int, default=8192)
+    slow_parser.add_argument("--chunk-bytes", type=int, default=4096, help="Bytes each client reads per pause.")
+    slow_parser.add_argument("--pause", type=float, default=0.05, help="Seconds each client waits between reads.")
+    slow_parser.add_argument("--samples", type=int, default=40, help="Dashboard requests per measurement.")
+    slow_parser.add_argument("--timeout", type=float, default=10.0, help="Seconds before a dashboard request counts as failed.")
+    slow_parser.add_argument("--database-url", help="Use this database instead of a temp SQLite file.")
+
+    for sub in (app_parser, micro_parser, startup_parser, slow_parser):
+        sub.add_argument("--seed", type=int, default=1)
+        sub.add_argument("--output", help="Write results as JSON to this path.")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two JSON result files.")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=10.0, help="Percent slowdown flagged as a regression.")
+
+    args = parser.parse_args()
+    if args.command == "compare":
+        return command_compare(args)
+
+    commands = {
+        "app": command_app, "micro": command_micro, "startup": command_startup, "slow-clients": command_slow_clients,
+    }
+    results = commands[args.command](args)
+    results["meta"] = metadata()
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+import hashlib
+import importlib
+import os
+import tempfile
+from typing import BinaryIO, Optional
+
+CHUNK_SIZE = 64 * 1024
+PDF_MAGIC = b"%PDF-"
+HEADER_SNIFF_BYTES = 8
+
+
+def sha256_file(f: BinaryIO) -> str:
+    hasher = hashlib.sha256()
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+# Not ValueError subclasses: Werkzeug's form parser silently swallows those.
+class BlobTooLarge(Exception):
+    pass
+
+
+class InvalidBlobHeader(Exception):
+    pass
+
+
+class StagedBlob:
+    """Writable temp file that hashes, sizes and sniffs content as it is written.
+
+    The staging file is removed on close unless a store has committed it.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_size: Optional[int] = None,
+                 expected_header: Optional[bytes] = None):
+        fd, self.path = tempfile.mkstemp(dir=directory)
+        self._file = os.fdopen(fd, "w+b")
+        self._hasher = hashlib.sha256()
+        self.size = 0
+        self.header = b""
+        self.max_size = max_size
+        self.expected_header = expected_header
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            self.close()
+            raise BlobTooLarge(f"Upload exceeds {self.max_size} bytes")
+        if len(self.header) < HEADER_SNIFF_BYTES:
+            self.header += data[:HEADER_SNIFF_BYTES - len(self.header)]
+            if self.expected_header and not self._header_compatible():
+                self.close()
+                raise InvalidBlobHeader("Unexpected file header")
+        self._hasher.update(data)
+        return self._file.write(data)
+
+    @property
+    def digest(self) -> str:
+        return self._hasher.hexdigest()
+
+    def _header_compatible(self) -> bool:
+        return self.header.startswith(self.expected_header) or self.expected_header.startswith(self.header)
+
+    @property
+    def header_valid(self) -> bool:
+        return self.expected_header is None or self.header.startswith(self.expected_header)
+
+    def detach(self) -> str:
+        """Close the file and hand its path over to the caller."""
+        self._file.close()
+        path, self.path = self.path, None
+        return path
+
+    def close(self) -> None:
+        self._file.close()
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class BlobStore:
+    """Content-addressed storage for inspection PDFs, keyed by SHA-256 hex digest.
+
+    Backends only need to implement the byte-level operations below; callers
+    never see where or how a blob is stored.
+    """
+
+    staging_dir: Optional[str] = None
+
+    def stage(self, max_size: Optional[int] = None,
+              expected_header: Optional[bytes] = None) -> StagedBlob:
+        return StagedBlob(self.staging_dir, max_size=max_size, expected_header=expected_header)
+
+    def put(self, stream: BinaryIO) -> tuple[str, int]:
+        """Store the stream's contents and return ``(sha256, size)``."""
+        staged = self.stage()
+        try:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                staged.write(chunk)
+            return self.commit(staged), staged.size
+        finally:
+            staged.close()
+
+    def commit(self, staged: StagedBlob) -> str:
+        """Persist a fully written staging file and return its digest."""
+        raise NotImplementedError
+
+    def open(self, digest: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def exists(self, digest: str) -> bool:
+        raise NotImplementedError
+
+    def size(self, digest: str) -> int:
+        raise NotImplementedError
+
+    def delete(self, digest: str) -> None:
+        raise NotImplementedError
+
+    def local_path(self, digest: str) -> Optional[str]:
+        """Return a filesystem path for the blob if the backend has one."""
+        return None
+
+    def verify(self, digest: str) -> bool:
+        """Re-read a stored blob and check that it still hashes to its key."""
+        with self.open(digest) as f:
+            return sha256_file(f) == digest
+
+
+class LocalBlobStore(BlobStore):
+    """Filesystem backend, sharded as ``<root>/ab/cd/abcd...``."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.staging_dir = os.path.join(root, "tmp")
+        os.makedirs(self.staging_dir, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest[2:4], digest)
+
+    def commit(self, staged: StagedBlob) -> str:
+        """Atomically move a fully written staging file into place.
+
+        If the blob already exists the staging file is simply discarded, so
+        identical uploads are stored once.
+        """
+        digest = staged.digest
+        final_path = self._path(digest)
+        if os.path.exists(final_path):
+            staged.close()
+            return digest
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(staged.detach(), final_path)
+        return digest
+
+    def open(self, digest: str) -> BinaryIO:
+        return open(self._path(digest), "rb")
+
+    def exists(self, digest: str) -> bool:
+        return os.path.exists(self._path(digest))
+
+    def size(self, digest: str) -> int:
+        return os.path.getsize(self._path(digest))
+
+    def delete(self, digest: str) -> None:
+        try:
+            os.remove(self._path(digest))
+        except FileNotFoundError:
+            pass
+
+    def local_path(self, digest: str) -> Optional[str]:
+        path = self._path(digest)
+        return path if os.path.exists(path) else None
+
+
+BLOB_BACKENDS = {
+    "local": LocalBlobStore,
+}
+
+
+def create_blob_store(backend: str, root: str) -> BlobStore:
+    """Instantiate a backend by short name or ``package.module:ClassName``."""
+    if backend in BLOB_BACKENDS:
+        return BLOB_BACKENDS[backend](root)
+    module_name, _, class_name = backend.partition(":")
+    if not class_name:
+        raise ValueError(f"Unknown blob storage backend: {backend}")
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class(root)
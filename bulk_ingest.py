@@ -0,0 +1,149 @@
+import csv
+import io
+import json
+import os
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Optional, Union
+
+from asset_import import parse_int, parse_str
+from blob_store import CHUNK_SIZE, PDF_MAGIC, BlobStore, BlobTooLarge, StagedBlob
+
+Source = Union[StagedBlob, BinaryIO]
+
+
+class ManifestError(Exception):
+    pass
+
+
+def parse_manifest(data: bytes, filename: str = "") -> list[dict[str, Any]]:
+    """Parse a CSV or JSON manifest into one item per listed PDF.
+
+    Each item carries the manifest ``line``, the parsed fields and an ``error``
+    that is set when the row itself is unusable; such rows are reported but
+    never stored.
+    """
+    text = data.decode("utf-8-sig")
+    if filename.lower().endswith(".json") or text.lstrip().startswith("["):
+        try:
+            rows = json.loads(text)
+        except ValueError as exc:
+            raise ManifestError(f"Manifest is not valid JSON: {exc}") from exc
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ManifestError("JSON manifest must be a list of objects")
+    else:
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=",;\t")
+        except csv.Error as exc:
+            raise ManifestError(f"Manifest is not valid CSV: {exc}") from exc
+        rows = list(csv.DictReader(io.StringIO(text), dialect=dialect))
+    if not rows:
+        raise ManifestError("Manifest lists no files")
+
+    items = []
+    for line, row in enumerate(rows, start=1):
+        row = {str(key).strip().lower(): value for key, value in row.items() if key is not None}
+        item = {
+            "line": line,
+            "file": parse_str(row.get("file")),
+            "registration_number": parse_str(row.get("registration_number")),
+            "dealer_name": parse_str(row.get("dealer_name")),
+            "cost_estimate": None,
+            "error": None,
+        }
+        try:
+            item["cost_estimate"] = parse_int(row.get("cost_estimate"))
+        except ValueError:
+            item["error"] = "Invalid cost estimate"
+        if not item["registration_number"]:
+            item["error"] = "Registration number is required"
+        if not item["file"]:
+            item["error"] = "File name is required"
+        items.append(item)
+    return items
+
+
+def zip_opener(archive: zipfile.ZipFile, max_size: int) -> Callable[[str], Source]:
+    """Resolve manifest file names to members of ``archive``.
+
+    Members are looked up by full path first and then by base name, so a
+    manifest can list ``report.pdf`` for ``batch-12/report.pdf``.
+    """
+    by_name: dict[str, zipfile.ZipInfo] = {}
+    for info in archive.infolist():
+        if not info.is_dir():
+            by_name.setdefault(info.filename, info)
+            by_name.setdefault(os.path.basename(info.filename), info)
+
+    def open_member(name: str) -> BinaryIO:
+        info = by_name.get(name)
+        if info is None:
+            raise KeyError(name)
+        if info.file_size > max_size:
+            raise BlobTooLarge(f"{name} exceeds {max_size} bytes")
+        return archive.open(info)
+
+    return open_member
+
+
+def _store_one(item: dict[str, Any], open_source: Callable[[str], Source],
+               blob_store: BlobStore, max_size: int) -> None:
+    try:
+        source = open_source(item["file"])
+    except KeyError:
+        item["error"] = "File not found in upload"
+        return
+    except BlobTooLarge:
+        item["error"] = f"File is larger than {max_size // (1024 * 1024)} MB"
+        return
+
+    if isinstance(source, StagedBlob):
+        staged = source
+    else:
+        staged = blob_store.stage(max_size=max_size)
+        try:
+            with source:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                    staged.write(chunk)
+        except BlobTooLarge:
+            item["error"] = f"File is larger than {max_size // (1024 * 1024)} MB"
+            return
+        except (OSError, zipfile.BadZipFile, zlib.error) as exc:
+            staged.close()
+            item["error"] = f"Could not read file: {exc}"
+            return
+
+    try:
+        if staged.size > max_size:
+            item["error"] = f"File is larger than {max_size // (1024 * 1024)} MB"
+        elif not staged.header.startswith(PDF_MAGIC):
+            item["error"] = "Not a PDF file"
+        else:
+            item["pdf_size"] = staged.size
+            item["pdf_sha256"] = blob_store.commit(staged)
+    finally:
+        staged.close()
+
+
+def store_files(items: list[dict[str, Any]], open_source: Callable[[str], Source],
+                blob_store: BlobStore, max_size: int, workers: Optional[int] = None) -> None:
+    """Validate and store every manifest item's PDF in parallel.
+
+    Hashing and blob writes release the GIL, so a thread pool keeps several
+    disks/uploads busy at once. Results are written back onto each item as
+    ``pdf_sha256``/``pdf_size`` or ``error``; each distinct file is read once.
+    """
+    by_file: dict[str, list[dict[str, Any]]] = {}
+    for item in items:
+        if not item["error"]:
+            by_file.setdefault(item["file"], []).append(item)
+    firsts = [group[0] for group in by_file.values()]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda item: _store_one(item, open_source, blob_store, max_size), firsts))
+    # Rows listing the same file share the first row's outcome.
+    for first, *rest in by_file.values():
+        for item in rest:
+            for key in ("pdf_sha256", "pdf_size", "error"):
+                if key in first:
+                    item[key] = first[key]
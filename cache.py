@@ -0,0 +1,152 @@
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, Optional
+
+from metrics import REGISTRY, Counter
+
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "cache_requests_total",
+    "Fragment cache lookups by result (hit/miss).",
+))
+
+_MISSING = object()
+
+
+class Cache:
+    """Small get/set cache interface; values expire ``ttl`` seconds after being set.
+
+    Keys should embed whatever data version they depend on, so invalidation is
+    a matter of bumping the version rather than deleting entries.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value or ``_MISSING``."""
+        raise NotImplementedError
+
+    def set(self, key: Hashable, value: Any) -> None:
+        raise NotImplementedError
+
+    def get_or_set(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        value = self.get(key)
+        if value is not _MISSING:
+            CACHE_REQUESTS.inc(result="hit")
+            return value
+        CACHE_REQUESTS.inc(result="miss")
+        value = compute()
+        self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class NullCache(Cache):
+    def get(self, key: Hashable) -> Any:
+        return _MISSING
+
+    def set(self, key: Hashable, value: Any) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+class MemoryCache(Cache):
+    """Per-process LRU with a TTL; each gunicorn worker warms its own copy."""
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        super().__init__(ttl)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class FileCache(Cache):
+    """Pickled entries in a local directory, shared by all workers on one host.
+
+    Entries are written to a temp file and renamed into place, so readers never
+    see a partial value. Expired files are ignored and overwritten on the next
+    miss; ``clear`` or a cron ``find -mmin`` removes them for good.
+    """
+
+    def __init__(self, ttl: float, directory: str, namespace: str = ""):
+        super().__init__(ttl)
+        self.directory = directory
+        # Entries outlive the process; the namespace keeps a new deploy from reading the old one's.
+        self.namespace = namespace
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: Hashable) -> str:
+        name = hashlib.sha256(repr((self.namespace, key)).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, name)
+
+    def get(self, key: Hashable) -> Any:
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) + self.ttl < time.time():
+                return _MISSING
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return _MISSING
+
+    def set(self, key: Hashable, value: Any) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def clear(self) -> None:
+        for name in os.listdir(self.directory):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+
+
+def create_cache(backend: str, ttl: float, max_entries: int = 256,
+                 directory: Optional[str] = None, namespace: str = "") -> Cache:
+    if backend == "memory":
+        return MemoryCache(ttl, max_entries)
+    if backend == "file":
+        if not directory:
+            raise ValueError("The file cache backend needs CACHE_DIR")
+        return FileCache(ttl, directory, namespace)
+    if backend == "none":
+        return NullCache(ttl)
+    raise ValueError(f"Unknown cache backend: {backend}")
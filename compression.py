@@ -0,0 +1,65 @@
+import gzip
+
+from flask import Flask, Response, request
+
+# Dynamic responses worth compressing; PDFs and images are already compressed.
+COMPRESSIBLE_MIMETYPES = {"text/html", "application/json", "text/csv", "text/plain"}
+# Below this the headers outweigh the savings.
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+# Quality 11 is for build-time assets; 5 keeps per-request CPU close to gzip.
+BROTLI_QUALITY = 5
+
+
+def _encoders():
+    encoders = {"gzip": lambda body: gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        return encoders
+    encoders["br"] = lambda body: brotli.compress(body, quality=BROTLI_QUALITY)
+    return encoders
+
+
+def choose_encoding(available) -> str | None:
+    """Best encoding the client accepts: br over gzip at equal preference."""
+    best, best_quality = None, 0.0
+    for encoding in ("br", "gzip"):
+        quality = request.accept_encodings[encoding]
+        if encoding in available and quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def init_compression(app: Flask) -> None:
+    """Compress buffered HTML/JSON/CSV responses with brotli or gzip.
+
+    Streamed and passthrough responses (exports, PDFs, static files) are left
+    alone. A strong ETag becomes weak, since the compressed bytes differ from
+    the identity ones; views compare If-None-Match weakly for that reason.
+    """
+    encoders = _encoders()
+
+    @app.after_request
+    def compress_response(response: Response) -> Response:
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "Content-Encoding" in response.headers
+            or request.method == "HEAD"
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        body = response.get_data()
+        encoding = choose_encoding(encoders) if len(body) >= COMPRESS_MIN_BYTES else None
+        if encoding is None:
+            return response
+
+        response.set_data(encoders[encoding](body))
+        response.headers["Content-Encoding"] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,110 @@
+import calendar
+from datetime import date
+
+# numpy is imported inside the functions that use it: the web app only needs
+# the date helpers at startup, and numpy adds ~70 ms to every cold import.
+
+
+def first_of_month(dt: date) -> date:
+    return date(dt.year, dt.month, 1)
+
+
+def add_months(base_date: date, months: int) -> date:
+    month = base_date.month - 1 + months
+    year = base_date.year + month // 12
+    month = month % 12 + 1
+    day = min(base_date.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
+
+
+def forecast_months(current_date: date, horizon_months: int = 12) -> list[date]:
+    return [add_months(first_of_month(current_date), offset) for offset in range(horizon_months)]
+
+
+def month_index(value: date) -> int:
+    """Months since year 0."""
+    return value.year * 12 + value.month - 1
+
+
+class FleetArrays:
+    """Column-oriented view of an asset list, parsed once and reused per forecast."""
+
+    def __init__(self, labels: list[str], registration_month, term, monthly, price_new):
+        import numpy as np
+
+        self.labels = labels
+        self.registration_month = np.asarray(registration_month, dtype=np.int64)
+        self.term = np.asarray(term, dtype=np.int64)
+        self.monthly = np.asarray(monthly, dtype=np.int64)
+        self.price_new = np.asarray(price_new, dtype=np.int64)
+
+    @classmethod
+    def from_assets(cls, assets) -> "FleetArrays":
+        """Build from typed Asset rows; assets without a registration date are skipped."""
+        assets = [asset for asset in assets if asset.first_registration_date is not None]
+        return cls(
+            [f"{asset.registration_number} ({asset.model})" for asset in assets],
+            [month_index(asset.first_registration_date) for asset in assets],
+            [asset.term_months or 0 for asset in assets],
+            [asset.monthly_depreciation or 0 for asset in assets],
+            [asset.price_new or 0 for asset in assets],
+        )
+
+
+def forecast_matrix(fleet: FleetArrays, current_date: date, horizon_months: int = 12):
+    """Vectorized forecast: returns ``(month_labels, values, totals)``.
+
+    ``values`` is an ``assets x months`` masked array whose masked cells are
+    months outside the asset's term; ``totals`` is the depreciation per month.
+    """
+    import numpy as np
+
+    start = first_of_month(current_date)
+    month_labels = [add_months(start, offset).strftime("%Y-%m") for offset in range(horizon_months)]
+    months_axis = month_index(start) + np.arange(horizon_months, dtype=np.int64)
+
+    since_registration = months_axis[np.newaxis, :] - fleet.registration_month[:, np.newaxis]
+    out_of_term = (since_registration < 0) | (since_registration > fleet.term[:, np.newaxis])
+
+    depreciated = fleet.price_new[:, np.newaxis] - fleet.monthly[:, np.newaxis] * since_registration
+    values = np.ma.masked_array(np.maximum(depreciated, 0), mask=out_of_term)
+    totals = np.where(out_of_term, 0, fleet.monthly[:, np.newaxis]).sum(axis=0)
+    return month_labels, values, totals
+
+
+def month_start(index: int) -> date:
+    """Inverse of month_index: first day of the indexed month."""
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def rollup_contributions(group_ids, registration_month, term, monthly, price_new):
+    """Spread each asset over every month of its term and sum per (group, month).
+
+    Returns arrays ``(group, month, depreciation, book_value, asset_count)``
+    with one entry per distinct pair; ``month`` is a month_index value.
+    """
+    import numpy as np
+
+    group_ids = np.asarray(group_ids, dtype=np.int64)
+    registration_month = np.asarray(registration_month, dtype=np.int64)
+    monthly = np.asarray(monthly, dtype=np.int64)
+    price_new = np.asarray(price_new, dtype=np.int64)
+    lengths = np.maximum(np.asarray(term, dtype=np.int64) + 1, 0)
+
+    owner = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.cumsum(lengths) - lengths
+    since_registration = np.arange(lengths.sum()) - np.repeat(starts, lengths)
+    months = registration_month[owner] + since_registration
+    book_value = np.maximum(price_new[owner] - monthly[owner] * since_registration, 0)
+
+    keys, inverse = np.unique(
+        np.stack([group_ids[owner], months], axis=1).reshape(-1, 2), axis=0, return_inverse=True
+    )
+    inverse = inverse.reshape(-1)
+    depreciation_sum = np.zeros(len(keys), dtype=np.int64)
+    book_value_sum = np.zeros(len(keys), dtype=np.int64)
+    asset_count = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(depreciation_sum, inverse, monthly[owner])
+    np.add.at(book_value_sum, inverse, book_value)
+    np.add.at(asset_count, inverse, 1)
+    return keys[:, 0], keys[:, 1], depreciation_sum, book_value_sum, asset_count
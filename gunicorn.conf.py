@@ -0,0 +1,73 @@
+"""gunicorn settings, picked up automatically when gunicorn starts in this directory.
+
+    gunicorn -w 4 app:app                         # sync workers (default)
+    SERVING_MODE=async gunicorn -w 4 app:app      # gevent workers
+
+A sync worker serves one request at a time, so a PDF download over a slow
+mobile link holds a whole worker until the last byte is sent. In async mode
+each worker runs up to WORKER_CONNECTIONS requests as greenlets: socket reads
+and writes (PDF streaming, uploads) yield to other requests instead of
+blocking, and psycopg2 waits on its socket cooperatively. Database work stays
+bounded by the SQLAlchemy pool (DB_POOL_SIZE + DB_MAX_OVERFLOW per worker);
+requests beyond that wait for a connection rather than opening more.
+
+Async mode must not be combined with --preload: gevent has to patch the
+standard library before the app imports it.
+
+Before any worker starts, the master runs `flask --app app migrate` (App
+Service's default startup command is plain gunicorn, which reads this file).
+Set MIGRATE_ON_START=0 where migrations are run as a separate deploy step.
+"""
+import os
+import subprocess
+import sys
+
+SERVING_MODE = os.getenv("SERVING_MODE", "sync")
+
+if SERVING_MODE == "async":
+    worker_class = "gevent"
+    worker_connections = int(os.getenv("WORKER_CONNECTIONS", "1000"))
+elif SERVING_MODE != "sync":
+    raise ValueError(f"Unknown SERVING_MODE {SERVING_MODE!r}; expected 'sync' or 'async'")
+
+MIGRATE_ON_START = os.getenv("MIGRATE_ON_START", "1").lower() not in {"0", "false", "no"}
+
+
+def on_starting(server):
+    if not MIGRATE_ON_START:
+        return
+    # A separate process, so the master never imports the app (see --preload above).
+    # Concurrent instances serialize on the migration lock; a failure stops the start.
+    subprocess.run(
+        [sys.executable, "-m", "flask", "--app", "app", "migrate"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        check=True,
+    )
+
+
+def _gevent_wait_callback(conn, timeout=None):
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            return
+        if state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state!r}")
+
+
+def post_worker_init(worker):
+    # Also covers `-k gevent` passed on the command line without SERVING_MODE.
+    if "gevent" not in worker.cfg.worker_class_str:
+        return
+    try:
+        from psycopg2 import extensions
+    except ImportError:
+        return
+    # Without this a query blocks every greenlet in the worker until it returns.
+    extensions.set_wait_callback(_gevent_wait_callback)
@@ -0,0 +1,201 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+from datetime import datetime
+from functools import wraps
+from typing import Optional
+
+from flask import Flask, before_render_template, g, has_request_context, request, template_rendered
+from sqlalchemy import event
+
+from metrics import REGISTRY, Counter, Histogram
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route, method and status.",
+))
+REQUEST_SQL_TIME = REGISTRY.register(Histogram(
+    "http_request_sql_seconds",
+    "Time spent in SQL per request, by route.",
+))
+REQUEST_QUERIES = REGISTRY.register(Histogram(
+    "http_request_sql_queries",
+    "SQL statements executed per request, by route.",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 250),
+))
+N_PLUS_ONE_WARNINGS = REGISTRY.register(Counter(
+    "n_plus_one_warnings_total",
+    "Requests that repeated one SQL statement at least N_PLUS_ONE_THRESHOLD times.",
+))
+
+BLOB_METHODS = ("put", "commit", "open", "exists", "size", "delete", "local_path", "verify")
+
+
+class RequestStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.blob_time = 0.0
+        self.statements: StackCounter = StackCounter()
+
+
+def _stats() -> Optional[RequestStats]:
+    return g.get("request_stats") if has_request_context() else None
+
+
+class StackSampler:
+    """One background thread sampling the stacks of registered request threads.
+
+    Samples are kept per thread and written as collapsed stacks
+    ("frame;frame;frame count"), which flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._active: dict[int, StackCounter] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ensure_running(self) -> None:
+        # Started lazily so each forked gunicorn worker gets its own thread.
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+
+    def start(self, thread_id: int) -> None:
+        with self._lock:
+            self._active[thread_id] = StackCounter()
+            self._ensure_running()
+
+    def stop(self, thread_id: int) -> StackCounter:
+        with self._lock:
+            return self._active.pop(thread_id, StackCounter())
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[self._collapse(frame)] += 1
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        names = []
+        while frame is not None:
+            code = frame.f_code
+            names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(names))
+
+
+def _timed_blob_method(method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            stats = _stats()
+            if stats is not None:
+                stats.blob_time += time.perf_counter() - started
+    return wrapper
+
+
+def init_instrumentation(app: Flask, engine, blob_store) -> None:
+    """Wire timing hooks into the app; a no-op unless INSTRUMENTATION_ENABLED is set."""
+    if not app.config.get("INSTRUMENTATION_ENABLED"):
+        return
+
+    slow_request_seconds = app.config["SLOW_REQUEST_MS"] / 1000
+    n_plus_one_threshold = app.config["N_PLUS_ONE_THRESHOLD"]
+    profile_dir = app.config.get("PROFILE_DIR")
+    sampler = StackSampler(app.config["PROFILE_INTERVAL_MS"] / 1000) if profile_dir else None
+
+    for name in BLOB_METHODS:
+        setattr(blob_store, name, _timed_blob_method(getattr(blob_store, name)))
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_started"].pop()
+        stats = _stats()
+        if stats is not None:
+            stats.sql_count += 1
+            stats.sql_time += elapsed
+            stats.statements[statement] += 1
+
+    def on_before_render(sender, template, context, **extra):
+        g.template_started = time.perf_counter()
+
+    def on_rendered(sender, template, context, **extra):
+        stats = _stats()
+        started = g.pop("template_started", None)
+        if stats is not None and started is not None:
+            stats.template_time += time.perf_counter() - started
+
+    before_render_template.connect(on_before_render, app, weak=False)
+    template_rendered.connect(on_rendered, app, weak=False)
+
+    @app.before_request
+    def start_request_stats():
+        g.request_stats = RequestStats()
+        if sampler:
+            sampler.start(threading.get_ident())
+
+    @app.teardown_request
+    def stop_sampling(error=None):
+        if sampler:
+            sampler.stop(threading.get_ident())
+
+    @app.after_request
+    def finish_request_stats(response):
+        stats = _stats()
+        if stats is None:
+            return response
+        elapsed = time.perf_counter() - stats.started
+        route = request.endpoint or "unmatched"
+
+        REQUEST_LATENCY.observe(elapsed, route=route, method=request.method, status=str(response.status_code))
+        REQUEST_SQL_TIME.observe(stats.sql_time, route=route)
+        REQUEST_QUERIES.observe(stats.sql_count, route=route)
+        response.headers["Server-Timing"] = ", ".join([
+            f'sql;dur={stats.sql_time * 1000:.1f};desc="{stats.sql_count} queries"',
+            f"tpl;dur={stats.template_time * 1000:.1f}",
+            f"blob;dur={stats.blob_time * 1000:.1f}",
+            f"total;dur={elapsed * 1000:.1f}",
+        ])
+
+        if stats.statements:
+            statement, repeats = stats.statements.most_common(1)[0]
+            if repeats >= n_plus_one_threshold:
+                N_PLUS_ONE_WARNINGS.inc(route=route)
+                app.logger.warning(
+                    "Possible N+1 in %s: statement ran %d times: %s",
+                    route, repeats, " ".join(statement.split())[:200],
+                )
+
+        samples = sampler.stop(threading.get_ident()) if sampler else None
+        if elapsed >= slow_request_seconds:
+            app.logger.warning(
+                "Slow request %s %s: %.0f ms (sql %.0f ms / %d queries, templates %.0f ms, blob %.0f ms)",
+                request.method, request.path, elapsed * 1000, stats.sql_time * 1000,
+                stats.sql_count, stats.template_time * 1000, stats.blob_time * 1000,
+            )
+            if samples:
+                os.makedirs(profile_dir, exist_ok=True)
+                stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+                path = os.path.join(profile_dir, f"{stamp}_{route}.folded")
+                with open(path, "w") as f:
+                    for stack, count in samples.items():
+                        f.write(f"{stack} {count}\n")
+        return response
@@ -0,0 +1,112 @@
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DatabaseError
+
+SCHEMA_VERSION_TABLE = "schema_version"
+# Arbitrary key for pg_advisory_lock so two deploys never migrate at once.
+MIGRATION_LOCK_KEY = 7_301_455
+
+
+class Migration:
+    """One schema change, applied once and recorded in schema_version.
+
+    ``apply`` receives a connection. Transactional migrations run inside a
+    transaction that also records the version; non-transactional ones (needed
+    for ``CREATE INDEX CONCURRENTLY``) run in autocommit mode and must be safe
+    to re-run if interrupted before the version is recorded.
+    """
+
+    def __init__(self, version: int, name: str, apply: Callable[[Connection], None],
+                 transactional: bool = True):
+        self.version = version
+        self.name = name
+        self.apply = apply
+        self.transactional = transactional
+
+
+def ensure_version_table(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, name VARCHAR(200) NOT NULL, applied_at TIMESTAMP NOT NULL)"
+        ))
+
+
+def applied_versions(engine: Engine) -> set[int]:
+    """Versions recorded so far; an empty set if the table does not exist yet."""
+    try:
+        with engine.connect() as conn:
+            return set(conn.execute(text(f"SELECT version FROM {SCHEMA_VERSION_TABLE}")).scalars())
+    except DatabaseError:
+        return set()
+
+
+def pending_migrations(engine: Engine, migrations: Iterable[Migration]) -> List[Migration]:
+    done = applied_versions(engine)
+    return sorted((m for m in migrations if m.version not in done), key=lambda m: m.version)
+
+
+def _record(conn: Connection, migration: Migration) -> None:
+    conn.execute(
+        text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name, applied_at) VALUES (:version, :name, :at)"),
+        {"version": migration.version, "name": migration.name, "at": datetime.utcnow()},
+    )
+
+
+def run_migrations(engine: Engine, migrations: Iterable[Migration],
+                   log: Optional[Callable[[str], None]] = None) -> List[Migration]:
+    """Apply pending migrations in version order and return the ones applied."""
+    migrations = list(migrations)
+    versions = [m.version for m in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError("Duplicate migration versions")
+
+    ensure_version_table(engine)
+    is_postgres = engine.dialect.name == "postgresql"
+    lock_conn = engine.connect().execution_options(isolation_level="AUTOCOMMIT") if is_postgres else None
+    try:
+        if lock_conn is not None:
+            lock_conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        # Re-read under the lock: another deploy may have just finished.
+        applied = []
+        for migration in pending_migrations(engine, migrations):
+            if log:
+                log(f"Applying {migration.version:04d} {migration.name}")
+            if migration.transactional:
+                with engine.begin() as conn:
+                    migration.apply(conn)
+                    _record(conn, migration)
+            else:
+                with engine.connect() as conn:
+                    migration.apply(conn.execution_options(isolation_level="AUTOCOMMIT"))
+                with engine.begin() as conn:
+                    _record(conn, migration)
+            applied.append(migration)
+        return applied
+    finally:
+        if lock_conn is not None:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            lock_conn.close()
+
+
+def create_index(conn: Connection, name: str, definition: str) -> None:
+    """Create ``name`` without blocking writes on Postgres.
+
+    ``definition`` is everything after the index name, e.g.
+    ``"ON inspections (created_at, id)"``. A previous interrupted
+    CONCURRENTLY build leaves an invalid index behind, which is dropped and
+    rebuilt. Must run on an autocommit connection on Postgres.
+    """
+    if conn.dialect.name != "postgresql":
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} {definition}"))
+        return
+    invalid = conn.execute(text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {"name": name}).first()
+    if invalid:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+    conn.execute(text(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} {definition}"))
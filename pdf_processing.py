@@ -0,0 +1,79 @@
+import logging
+from io import BytesIO
+from typing import BinaryIO, Optional
+
+from pypdf import PdfReader
+from pypdf.errors import PdfReadError
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXT_CHARS = 200_000
+THUMBNAIL_WIDTH = 240
+
+
+class PdfProcessingError(Exception):
+    pass
+
+
+class PdfSummary:
+    """What the dashboard needs from a PDF, so requests never have to open the blob."""
+
+    def __init__(self, page_count: int, text: str, thumbnail_png: Optional[bytes]):
+        self.page_count = page_count
+        self.text = text
+        self.thumbnail_png = thumbnail_png
+
+
+def extract_text(reader: PdfReader, max_chars: int = MAX_TEXT_CHARS) -> str:
+    parts = []
+    total = 0
+    for page in reader.pages:
+        try:
+            page_text = page.extract_text() or ""
+        except Exception:  # pypdf raises a wide range of errors on malformed content streams
+            logger.warning("Could not extract text from a page", exc_info=True)
+            continue
+        parts.append(page_text)
+        total += len(page_text)
+        if total >= max_chars:
+            break
+    return "\n".join(parts)[:max_chars]
+
+
+def render_thumbnail(f: BinaryIO, width: int = THUMBNAIL_WIDTH) -> Optional[bytes]:
+    """Render the first page as a PNG, or return None when pypdfium2/Pillow are not installed."""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
+
+    document = pdfium.PdfDocument(f)
+    try:
+        if len(document) == 0:
+            return None
+        page = document[0]
+        page_width = page.get_width() or width
+        image = page.render(scale=width / page_width).to_pil()
+        out = BytesIO()
+        image.save(out, format="PNG", optimize=True)
+        return out.getvalue()
+    finally:
+        document.close()
+
+
+def summarize_pdf(f: BinaryIO, thumbnail_width: int = THUMBNAIL_WIDTH) -> PdfSummary:
+    """Read page count, text and a first-page thumbnail from a seekable PDF stream."""
+    try:
+        reader = PdfReader(f)
+        page_count = len(reader.pages)
+        text = extract_text(reader)
+    except PdfReadError as exc:
+        raise PdfProcessingError(f"Unreadable PDF: {exc}") from exc
+
+    f.seek(0)
+    try:
+        thumbnail = render_thumbnail(f, thumbnail_width)
+    except Exception:  # a bad render should not lose the text we already have
+        logger.warning("Could not render PDF thumbnail", exc_info=True)
+        thumbnail = None
+    return PdfSummary(page_count, text, thumbnail)
@@ -0,0 +1,65 @@
+// Admin sections (fleet overview, forecast) are fetched after the inspection
+// table has painted, so a slow forecast never holds up the first byte.
+(function () {
+  function loadSection(section) {
+    fetch(section.dataset.sectionUrl, { credentials: "same-origin" })
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error("HTTP " + response.status);
+        }
+        return response.text();
+      })
+      .then(function (html) {
+        section.outerHTML = html;
+      })
+      .catch(function () {
+        section.querySelector(".section-status").textContent = "Could not load this section. Reload the page to retry.";
+      });
+  }
+
+  // "More" links in a section fetch its next page and append the rows in place.
+  function loadMore(link) {
+    var section = link.closest(".card");
+    link.textContent = "Loading…";
+    fetch(link.href, { credentials: "same-origin" })
+      .then(function (response) {
+        if (!response.ok) {
+          throw new Error("HTTP " + response.status);
+        }
+        return response.text();
+      })
+      .then(function (html) {
+        var next = document.createElement("template");
+        next.innerHTML = html;
+        var tbody = section.querySelector("tbody");
+        next.content.querySelectorAll("tbody > tr").forEach(function (row) {
+          tbody.appendChild(row);
+        });
+        var pagination = next.content.querySelector(".pagination");
+        if (pagination) {
+          link.parentNode.replaceWith(pagination);
+        } else {
+          link.parentNode.remove();
+        }
+      })
+      .catch(function () {
+        link.textContent = "Could not load more. Click to retry.";
+      });
+  }
+
+  document.addEventListener("click", function (event) {
+    var link = event.target.closest("[data-section-more]");
+    if (link) {
+      event.preventDefault();
+      loadMore(link);
+    }
+  });
+
+  function loadAll() {
+    document.querySelectorAll("[data-section-url]").forEach(loadSection);
+  }
+
+  window.requestAnimationFrame(function () {
+    setTimeout(loadAll, 0);
+  });
+})();
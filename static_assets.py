@@ -0,0 +1,146 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+from typing import Dict
+
+from flask import Flask, Response, abort, request, send_file
+from werkzeug.security import safe_join
+
+# Built files live under static/<STATIC_BUILD_DIR>, named by content hash.
+STATIC_BUILD_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE_EXTENSIONS = {".css", ".js", ".svg", ".json", ".txt", ".html", ".map"}
+# Precompressed variants, in order of preference.
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def fingerprint(name: str, content: bytes) -> str:
+    """``css/style.css`` -> ``css/style.<hash>.css``."""
+    root, ext = os.path.splitext(name)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:12]}{ext}"
+
+
+def _write(path: str, content: bytes) -> None:
+    # Written aside and renamed, so a running server never sends half a file.
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def _compressors():
+    compressors = {"gzip": lambda content: gzip.compress(content, compresslevel=9, mtime=0)}
+    try:
+        import brotli
+    except ImportError:
+        return compressors
+    compressors["br"] = lambda content: brotli.compress(content, quality=11)
+    return compressors
+
+
+def build_static(static_dir: str) -> Dict[str, Dict[str, int]]:
+    """Copy each static file into the build dir under its hashed name and write the manifest.
+
+    Text assets also get ``.gz`` (and ``.br`` when the brotli package is
+    installed) variants, kept only when smaller than the original. Files from
+    earlier builds are left in place so pages rendered before a deploy keep
+    loading. Returns ``{name: {"size": ..., "<encoding>": compressed size}}``.
+    """
+    build_dir = os.path.join(static_dir, STATIC_BUILD_DIR)
+    compressors = _compressors()
+    manifest: Dict[str, str] = {}
+    sizes: Dict[str, Dict[str, int]] = {}
+    for dirpath, dirnames, filenames in os.walk(static_dir):
+        dirnames[:] = sorted(d for d in dirnames if os.path.join(dirpath, d) != build_dir)
+        for filename in sorted(filenames):
+            source = os.path.join(dirpath, filename)
+            name = os.path.relpath(source, static_dir).replace(os.sep, "/")
+            with open(source, "rb") as f:
+                content = f.read()
+            hashed = fingerprint(name, content)
+            target = os.path.join(build_dir, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            _write(target, content)
+            manifest[name] = hashed
+            sizes[name] = {"size": len(content)}
+
+            if os.path.splitext(name)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            for encoding, suffix in ENCODINGS:
+                compress = compressors.get(encoding)
+                if compress is None:
+                    continue
+                compressed = compress(content)
+                if len(compressed) < len(content):
+                    _write(target + suffix, compressed)
+                    sizes[name][encoding] = len(compressed)
+
+    os.makedirs(build_dir, exist_ok=True)
+    _write(os.path.join(build_dir, MANIFEST_NAME), json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    return sizes
+
+
+def load_manifest(static_dir: str) -> Dict[str, str]:
+    """``{name: hashed name}`` from the last build; empty when nothing was built."""
+    try:
+        with open(os.path.join(static_dir, STATIC_BUILD_DIR, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def send_fingerprinted(build_dir: str, name: str) -> Response:
+    """Send a built file, precompressed if the client accepts it, cached as immutable."""
+    path = safe_join(build_dir, name)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+    mimetype = mimetypes.guess_type(name)[0] or "application/octet-stream"
+
+    encoding = None
+    for candidate, suffix in ENCODINGS:
+        if request.accept_encodings[candidate] and os.path.isfile(path + suffix):
+            encoding, path = candidate, path + suffix
+            break
+
+    response = send_file(path, mimetype=mimetype, max_age=IMMUTABLE_MAX_AGE, conditional=True)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+def init_static_assets(app: Flask) -> None:
+    """Point ``url_for('static', ...)`` at the fingerprinted build, if there is one.
+
+    Templates keep using the source names; the manifest maps them to hashed
+    files under static/dist, which are served with far-future immutable
+    caching. Debug mode ignores the build so edits show up without rebuilding.
+
+    static/dist is not committed: CI runs ``flask --app app build-static``
+    before packaging. Locally, either run with ``--debug`` or rerun
+    build-static after editing static/, otherwise an earlier build keeps
+    being served.
+    """
+    static_dir = app.static_folder
+    build_dir = os.path.join(static_dir, STATIC_BUILD_DIR)
+    manifest = {} if app.debug else load_manifest(static_dir)
+    app.extensions["static_manifest"] = manifest
+    prefix = STATIC_BUILD_DIR + "/"
+
+    @app.url_defaults
+    def fingerprinted_static_url(endpoint: str, values: dict) -> None:
+        if endpoint == "static" and values.get("filename") in manifest:
+            values["filename"] = prefix + manifest[values["filename"]]
+
+    def static(filename: str) -> Response:
+        # Everything under dist/ is content-addressed, including older builds.
+        if filename.startswith(prefix) and filename != prefix + MANIFEST_NAME:
+            return send_fingerprinted(build_dir, filename[len(prefix):])
+        return app.send_static_file(filename)
+
+    app.view_functions["static"] = static
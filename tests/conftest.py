@@ -0,0 +1,88 @@
+"""Shared fixtures: every test gets its own migrated SQLite database and blob store."""
+import io
+
+import pytest
+
+import app as inspection_app
+
+ADMIN = {"username": "admin", "password": "#GladPippi28!"}
+REVIEWER = {"username": "approver", "password": "#GladPingvin12!"}
+PDF_BYTES = b"%PDF-1.4\n" + b"0" * 2048 + b"\n%%EOF\n"
+
+
+def make_app(tmp_path, **config):
+    return inspection_app.create_app({
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'app.db'}",
+        "BLOB_STORAGE_PATH": str(tmp_path / "blobs"),
+        "UPLOAD_FOLDER": str(tmp_path / "uploads"),
+        "CACHE_BACKEND": "memory",
+        **config,
+    })
+
+
+@pytest.fixture
+def app_config():
+    """Extra config for the ``app`` fixture; override it in a test module."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    application = make_app(tmp_path, **app_config)
+    with application.app_context():
+        inspection_app.migrate_database()
+        yield application
+        inspection_app.db.session.remove()
+
+
+def logged_in_client(app, credentials):
+    client = app.test_client()
+    client.post("/login", data=credentials)
+    # The first page after login carries the "logged in" flash; consume it.
+    client.get("/inspections")
+    return client
+
+
+@pytest.fixture
+def admin(app):
+    return logged_in_client(app, ADMIN)
+
+
+@pytest.fixture
+def reviewer(app):
+    return logged_in_client(app, REVIEWER)
+
+
+def upload(client, registration_number="ABC123", dealer_name="Bilhall", pdf=PDF_BYTES):
+    """Upload one inspection through the form and return the response."""
+    return client.post(
+        "/upload",
+        data={
+            "registration_number": registration_number,
+            "dealer_name": dealer_name,
+            "pdf_file": (io.BytesIO(pdf), "report.pdf"),
+        },
+        content_type="multipart/form-data",
+    )
+
+
+def add_inspections(count, **fields):
+    """Insert ``count`` inspections directly, bypassing uploads; returns their ids."""
+    table = inspection_app.Inspection.__table__
+    rows = [
+        {
+            "registration_number": f"REG{index:05d}",
+            "dealer_name": "Dealer",
+            "pdf_filename": f"{index}.pdf",
+            "status_admin": "Pending",
+            "status_reviewer": "Pending",
+            **fields,
+        }
+        for index in range(count)
+    ]
+    inspection_app.db.session.execute(table.insert(), rows)
+    inspection_app.db.session.commit()
+    return [row.id for row in inspection_app.db.session.query(inspection_app.Inspection.id).order_by(
+        inspection_app.Inspection.id
+    )]
@@ -0,0 +1,37 @@
+import json
+
+import brotli
+
+import app as inspection_app
+from tests.conftest import add_inspections
+
+
+def test_api_pages_are_authorized_compressed_and_revalidated(app, admin, reviewer):
+    ids = add_inspections(inspection_app.PAGE_SIZE + 1)
+
+    logged_out = app.test_client().get("/api/inspections")
+    assert logged_out.status_code == 401
+    assert logged_out.get_json() == {"error": "Login required"}
+    assert reviewer.get("/api/assets").status_code == 403
+    assert reviewer.get("/dashboard/assets").status_code == 403
+
+    first = admin.get("/api/inspections", headers={"Accept-Encoding": "gzip, br"})
+    assert first.headers["Content-Encoding"] == "br"
+    page = json.loads(brotli.decompress(first.data))
+    assert len(page["items"]) == inspection_app.PAGE_SIZE
+    rest = admin.get("/api/inspections", query_string={"cursor": page["next_cursor"]}).get_json()
+    assert sorted(item["id"] for item in page["items"] + rest["items"]) == ids
+    assert rest["next_cursor"] is None
+
+    # Compression weakens the ETag; it still revalidates.
+    assert first.headers["ETag"].startswith("W/")
+    revalidated = admin.get("/api/inspections", headers={
+        "Accept-Encoding": "gzip, br",
+        "If-None-Match": first.headers["ETag"],
+    })
+    assert revalidated.status_code == 304
+
+    # The dashboard leaves the admin sections to their own requests.
+    dashboard = admin.get("/inspections").get_data(as_text=True)
+    assert "/dashboard/assets" in dashboard and "Asset register (" not in dashboard
+    assert "Asset register (0 assets)" in admin.get("/dashboard/assets").get_data(as_text=True)
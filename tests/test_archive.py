@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import app as inspection_app
+from tests.conftest import PDF_BYTES, upload
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {"COLD_BLOB_STORAGE_PATH": str(tmp_path / "cold")}
+
+
+def test_closed_inspections_archive_to_cold_storage_and_restore(app, admin):
+    upload(admin, registration_number="OLD111", pdf=PDF_BYTES + b"% old\n")
+    upload(admin, registration_number="NEW222")
+    old, recent = inspection_app.Inspection.query.order_by(inspection_app.Inspection.id).all()
+    table = inspection_app.Inspection.__table__
+    inspection_app.db.session.execute(
+        table.update().values(status_admin="Accepted", status_reviewer="Approved",
+                              updated_at=datetime.utcnow() - timedelta(days=400))
+        .where(table.c.id == old.id)
+    )
+    inspection_app.db.session.commit()
+    old_id, digest = old.id, old.pdf_sha256
+    hot, cold = inspection_app.blob_store, inspection_app.cold_blob_store
+
+    result = app.test_cli_runner().invoke(args=["archive-inspections", "--older-than-days", "365"])
+    assert result.exit_code == 0, result.output
+    assert "Archived 1 inspections" in result.output
+
+    assert [inspection.id for inspection in inspection_app.Inspection.query] == [recent.id]
+    assert [archived.id for archived in inspection_app.search_archive("OLD111")] == [old_id]
+    assert inspection_app.search_archive("NEW222") == []
+    assert cold.exists(digest) and not hot.exists(digest)
+    assert b"OLD111" in admin.get("/inspections?archived=1&q=OLD111").data
+
+    assert inspection_app.restore_inspections([old_id]) == 1
+    assert sorted(inspection.id for inspection in inspection_app.Inspection.query) == [old_id, recent.id]
+    assert inspection_app.ArchivedInspection.query.count() == 0
+    assert hot.exists(digest) and not cold.exists(digest)
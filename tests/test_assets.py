@@ -0,0 +1,27 @@
+import csv
+import os
+from datetime import date
+
+import app as inspection_app
+
+SAMPLE_ASSETS = os.path.join(inspection_app.BASE_DIR, "sample_assets.csv")
+
+
+def test_import_assets_loads_typed_rows_and_replaces(app):
+    with open(SAMPLE_ASSETS, encoding="utf-8") as f:
+        expected = list(csv.DictReader(f))
+    runner = app.test_cli_runner()
+    version = inspection_app.current_data_versions()["assets"]
+
+    result = runner.invoke(args=["import-assets", SAMPLE_ASSETS])
+    assert result.exit_code == 0, result.output
+    result = runner.invoke(args=["import-assets", "--replace", SAMPLE_ASSETS])
+    assert result.exit_code == 0, result.output
+
+    assets = inspection_app.Asset.query.order_by(inspection_app.Asset.id).all()
+    assert [asset.registration_number for asset in assets] == [row["Registreringsnummer"] for row in expected]
+    first = assets[0]
+    assert first.first_registration_date == date(2020, 11, 25)
+    assert first.price_new == int(expected[0]["Nybilspris"])
+    assert first.term_months == int(expected[0]["Avtalets löptid"])
+    assert inspection_app.current_data_versions()["assets"] > version
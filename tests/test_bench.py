@@ -0,0 +1,34 @@
+import json
+import os
+import subprocess
+import sys
+
+import app as inspection_app
+
+BENCH = os.path.join(inspection_app.BASE_DIR, "benchmarks", "bench.py")
+
+
+def write_results(path, forecast_us, loops):
+    path.write_text(json.dumps({
+        "forecast_matrix": {"per_call_us": forecast_us, "loops": loops},
+        "params": {"assets": 200, "horizon": 12},
+        "meta": {"revision": "abc"},
+    }))
+    return str(path)
+
+
+def compare(*args):
+    return subprocess.run([sys.executable, BENCH, "compare", *args], capture_output=True, text=True)
+
+
+def test_compare_fails_only_on_timing_regressions(tmp_path):
+    baseline = write_results(tmp_path / "baseline.json", 100.0, 2000)
+    # More loops is not a slowdown; only *_ms / *_us timings are compared.
+    similar = write_results(tmp_path / "similar.json", 105.0, 4000)
+    slower = write_results(tmp_path / "slower.json", 130.0, 2000)
+
+    assert compare(baseline, similar).returncode == 0
+    result = compare(baseline, slower)
+    assert result.returncode == 1
+    assert "forecast_matrix.per_call_us" in result.stdout and "REGRESSION" in result.stdout
+    assert compare(baseline, slower, "--threshold", "50").returncode == 0
@@ -0,0 +1,37 @@
+import io
+import zipfile
+
+import app as inspection_app
+from tests.conftest import PDF_BYTES
+
+MANIFEST = b"""file,registration_number,dealer_name,cost_estimate
+good.pdf,ABC123,Bilhall,1500
+fake.pdf,DEF456,Bilhall,
+missing.pdf,GHI789,Bilhall,
+"""
+
+
+def test_bulk_upload_reports_each_row(app, admin):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("good.pdf", PDF_BYTES)
+        zf.writestr("fake.pdf", b"GIF89a not a pdf")
+    archive.seek(0)
+
+    response = admin.post(
+        "/inspections/bulk",
+        data={"manifest": (io.BytesIO(MANIFEST), "manifest.csv"), "archive": (archive, "pdfs.zip")},
+        content_type="multipart/form-data",
+    )
+
+    assert response.status_code == 207
+    report = response.get_json()
+    assert (report["created"], report["failed"]) == (1, 2)
+    assert [item["status"] for item in report["items"]] == ["created", "failed", "failed"]
+    assert all(item["error"] for item in report["items"][1:])
+    inspection = inspection_app.Inspection.query.one()
+    assert inspection.id == report["items"][0]["inspection_id"]
+    assert (inspection.registration_number, inspection.cost_estimate) == ("ABC123", 1500)
+    with inspection_app.blob_store.open(inspection.pdf_sha256) as f:
+        assert f.read() == PDF_BYTES
+
@@ -0,0 +1,28 @@
+import csv
+import io
+
+import openpyxl
+
+from tests.conftest import add_inspections
+
+
+def test_inspection_export_streams_csv_and_xlsx(app, admin):
+    ids = add_inspections(3, dealer_name="=HYPERLINK(\"http://evil\")", cost_estimate=1200)
+
+    response = admin.get("/inspections/export.csv")
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.headers["Content-Disposition"].startswith('attachment; filename="inspections-')
+    # The BOM makes Excel read the file as UTF-8.
+    rows = list(csv.reader(io.StringIO(response.data.decode("utf-8-sig"))))
+    assert rows[0][:3] == ["ID", "Registration number", "Dealer"]
+    # Newest first; ids break the created_at tie.
+    assert [int(row[0]) for row in rows[1:]] == ids[::-1]
+    # Cells that a spreadsheet would evaluate are quoted.
+    assert {row[2] for row in rows[1:]} == {"'=HYPERLINK(\"http://evil\")"}
+
+    workbook = openpyxl.load_workbook(io.BytesIO(admin.get("/inspections/export.xlsx").data))
+    sheet = workbook.active
+    values = list(sheet.iter_rows(values_only=True))
+    assert [row[0] for row in values[1:]] == ids[::-1]
+    assert {row[5] for row in values[1:]} == {1200}
@@ -0,0 +1,78 @@
+from datetime import date
+
+from sqlalchemy import select
+
+import app as inspection_app
+from forecast import FleetArrays, add_months, forecast_matrix, month_index
+
+
+def test_forecast_matrix_matches_month_by_month_depreciation():
+    today = date(2025, 3, 17)
+    assets = [
+        # (registration, term months, monthly depreciation, price new)
+        (date(2024, 1, 5), 24, 10_000, 300_000),
+        (date(2025, 6, 1), 12, 5_000, 100_000),   # registered after the first forecast month
+        (date(2020, 1, 1), 36, 9_000, 200_000),   # term ended before the forecast starts
+        (date(2024, 12, 31), 60, 50_000, 400_000),  # depreciates past zero
+    ]
+    fleet = FleetArrays(
+        [f"A{index}" for index in range(len(assets))],
+        [month_index(registered) for registered, _, _, _ in assets],
+        [term for _, term, _, _ in assets],
+        [monthly for _, _, monthly, _ in assets],
+        [price for _, _, _, price in assets],
+    )
+
+    labels, values, totals = forecast_matrix(fleet, today, 18)
+
+    months = [add_months(date(2025, 3, 1), offset) for offset in range(18)]
+    assert labels == [month.strftime("%Y-%m") for month in months]
+    expected_totals = [0] * len(months)
+    for row, (registered, term, monthly, price) in enumerate(assets):
+        for column, month in enumerate(months):
+            age = month_index(month) - month_index(registered)
+            if 0 <= age <= term:
+                assert values[row, column] == max(price - monthly * age, 0)
+                expected_totals[column] += monthly
+            else:
+                assert values.mask[row, column]
+    assert totals.tolist() == expected_totals
+
+
+def rollup_rows():
+    table = inspection_app.ForecastMonthly.__table__
+    return inspection_app.db.session.execute(select(table).order_by(*table.primary_key.columns)).all()
+
+
+def test_incremental_rollup_matches_full_rebuild(app):
+    Asset = inspection_app.Asset
+    session = inspection_app.db.session
+    fleet = [
+        Asset(registration_number=f"R{index}", vehicle_type=vehicle_type, financier=financier,
+              first_registration_date=date(2022, 1 + index % 12, 1), term_months=24 + index,
+              monthly_depreciation=1_000 * (index + 1), price_new=100_000 + index)
+        for index, (vehicle_type, financier) in enumerate(
+            [("Lastbil", "Volvofinans"), ("Traktor", "Volvofinans"), ("Lastbil", "Scania"), ("Lastbil", None)] * 3
+        )
+    ]
+    session.add_all(fleet)
+    session.commit()
+    assert inspection_app.refresh_forecast_rollup() == len(fleet)
+
+    fleet[0].price_new = 150_000
+    fleet[1].vehicle_type = "Släp"
+    fleet[2].first_registration_date = None
+    session.delete(fleet[3])
+    session.add(Asset(registration_number="NEW", vehicle_type="Lastbil", financier="Scania",
+                      first_registration_date=date(2024, 2, 1), term_months=36,
+                      monthly_depreciation=2_500, price_new=90_000))
+    session.add(Asset(registration_number="UNDATED", vehicle_type="Lastbil", financier="Scania"))
+    session.commit()
+
+    # Contributions taken out plus put back: three changed assets count twice, the
+    # newly undated, deleted and new asset once; the other eight are untouched.
+    assert inspection_app.refresh_forecast_rollup() == 7
+    incremental = rollup_rows()
+    assert inspection_app.refresh_forecast_rollup() == 0
+    inspection_app.refresh_forecast_rollup(full=True)
+    assert rollup_rows() == incremental
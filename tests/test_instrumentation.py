@@ -0,0 +1,19 @@
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    return {"INSTRUMENTATION_ENABLED": True, "METRICS_TOKEN": "scrape-me"}
+
+
+def test_responses_carry_server_timing_and_metrics_need_the_token(app, admin):
+    timing = admin.get("/inspections").headers["Server-Timing"]
+    assert [part.split(";")[0] for part in timing.split(", ")] == ["sql", "tpl", "blob", "total"]
+
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 404
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 404
+    scrape = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert scrape.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="main.list_inspections",status="200"}' \
+        in scrape.get_data(as_text=True)
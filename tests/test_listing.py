@@ -0,0 +1,91 @@
+from datetime import datetime
+
+from sqlalchemy import inspect as orm_inspect
+
+import app as inspection_app
+from tests.conftest import add_inspections, upload
+
+
+def test_dashboard_rows_leave_pdf_bytes_unloaded(app, admin):
+    upload(admin, registration_number="ABC123")
+
+    inspections, next_cursor = inspection_app.inspection_page("", "")
+
+    assert [inspection.registration_number for inspection in inspections] == ["ABC123"]
+    assert inspections[0].has_pdf
+    assert "pdf_data" in orm_inspect(inspections[0]).unloaded
+    assert next_cursor is None
+    assert b"ABC123" in admin.get("/inspections").data
+
+
+def test_cursor_pages_cover_every_row_once(app):
+    same_time = datetime(2024, 5, 1, 12, 0)
+    # More rows than a page, all sharing created_at, so only the id breaks ties.
+    ids = add_inspections(inspection_app.PAGE_SIZE * 2 + 7, created_at=same_time)
+
+    seen, cursor = [], ""
+    while True:
+        inspections, cursor = inspection_app.inspection_page("", cursor)
+        seen.extend(inspection.id for inspection in inspections)
+        if cursor is None:
+            break
+
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_stale_selection_rejects_the_whole_batch(app, admin):
+    loaded = datetime(2024, 5, 1, 12, 0)
+    ids = add_inspections(3, updated_at=loaded)
+    selected = [f"{inspection_id}:{loaded.isoformat()}" for inspection_id in ids]
+    # Someone else saves the last row after the dashboard was loaded.
+    stale = f"{ids[-1]}:{datetime(2024, 4, 30).isoformat()}"
+
+    admin.post("/inspections/batch", data={"selected": selected[:-1] + [stale], "status_admin": "Accepted"})
+    inspection_app.db.session.expire_all()
+    assert {inspection.status_admin for inspection in inspection_app.Inspection.query} == {"Pending"}
+    assert inspection_app.InspectionEvent.query.count() == 0
+
+    admin.post("/inspections/batch", data={"selected": selected, "status_admin": "Accepted", "cost_estimate": "900"})
+    inspection_app.db.session.expire_all()
+    updated = inspection_app.Inspection.query.all()
+    assert {(inspection.status_admin, inspection.cost_estimate) for inspection in updated} == {("Accepted", 900)}
+    assert all(inspection.updated_at > loaded for inspection in updated)
+    events = inspection_app.InspectionEvent.query.order_by(inspection_app.InspectionEvent.inspection_id).all()
+    assert [(event.inspection_id, event.old_value, event.new_value) for event in events] == [
+        (inspection_id, "Pending", "Accepted") for inspection_id in ids
+    ]
+
+
+def test_dashboard_revalidates_until_a_write(app, admin):
+    upload(admin, registration_number="ABC123")
+    admin.get("/inspections")  # consumes the upload flash
+    first = admin.get("/inspections")
+    etag = first.headers["ETag"]
+    assert admin.get("/inspections", headers={"If-None-Match": etag}).status_code == 304
+
+    upload(admin, registration_number="XYZ999")
+    admin.get("/inspections")
+    changed = admin.get("/inspections", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    # The cached inspection table fragment was invalidated along with the page.
+    assert b"XYZ999" in changed.data and b"ABC123" in changed.data
+
+
+def test_text_search_ranks_identifier_hits_first_and_pages_once(app):
+    text_hits = add_inspections(inspection_app.PAGE_SIZE + 5, comment_admin="Worn brake pads, replace soon")
+    add_inspections(4, comment_admin="New tyres fitted")
+    all_ids = add_inspections(3, dealer_name="Brake Center")
+    identifier_hits = all_ids[-3:]
+
+    seen, cursor = [], ""
+    while True:
+        inspections, cursor = inspection_app.inspection_page("brake", cursor)
+        seen.extend(inspection.id for inspection in inspections)
+        if cursor is None:
+            break
+
+    assert sorted(seen[:3]) == identifier_hits
+    assert sorted(seen[3:]) == text_hits
+    snippets = inspection_app.search_snippets("brake", text_hits[:1])
+    assert "<mark>brake</mark>" in snippets[text_hits[0]]
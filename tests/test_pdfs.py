@@ -0,0 +1,84 @@
+import hashlib
+import io
+
+from pypdf import PdfWriter
+
+import app as inspection_app
+from tests.conftest import PDF_BYTES, add_inspections, upload
+
+
+def only_inspection():
+    return inspection_app.Inspection.query.one()
+
+
+def test_pdf_supports_range_and_revalidation(app, admin):
+    upload(admin)
+    url = f"/inspection/{only_inspection().id}/pdf"
+
+    full = admin.get(url)
+    assert full.status_code == 200
+    assert full.data == PDF_BYTES
+
+    partial = admin.get(url, headers={"Range": "bytes=0-7"})
+    assert partial.status_code == 206
+    assert partial.data == PDF_BYTES[:8]
+    assert partial.headers["Content-Range"] == f"bytes 0-7/{len(PDF_BYTES)}"
+
+    assert admin.get(url, headers={"If-None-Match": full.headers["ETag"]}).status_code == 304
+
+
+def test_upload_streams_into_the_blob_store(app, admin):
+    upload(admin)
+    upload(admin, registration_number="NOTPDF", pdf=b"GIF89a not a pdf")
+
+    inspection = only_inspection()
+    assert inspection.pdf_sha256 == hashlib.sha256(PDF_BYTES).hexdigest()
+    assert inspection.pdf_size == len(PDF_BYTES)
+    assert inspection.pdf_data is None
+    with inspection_app.blob_store.open(inspection.pdf_sha256) as f:
+        assert f.read() == PDF_BYTES
+
+
+def test_migrate_blobs_moves_legacy_pdf_data(app):
+    (legacy_id,) = add_inspections(1, pdf_data=PDF_BYTES, pdf_size=len(PDF_BYTES))
+    version = inspection_app.current_data_versions()["inspections"]
+
+    result = app.test_cli_runner().invoke(args=["migrate-blobs", "--batch-size", "10"])
+    assert result.exit_code == 0, result.output
+
+    inspection_app.db.session.expire_all()
+    inspection = inspection_app.db.session.get(inspection_app.Inspection, legacy_id)
+    assert inspection.pdf_data is None
+    assert inspection.pdf_sha256 == hashlib.sha256(PDF_BYTES).hexdigest()
+    with inspection_app.blob_store.open(inspection.pdf_sha256) as f:
+        assert f.read() == PDF_BYTES
+    assert inspection_app.current_data_versions()["inspections"] > version
+    assert inspection_app.db.session.get(inspection_app.JobCheckpoint, inspection_app.BLOB_MIGRATION_JOB).last_id \
+        == legacy_id
+
+
+def two_page_pdf():
+    writer = PdfWriter()
+    writer.add_blank_page(width=595, height=842)
+    writer.add_blank_page(width=595, height=842)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def test_worker_stores_page_count_and_thumbnail(app, admin):
+    upload(admin, pdf=two_page_pdf())
+    job = inspection_app.Job.query.one()
+    assert (job.kind, job.status) == (inspection_app.PDF_PROCESSING_JOB, "queued")
+
+    result = app.test_cli_runner().invoke(args=["worker", "--once"])
+    assert result.exit_code == 0, result.output
+
+    inspection_app.db.session.expire_all()
+    assert inspection_app.Job.query.one().status == "done"
+    inspection = only_inspection()
+    assert inspection.pdf_page_count == 2
+    assert inspection.pdf_processed_at is not None
+    thumbnail = admin.get(f"/inspection/{inspection.id}/thumbnail")
+    assert thumbnail.status_code == 200
+    assert thumbnail.data.startswith(b"\x89PNG")
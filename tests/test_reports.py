@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+import app as inspection_app
+
+
+def log_event(inspection_id, old_value, new_value, at):
+    inspection_app.db.session.execute(inspection_app.InspectionEvent.__table__.insert(), {
+        "inspection_id": inspection_id, "field": "status_admin",
+        "old_value": old_value, "new_value": new_value, "created_at": at,
+    })
+
+
+def test_backlog_snapshots_leave_the_report_unchanged(app, admin):
+    today = datetime.utcnow().replace(hour=12, minute=0, second=0, microsecond=0)
+    first = today - timedelta(days=6)
+    for inspection_id in (1, 2, 3):
+        log_event(inspection_id, None, "Pending", first)
+    log_event(1, "Pending", "Awaiting approval", first + timedelta(days=1))
+    log_event(1, "Awaiting approval", "Accepted", first + timedelta(days=2))
+    log_event(2, "Pending", "Accepted", first + timedelta(days=2))
+    log_event(4, None, "Pending", first + timedelta(days=4))
+    inspection_app.db.session.commit()
+
+    first_day, last_day = first.date(), today.date()
+    full = inspection_app.backlog_report("status_admin", first_day, last_day)
+    assert full["statuses"] == inspection_app.ADMIN_STATUSES
+    assert full["days"][-1]["counts"] == [2, 0, 0, 2]
+
+    assert admin.get("/reports").status_code == 200
+    assert inspection_app.StatusBacklogDaily.query.count() == 0
+
+    result = app.test_cli_runner().invoke(args=["snapshot-backlog"])
+    assert result.exit_code == 0, result.output
+    # Every finished day up to yesterday (two days ago just after midnight).
+    through = (datetime.utcnow() - inspection_app.BACKLOG_SNAPSHOT_DELAY).date() - timedelta(days=1)
+    snapshot_days = inspection_app.db.session.query(inspection_app.StatusBacklogDaily.day).distinct().count()
+    assert snapshot_days == (through - first_day).days + 1
+
+    assert inspection_app.backlog_report("status_admin", first_day, last_day) == full
+    later = inspection_app.backlog_report("status_admin", first_day + timedelta(days=3), last_day)
+    assert later["days"] == full["days"][3:]
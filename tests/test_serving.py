@@ -0,0 +1,34 @@
+import os
+import runpy
+from types import SimpleNamespace
+
+import pytest
+from psycopg2 import extensions
+
+import app as inspection_app
+
+GUNICORN_CONF = os.path.join(inspection_app.BASE_DIR, "gunicorn.conf.py")
+
+
+def load_config(monkeypatch, **env):
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(GUNICORN_CONF)
+
+
+def test_serving_mode_picks_the_worker_class(monkeypatch):
+    assert "worker_class" not in load_config(monkeypatch, SERVING_MODE="sync")
+
+    config = load_config(monkeypatch, SERVING_MODE="async", WORKER_CONNECTIONS="250")
+    assert (config["worker_class"], config["worker_connections"]) == ("gevent", 250)
+    with pytest.raises(ValueError):
+        load_config(monkeypatch, SERVING_MODE="threads")
+
+    # gevent workers make psycopg2 wait cooperatively; sync workers leave it blocking.
+    try:
+        config["post_worker_init"](SimpleNamespace(cfg=SimpleNamespace(worker_class_str="sync")))
+        assert extensions.get_wait_callback() is None
+        config["post_worker_init"](SimpleNamespace(cfg=SimpleNamespace(worker_class_str="gevent")))
+        assert extensions.get_wait_callback() is config["_gevent_wait_callback"]
+    finally:
+        extensions.set_wait_callback(None)
@@ -0,0 +1,27 @@
+import json
+import os
+import subprocess
+import sys
+
+import app as inspection_app
+
+PROBE = """
+import json, sys
+import app
+print(json.dumps({name: name in sys.modules for name in ("numpy", "pypdf", "openpyxl")}))
+"""
+
+
+def test_import_loads_no_heavy_modules_and_writes_nothing(tmp_path):
+    before = sorted(os.listdir(inspection_app.BASE_DIR))
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": inspection_app.BASE_DIR, "PYTHONDONTWRITEBYTECODE": "1"},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout) == {"numpy": False, "pypdf": False, "openpyxl": False}
+    assert os.listdir(tmp_path) == []
+    assert sorted(os.listdir(inspection_app.BASE_DIR)) == before
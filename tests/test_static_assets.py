@@ -0,0 +1,41 @@
+import gzip
+import json
+
+from flask import Flask, url_for
+
+from static_assets import IMMUTABLE_MAX_AGE, MANIFEST_NAME, STATIC_BUILD_DIR, build_static, init_static_assets
+
+CSS = b"body { color: #222; }\n" * 200
+
+
+def test_built_assets_are_fingerprinted_compressed_and_immutable(tmp_path):
+    static_dir = tmp_path / "static"
+    (static_dir / "css").mkdir(parents=True)
+    (static_dir / "css" / "site.css").write_bytes(CSS)
+
+    sizes = build_static(str(static_dir))
+    build_dir = static_dir / STATIC_BUILD_DIR
+    hashed = json.loads((build_dir / MANIFEST_NAME).read_text())["css/site.css"]
+    assert hashed.startswith("css/site.") and hashed != "css/site.css"
+    assert sizes["css/site.css"]["size"] == len(CSS)
+    assert gzip.decompress((build_dir / (hashed + ".gz")).read_bytes()) == CSS
+
+    app = Flask(__name__, static_folder=str(static_dir))
+    init_static_assets(app)
+    with app.test_request_context():
+        url = url_for("static", filename="css/site.css")
+    assert url == f"/static/{STATIC_BUILD_DIR}/{hashed}"
+
+    client = app.test_client()
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert plain.data == CSS
+    assert "Content-Encoding" not in plain.headers
+    assert {"public", "immutable", f"max-age={IMMUTABLE_MAX_AGE}"} <= {
+        part.strip() for part in plain.headers["Cache-Control"].split(",")
+    }
+    compressed = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data) == CSS
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    # Source files stay reachable under their own names.
+    assert client.get("/static/css/site.css").data == CSS